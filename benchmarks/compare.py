@@ -0,0 +1,57 @@
+"""השוואת שתי ריצות של benchmarks.run.
+
+    python -m benchmarks.compare benchmarks/results/before.json benchmarks/results/after.json
+"""
+import sys
+import json
+import argparse
+
+
+def _load(path: str) -> tuple[dict, dict]:
+    with open(path, encoding="utf-8") as f:
+        report = json.load(f)
+    return report["meta"], {(row["role"], row["page"]): row for row in report["results"]}
+
+
+def _delta(before: float, after: float) -> str:
+    if not before:
+        return "    -"
+    return f"{(after - before) / before * 100:+5.0f}%"
+
+
+def compare(before_path: str, after_path: str, threshold: float = 10.0) -> int:
+    """הדפסת ההפרשים; מחזיר את מספר העמודים שהאטו ביותר מ-threshold אחוז (ריצה חמה)"""
+    meta_before, before = _load(before_path)
+    meta_after, after = _load(after_path)
+    if meta_before["volumes"] != meta_after["volumes"]:
+        print(f"⚠️ היקפי נתונים שונים: {meta_before['volumes']} מול {meta_after['volumes']}")
+
+    print(f"{meta_before.get('commit')} -> {meta_after.get('commit')}")
+    print(f"{'role':<10}{'page':<24}{'cold ms':>18}{'':>7}{'warm ms':>18}{'':>7}{'queries':>10}{'peak KB':>18}")
+    regressions = 0
+    for key in sorted(set(before) & set(after)):
+        b, a = before[key], after[key]
+        slower = b["warm_ms"] and (a["warm_ms"] - b["warm_ms"]) / b["warm_ms"] * 100 > threshold
+        regressions += bool(slower)
+        print(f"{key[0]:<10}{key[1]:<24}"
+              f"{b['cold_ms']:>8.0f} -> {a['cold_ms']:<6.0f}{_delta(b['cold_ms'], a['cold_ms'])}"
+              f"{b['warm_ms']:>8.0f} -> {a['warm_ms']:<6.0f}{_delta(b['warm_ms'], a['warm_ms'])}"
+              f"{b['queries_cold']:>4} -> {a['queries_cold']:<3}"
+              f"{b['peak_kb'] or 0:>8.0f} -> {a['peak_kb'] or 0:<6.0f}"
+              f"{'  ⚠️' if slower else ''}")
+    for key in sorted(set(before) ^ set(after)):
+        print(f"{key[0]:<10}{key[1]:<24}קיים רק ב-{'before' if key in before else 'after'}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="השוואת תוצאות בדיקות ביצועים")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=10.0, help="אחוז האטה בריצה חמה שנחשב רגרסיה")
+    args = parser.parse_args(argv)
+    sys.exit(1 if compare(args.before, args.after, args.threshold) else 0)
+
+
+if __name__ == "__main__":
+    main()
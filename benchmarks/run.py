@@ -0,0 +1,316 @@
+"""הרצת בדיקות ביצועים על כל העמודים מול backend מזויף.
+
+    python -m benchmarks.run --preset small
+    python -m benchmarks.run --schools 500 --activities 100000 --latency-ms 20 --out results.json
+
+לכל תפקיד (מנהל/מדריך) ועמוד: זמן רינדור קר (cache ריק) וחם, מספר שאילתות
+וזיכרון שיא - לעמוד כולו ולכל טאב. בעמודים עם סעיפים (utils.sections) כל ריצה מציגה
+סעיף אחד, ולכן כל סעיף נבחר בתורו ונמדד בריצות משלו; שורת העמוד היא הסעיף הראשון.
+התוצאות נשמרות כ-JSON להשוואה (benchmarks.compare).
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ה-backend נבחר בזמן import של utils.supabase_client - לפני כל import של האפליקציה
+os.environ["DREAM_BUILD_BACKEND"] = "fake"
+os.environ.setdefault("DREAM_BUILD_REPLICA", ":memory:")
+sys.path.insert(0, ROOT)
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.seed import PRESETS, MANAGER_EMAIL, EMPLOYEE_EMAIL, PASSWORD, generate, seed_client
+
+# עמודים לכל תפקיד - כמו התפריט ב-utils/nav.py
+PAGES = {
+    "manager": ["dashboard_manager.py", "schools.py", "employees.py", "schedule.py", "equipment.py", "finance.py"],
+    "employee": ["dashboard_employee.py", "schedule.py", "equipment.py"],
+}
+CREDENTIALS = {"manager": MANAGER_EMAIL, "employee": EMPLOYEE_EMAIL}
+
+TIMEOUT = 600
+
+
+# === מדידה לפי טאב ===
+class _TabRecorder:
+    """מחליף את st.tabs ואת utils.sections.render_section כך שכל כניסה ויציאה
+    מטאב / מסעיף נמדדת (זמן, שאילתות, זיכרון), ורושם את בורר הסעיפים של העמוד"""
+
+    def __init__(self):
+        from utils import sections
+
+        self.segments: dict[str, dict] = {}
+        self._open: dict[str, tuple] = {}
+        self.peak_kb = 0.0
+        self.selector: tuple | None = None  # (מפתח ב-session_state, סעיפים) של העמוד שרץ
+        self._sections = sections
+        self._original = st.tabs
+        self._original_section = sections.render_section
+        self._original_selector = sections.section_selector
+
+    def install(self):
+        recorder = self
+
+        def timed_tabs(labels, *args, **kwargs):
+            return [_TimedTab(tab, label, recorder) for tab, label in zip(recorder._original(labels, *args, **kwargs), labels)]
+
+        def timed_section(selected, bodies):
+            recorder.enter(selected)
+            try:
+                return recorder._original_section(selected, bodies)
+            finally:
+                recorder.exit(selected)
+
+        def recorded_selector(page, labels):
+            recorder.selector = (recorder._sections.section_key(page), list(labels))
+            return recorder._original_selector(page, labels)
+
+        st.tabs = timed_tabs
+        self._sections.render_section = timed_section
+        self._sections.section_selector = recorded_selector
+
+    def uninstall(self):
+        st.tabs = self._original
+        self._sections.render_section = self._original_section
+        self._sections.section_selector = self._original_selector
+
+    def reset(self):
+        self.segments = {}
+        self._open = {}
+        self.peak_kb = 0.0
+        self.selector = None
+
+    def _take_peak(self) -> float:
+        """זיכרון השיא מאז המדידה הקודמת, ואיפוס - השיא של העמוד נשמר ב-peak_kb"""
+        peak = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.reset_peak()
+        self.peak_kb = max(self.peak_kb, peak)
+        return peak
+
+    def enter(self, label: str):
+        if tracemalloc.is_tracing():
+            self._take_peak()
+        self._open[label] = (time.perf_counter(), _queries())
+
+    def exit(self, label: str):
+        started, queries = self._open.pop(label)
+        segment = self.segments.setdefault(label, {"ms": 0.0, "queries": 0, "peak_kb": None})
+        segment["ms"] += (time.perf_counter() - started) * 1000
+        segment["queries"] += _queries() - queries
+        if tracemalloc.is_tracing():
+            segment["peak_kb"] = max(segment["peak_kb"] or 0, self._take_peak())
+
+
+class _TimedTab:
+    def __init__(self, tab, label: str, recorder: _TabRecorder):
+        self._tab = tab
+        self._label = label
+        self._recorder = recorder
+
+    def __enter__(self):
+        self._recorder.enter(self._label)
+        return self._tab.__enter__()
+
+    def __exit__(self, *exc):
+        try:
+            return self._tab.__exit__(*exc)
+        finally:
+            self._recorder.exit(self._label)
+
+    def __getattr__(self, name):
+        return getattr(self._tab, name)
+
+
+def _queries() -> int:
+    from utils.instrumentation import query_totals
+    return query_totals()["calls"]
+
+
+def _clear_caches():
+    """מצב "קר": ריקון cache הנתונים והעתק ה-SQLite המקומי"""
+    from utils.replica import get_replica
+    st.cache_data.clear()
+    get_replica.clear()
+
+
+def _run(at: AppTest, recorder: _TabRecorder, page: str | None, memory: bool = False) -> dict:
+    """ריצה אחת של עמוד: זמן, שאילתות, זיכרון שיא וטאבים"""
+    recorder.reset()
+    queries = _queries()
+    if memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        (at.switch_page(f"pages/{page}") if page else at).run(timeout=TIMEOUT)
+    finally:
+        ms = (time.perf_counter() - started) * 1000
+        peak = None
+        if memory:
+            recorder._take_peak()
+            peak = recorder.peak_kb
+            tracemalloc.stop()
+    return {
+        "ms": round(ms, 1),
+        "queries": _queries() - queries,
+        "peak_kb": round(peak, 1) if peak is not None else None,
+        "tabs": {label: dict(segment) for label, segment in recorder.segments.items()},
+        "exceptions": [str(e.value) for e in at.exception],
+    }
+
+
+def _merge(cold: dict, warm: dict, mem: dict) -> dict:
+    """תוצאה אחת לעמוד מהריצה הקרה, החמה וריצת הזיכרון"""
+    tabs = []
+    for label in cold["tabs"]:
+        tabs.append({
+            "tab": label,
+            "cold_ms": round(cold["tabs"][label]["ms"], 1),
+            "warm_ms": round(warm["tabs"].get(label, {}).get("ms", 0), 1),
+            "queries_cold": cold["tabs"][label]["queries"],
+            "queries_warm": warm["tabs"].get(label, {}).get("queries", 0),
+            "peak_kb": round(mem["tabs"].get(label, {}).get("peak_kb") or 0, 1),
+        })
+    return {
+        "cold_ms": cold["ms"],
+        "warm_ms": warm["ms"],
+        "queries_cold": cold["queries"],
+        "queries_warm": warm["queries"],
+        "peak_kb": mem["peak_kb"],
+        "tabs": tabs,
+        "exceptions": sorted(set(cold["exceptions"] + warm["exceptions"] + mem["exceptions"])),
+    }
+
+
+def _login(role: str) -> AppTest:
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=TIMEOUT).run()
+    at.text_input(key="login_email").input(CREDENTIALS[role])
+    at.text_input(key="login_password").input(PASSWORD)
+    at.button[0].click().run()
+    if not at.session_state["authenticated"]:
+        raise RuntimeError(f"התחברות כ-{role} נכשלה")
+    return at
+
+
+def _measure_once(at: AppTest, recorder: _TabRecorder, page: str | None) -> dict:
+    _clear_caches()
+    cold = _run(at, recorder, page)
+    warm = _run(at, recorder, page)
+    mem = _run(at, recorder, page, memory=True)
+    return _merge(cold, warm, mem)
+
+
+def _measure(at: AppTest, recorder: _TabRecorder, page: str | None) -> dict:
+    """מדידת העמוד; בעמוד עם סעיפים - גם כל שאר הסעיפים, כל אחד בריצות משלו"""
+    result = _measure_once(at, recorder, page)
+    if recorder.selector is None:
+        return result
+    key, labels = recorder.selector
+    first = at.session_state[key]
+    for label in labels:
+        if label == first:
+            continue
+        at.session_state[key] = label
+        section = _measure_once(at, recorder, page)
+        result["tabs"] += section["tabs"]
+        result["exceptions"] = sorted(set(result["exceptions"] + section["exceptions"]))
+    at.session_state[key] = first
+    return result
+
+
+def run_benchmarks(volumes: dict, latency_ms: float = 0, seed: int = 42, roles=("manager", "employee")) -> dict:
+    from utils.supabase_client import get_supabase_client
+
+    client = get_supabase_client()
+    client.latency_ms = latency_ms
+    started = time.perf_counter()
+    seed_client(client, generate(volumes["schools"], volumes["employees"], volumes["activities"], seed))
+    seed_seconds = time.perf_counter() - started
+
+    recorder = _TabRecorder()
+    recorder.install()
+    results = []
+    try:
+        # מסך ההתחברות (app.py) בלי משתמש מחובר
+        login_screen = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=TIMEOUT)
+        results.append({"role": "anonymous", "page": "app.py", **_measure(login_screen, recorder, None)})
+
+        for role in roles:
+            at = _login(role)
+            for page in PAGES[role]:
+                print(f"  {role:<9} {page}", file=sys.stderr)
+                results.append({"role": role, "page": page, **_measure(at, recorder, page)})
+    finally:
+        recorder.uninstall()
+
+    return {"meta": _meta(volumes, latency_ms, seed, seed_seconds), "results": results}
+
+
+def _meta(volumes: dict, latency_ms: float, seed: int, seed_seconds: float) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "volumes": volumes,
+        "latency_ms": latency_ms,
+        "seed": seed,
+        "seed_seconds": round(seed_seconds, 2),
+        "python": platform.python_version(),
+        "streamlit": st.__version__,
+    }
+
+
+def _print_table(report: dict):
+    print(f"{'role':<10}{'page':<24}{'cold ms':>10}{'warm ms':>10}{'q cold':>8}{'q warm':>8}{'peak KB':>10}")
+    for row in report["results"]:
+        print(f"{row['role']:<10}{row['page']:<24}{row['cold_ms']:>10.0f}{row['warm_ms']:>10.0f}"
+              f"{row['queries_cold']:>8}{row['queries_warm']:>8}{row['peak_kb'] or 0:>10.0f}")
+        for tab in row["tabs"]:
+            print(f"{'':<12}{tab['tab']:<22}{tab['cold_ms']:>10.0f}{tab['warm_ms']:>10.0f}"
+                  f"{tab['queries_cold']:>8}{tab['queries_warm']:>8}{tab['peak_kb']:>10.0f}")
+        for error in row["exceptions"]:
+            print(f"{'':<12}! {error[:100]}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="בדיקות ביצועים לעמודי Dream & Build")
+    parser.add_argument("--preset", choices=PRESETS, default="small")
+    parser.add_argument("--schools", type=int)
+    parser.add_argument("--employees", type=int)
+    parser.add_argument("--activities", type=int)
+    parser.add_argument("--latency-ms", type=float, default=0, help="השהיה מדומה לכל שאילתה")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--role", choices=list(PAGES), action="append", help="ברירת מחדל: כל התפקידים")
+    parser.add_argument("--out", help="קובץ JSON לתוצאות (ברירת מחדל: benchmarks/results/<זמן>.json)")
+    args = parser.parse_args(argv)
+
+    volumes = dict(PRESETS[args.preset])
+    for key in ("schools", "employees", "activities"):
+        if getattr(args, key) is not None:
+            volumes[key] = getattr(args, key)
+
+    report = run_benchmarks(volumes, args.latency_ms, args.seed, tuple(args.role or PAGES))
+
+    out = args.out or os.path.join(ROOT, "benchmarks", "results", datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    _print_table(report)
+    print(f"\nנשמר: {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import random
+import uuid
+from datetime import date, timedelta
+
+# === יצירת נתונים לבדיקות ביצועים ===
+# נתונים דטרמיניסטיים (seed קבוע) בהיקפים שונים, נזרעים ל-FakeClient
+
+# היקפים מוכנים: בתי ספר / מדריכים / פעילויות
+PRESETS = {
+    "small": {"schools": 50, "employees": 20, "activities": 10_000},
+    "medium": {"schools": 500, "employees": 80, "activities": 100_000},
+    "large": {"schools": 5000, "employees": 300, "activities": 1_000_000},
+}
+
+MANAGER_EMAIL = "manager@example.com"
+EMPLOYEE_EMAIL = "employee@example.com"
+PASSWORD = "fake-password"
+
+CITIES = ["תל אביב", "חיפה", "ירושלים", "באר שבע", "נתניה", "רמת גן", "חולון", "פתח תקווה"]
+FIRST_NAMES = ["דנה", "יוסי", "מיכל", "אבי", "נועה", "רון", "שירה", "עומר", "טל", "גיל"]
+LAST_NAMES = ["כהן", "לוי", "מזרחי", "פרץ", "ביטון", "אברהם", "פרידמן", "דהן", "אזולאי", "שפירא"]
+EQUIPMENT_CATEGORIES = ["כלים", "חומרים", "בטיחות", "אחר"]
+EXPENSE_CATEGORIES = ["חומרים", "ציוד", "משכורות", "שיווק", "נסיעות", "תיקונים", "אחר"]
+STATUS_WEIGHTS = {"completed": 60, "confirmed": 10, "planned": 25, "cancelled": 5}
+
+
+def _id(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def generate(schools: int, employees: int, activities: int, seed: int = 42, today: date | None = None) -> dict:
+    """כל הטבלאות כ-{טבלה: [שורות]}. פעילויות פרוסות על שנתיים אחורה וחודשיים קדימה"""
+    rng = random.Random(seed)
+    today = today or date.today()
+
+    school_rows = [{
+        "id": _id(rng),
+        "name": f"בית ספר {rng.choice(CITIES)} {i + 1}",
+        "contact_person": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        "phone": f"05{rng.randint(0, 9)}-{rng.randint(1000000, 9999999)}",
+        "email": f"school{i + 1}@example.com",
+        "price_per_day": rng.choice([800, 1000, 1200, 1500, 1800]),
+        "address": rng.choice(CITIES),
+        "notes": None,
+        "status": "active" if rng.random() < 0.9 else "archived",
+    } for i in range(schools)]
+
+    employee_rows = [{
+        "id": _id(rng),
+        "email": EMPLOYEE_EMAIL if i == 0 else f"employee{i}@example.com",
+        "full_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i + 1}",
+        "phone": f"05{rng.randint(0, 9)}-{rng.randint(1000000, 9999999)}",
+        "role": "employee",
+        "status": "active" if rng.random() < 0.9 or i == 0 else "archived",
+        "hourly_rate": rng.choice([0, 60, 80]),
+        "daily_rate": rng.choice([0, 400, 500]),
+    } for i in range(employees)]
+
+    start = today - timedelta(days=730)
+    span = 730 + 60
+    statuses = list(STATUS_WEIGHTS)
+    weights = list(STATUS_WEIGHTS.values())
+    activity_rows = []
+    for _ in range(activities):
+        day = start + timedelta(days=rng.randrange(span))
+        status = rng.choices(statuses, weights)[0]
+        if day > today and status == "completed":
+            status = "planned"
+        hour = rng.choice([8, 9, 10, 12])
+        activity_rows.append({
+            "id": _id(rng),
+            "school_id": rng.choice(school_rows)["id"],
+            "employee_id": rng.choice(employee_rows)["id"] if rng.random() < 0.95 else None,
+            "date": day.isoformat(),
+            "time_start": f"{hour:02d}:00:00",
+            "time_end": f"{hour + rng.choice([3, 4, 5]):02d}:00:00",
+            "status": status,
+            "confirmed_by_employee": status == "completed" and rng.random() < 0.8,
+            "notes": None,
+        })
+
+    equipment_rows = [{
+        "id": _id(rng),
+        "name": f"פריט {i + 1}",
+        "category": rng.choice(EQUIPMENT_CATEGORIES),
+        "quantity_available": rng.randint(0, 50),
+        "min_threshold": rng.randint(2, 10),
+    } for i in range(max(20, schools // 5))]
+
+    report_rows = [{
+        "id": _id(rng),
+        "equipment_id": rng.choice(equipment_rows)["id"],
+        "reported_by": rng.choice(employee_rows)["id"],
+        "report_type": rng.choice(["missing", "broken", "low_stock"]),
+        "description": "דיווח אוטומטי",
+        "status": rng.choice(["pending", "resolved"]),
+        "created_at": (today - timedelta(days=rng.randrange(365))).isoformat() + "T08:00:00+00:00",
+    } for _ in range(max(50, schools))]
+
+    financial_rows = [{
+        "id": _id(rng),
+        "type": "expense" if rng.random() < 0.8 else "income",
+        "amount": rng.randint(100, 5000),
+        "category": rng.choice(EXPENSE_CATEGORIES),
+        "date": (today - timedelta(days=rng.randrange(730))).isoformat(),
+        "description": None,
+    } for _ in range(max(200, activities // 50))]
+
+    budget_rows = [{
+        "id": _id(rng),
+        "school_id": school["id"],
+        "year": year,
+        "budget_amount": rng.choice([20000, 50000, 100000]),
+        "alert_threshold": 1000,
+    } for school in school_rows for year in (today.year - 1, today.year)]
+
+    return {
+        "schools": school_rows,
+        "users": employee_rows,
+        "activities": activity_rows,
+        "equipment": equipment_rows,
+        "equipment_reports": report_rows,
+        "financial_records": financial_rows,
+        "school_budgets": budget_rows,
+    }
+
+
+def seed_client(client, data: dict):
+    """זריעת הנתונים ל-FakeClient, כולל חשבון התחברות למדריך הראשון"""
+    employees = data["users"]
+    for table, rows in data.items():
+        if table == "users":
+            rows = employees[1:]
+        client.seed(table, rows)
+    client.add_account(EMPLOYEE_EMAIL, PASSWORD, employees[0])
@@ -1,8 +1,9 @@
 import streamlit as st
 from utils.auth import require_role
 from utils.styling import apply_custom_css
-from utils.supabase_client import supabase
+from utils.data import begin_run, get_activities, update, by_id
 from utils.nav import render_sidebar
+from utils.board import activity_frame, render_board
 import pandas as pd
 from datetime import datetime, timedelta
 
@@ -10,6 +11,7 @@ from datetime import datetime, timedelta
 st.set_page_config(page_title="הדשבורד שלי | Dream & Build", page_icon="👷", layout="wide")
 apply_custom_css()
 render_sidebar()
+begin_run()
 
 # === וידוא הרשאות ===
 user = require_role('employee')
@@ -29,14 +31,7 @@ try:
     week_start = today - timedelta(days=today.weekday())
     
     # פעילויות החודש
-    my_activities = supabase.table("activities") \
-        .select("*, schools(name)") \
-        .eq("employee_id", user['id']) \
-        .gte("date", str(month_start)) \
-        .order("date") \
-        .execute()
-    
-    activities_data = my_activities.data if my_activities.data else []
+    activities_data = get_activities(month_start, employee_id=user['id'], view="activities.my_month")
     
     # חישובים
     total_month = len(activities_data)
@@ -95,7 +90,7 @@ if pending_confirm > 0:
     st.markdown(f"""
     <div style='background: #FEF3C7; padding: 1rem; border-radius: 10px; border-right: 4px solid #F59E0B; margin-bottom: 1rem;'>
         <div style='font-weight: 600; color: #92400E;'>⚠️ יש לך {pending_confirm} פעילויות שממתינות לאישור ביצוע!</div>
-        <div style='font-size: 0.9rem; color: #6B7280;'>לחץ על "אשר ביצוע" בטבלה למטה</div>
+        <div style='font-size: 0.9rem; color: #6B7280;'>בחר פעילות בטבלה למטה ולחץ על "אשר ביצוע"</div>
     </div>
     """, unsafe_allow_html=True)
 
@@ -111,16 +106,7 @@ with col_upcoming:
     upcoming_acts = [a for a in activities_data if a['date'] >= str(today) and a['status'] in ['planned', 'confirmed']]
     
     if upcoming_acts:
-        for act in upcoming_acts[:5]:
-            status_icon = "🟢" if act['status'] == 'confirmed' else "🟡"
-            school_name = act['schools']['name'] if act.get('schools') else '-'
-            
-            st.markdown(f"""
-            <div style='background: #F9FAFB; padding: 0.75rem; border-radius: 8px; margin-bottom: 0.5rem;'>
-                <div style='font-weight: 600;'>{status_icon} {act['date']}</div>
-                <div style='font-size: 0.9rem; color: #6B7280;'>{school_name} | {act['time_start'][:5]} - {act['time_end'][:5]}</div>
-            </div>
-            """, unsafe_allow_html=True)
+        render_board(activity_frame(upcoming_acts, employee=False), selectable=False)
     else:
         st.info("אין פעילויות קרובות")
     
@@ -135,24 +121,15 @@ with col_pending:
     pending_acts = [a for a in activities_data if a['date'] <= str(today) and a['status'] in ['planned', 'confirmed'] and not a.get('confirmed_by_employee')]
     
     if pending_acts:
-        for act in pending_acts[:5]:
-            school_name = act['schools']['name'] if act.get('schools') else '-'
-            
-            col_info, col_btn = st.columns([3, 1])
-            with col_info:
-                st.markdown(f"""
-                <div style='background: #FEF3C7; padding: 0.75rem; border-radius: 8px;'>
-                    <div style='font-weight: 600;'>{act['date']}</div>
-                    <div style='font-size: 0.9rem; color: #6B7280;'>{school_name}</div>
-                </div>
-                """, unsafe_allow_html=True)
-            with col_btn:
-                if st.button("✅ אשר", key=f"confirm_{act['id']}"):
-                    supabase.table("activities").update({
-                        "confirmed_by_employee": True,
-                        "status": "completed"
-                    }).eq("id", act['id']).execute()
-                    st.rerun()
+        selected_idx = render_board(activity_frame(pending_acts, employee=False, status=False))
+        if selected_idx is None:
+            st.caption("בחר פעילות בטבלה לאישור ביצוע")
+        elif st.button(f"✅ אשר ביצוע - {pending_acts[selected_idx]['date']}", use_container_width=True):
+            update("activities", {
+                "confirmed_by_employee": True,
+                "status": "completed"
+            }, by_id(pending_acts[selected_idx]['id']))
+            st.rerun()
     else:
         st.success("✅ הכל מאושר!")
     
@@ -1,8 +1,16 @@
 import streamlit as st
 from utils.auth import require_role
 from utils.styling import apply_custom_css
-from utils.supabase_client import supabase
+from utils.data import begin_run, get_activities, get_equipment, count_rows, count_activities, fetch_parallel, delete, run_stats, ALL_ROWS
+from utils.analytics import total_income
+from utils.importer import IMPORT_CHUNK_SIZE, import_context, validate_file, name_suggestions, error_report, preview, estimate_rows
+from utils.name_index import get_alias_store
+from utils.views import unused_columns, DEV_MODE
+from utils.archive import archive_activities, archive_stats
+from utils.import_jobs import get_import_jobs, STATUS_LABELS, ACTIVE_STATUSES, RESUMABLE_STATUSES, JOB_POLL_SECONDS
+from utils.instrumentation import session_log, session_summary, page_summary, slow_queries, reset_stats, SLOW_QUERY_MS, MEASURE_PAYLOAD
 from utils.nav import render_sidebar
+from utils.sections import section_selector, render_section
 import pandas as pd
 from datetime import datetime, timedelta
 import plotly.express as px
@@ -12,6 +20,7 @@ import plotly.graph_objects as go
 st.set_page_config(page_title="דשבורד מנהלים | Dream & Build", page_icon="📊", layout="wide")
 apply_custom_css()
 render_sidebar()
+begin_run()
 
 # === וידוא הרשאות ===
 user = require_role('manager')
@@ -33,38 +42,88 @@ with col_date:
 
 st.markdown("<div style='height: 1rem;'></div>", unsafe_allow_html=True)
 
-# === טאבים ===
-tab_dashboard, tab_import, tab_admin = st.tabs(["📊 דשבורד", "📥 ייבוא נתונים", "⚙️ ניהול מערכת"])
+# === עבודות ייבוא ברקע - מתרעננות לבד בלי להריץ את כל העמוד ===
+# הרשימה מתרעננת (run_every) רק כשיש עבודה פעילה. כשהעבודה האחרונה מסתיימת - ריצה מלאה
+# אחת שמפסיקה את הריענון (ומציגה את הנתונים שיובאו); המשך עבודה - ריצה מלאה שמתחילה אותו
+def import_jobs_panel():
+    polling = any(job['status'] in ACTIVE_STATUSES for job in get_import_jobs().recent())
+    st.fragment(jobs_list, run_every=JOB_POLL_SECONDS if polling else None)(polling)
+
+
+def jobs_list(polling: bool):
+    jobs = get_import_jobs()
+    job_list = jobs.recent()
+    if polling and not any(job['status'] in ACTIVE_STATUSES for job in job_list):
+        st.rerun()
+    if not job_list:
+        st.caption("אין עבודות ייבוא")
+        return
+    for job in job_list:
+        with st.container(border=True):
+            col1, col2, col3 = st.columns([3, 2, 1])
+            with col1:
+                st.markdown(f"**{job['import_type']}** · {job['file_name']} · {STATUS_LABELS[job['status']]}")
+                done = min(job['rows_done'] / job['rows_total'], 1.0) if job['rows_total'] else 0.0
+                st.progress(done, text=f"{job['rows_done']:,}/{job['rows_total']:,} שורות")
+                if job['error']:
+                    st.caption(f"❌ {job['error']}")
+            with col2:
+                st.caption(f"✅ {job['inserted']:,} נוספו · ✏️ {job['updated']:,} עודכנו · "
+                           f"⏭️ {job['skipped']:,} דולגו · ⚠️ {job['error_count']:,} שגיאות")
+                st.caption(f"🕐 {job['created_at'].replace('T', ' ')}")
+            with col3:
+                if job['status'] in ACTIVE_STATUSES:
+                    if st.button("⏹️ בטל", key=f"cancel_job_{job['id']}", disabled=bool(job['cancel_requested'])):
+                        jobs.cancel(job['id'])
+                        st.rerun(scope="fragment")
+                elif job['status'] in RESUMABLE_STATUSES:
+                    if st.button("▶️ המשך", key=f"resume_job_{job['id']}"):
+                        jobs.resume(job['id'])
+                        st.rerun()
+                if job['error_count'] and job['status'] not in ACTIVE_STATUSES:
+                    st.download_button("📥 שגיאות", error_report(jobs.errors(job['id'])),
+                                       f"import_errors_{job['id']}.csv", key=f"job_errors_{job['id']}")
+
+
+# === סעיפים - רק הסעיף הנבחר רץ ===
+SECTIONS = ["📊 דשבורד", "📥 ייבוא נתונים", "⚙️ ניהול מערכת"]
+section = section_selector("dashboard_manager", SECTIONS)
 
 # ========================================
-# טאב 1: דשבורד
+# סעיף 1: דשבורד
 # ========================================
-with tab_dashboard:
+def dashboard_section():
     try:
         today = datetime.now().date()
         month_start = today.replace(day=1)
         
-        activities_today = supabase.table("activities").select("*").eq("date", str(today)).execute()
-        activities_month = supabase.table("activities").select("*").gte("date", str(month_start)).execute()
-        activities_completed = supabase.table("activities").select("*").eq("status", "completed").gte("date", str(month_start)).execute()
-        employees = supabase.table("users").select("*").eq("role", "employee").eq("status", "active").execute()
-        schools = supabase.table("schools").select("*").eq("status", "active").execute()
-        equipment = supabase.table("equipment").select("*").execute()
-        low_stock = [item for item in equipment.data if item.get('quantity_available', 0) <= item.get('min_threshold', 0)]
+        end_date = (datetime.now() + timedelta(days=7)).date()
         
-        total_income = 0
-        if activities_completed.data and schools.data:
-            school_prices = {s['id']: s['price_per_day'] for s in schools.data}
-            for act in activities_completed.data:
-                total_income += school_prices.get(act.get('school_id'), 0)
+        # כל השאילתות של הדשבורד בלתי תלויות - רצות במקביל
+        results = fetch_parallel(
+            activities_today=lambda: count_activities(today, today),
+            activities_month=lambda: count_activities(month_start),
+            income_month=lambda: total_income(month_start, statuses=("completed",), school_status="active"),
+            employees=lambda: count_rows("users", (("eq", "role", "employee"), ("eq", "status", "active"))),
+            equipment=lambda: get_equipment(view="equipment.low_stock"),
+            upcoming=lambda: get_activities(today, end_date, view="activities.upcoming", limit=8)
+        )
+        activities_today = results['activities_today']
+        activities_month = results['activities_month']
+        employees = results['employees']
+        equipment = results['equipment']
+        upcoming = results['upcoming']
+        low_stock = [item for item in equipment if item.get('quantity_available', 0) <= item.get('min_threshold', 0)]
+        # הכנסות החודש - SQL על ההעתק המקומי
+        income_month = results['income_month']
     except Exception as e:
         st.error(f"שגיאה: {str(e)}")
-        activities_today = type('obj', (object,), {'data': []})()
-        activities_month = type('obj', (object,), {'data': []})()
-        employees = type('obj', (object,), {'data': []})()
-        schools = type('obj', (object,), {'data': []})()
+        activities_today = 0
+        activities_month = 0
+        employees = 0
         low_stock = []
-        total_income = 0
+        upcoming = []
+        income_month = 0
 
     # KPI Cards
     col1, col2, col3, col4, col5 = st.columns(5)
@@ -73,7 +132,7 @@ with tab_dashboard:
         st.markdown(f"""
         <div style='background: white; padding: 1.25rem; border-radius: 12px; border: 1px solid #E5E7EB; border-right: 4px solid #3B82F6;'>
             <div style='font-size: 0.8rem; color: #6B7280;'>📅 פעילויות היום</div>
-            <div style='font-size: 2rem; font-weight: 700; color: #1A2840;'>{len(activities_today.data) if activities_today.data else 0}</div>
+            <div style='font-size: 2rem; font-weight: 700; color: #1A2840;'>{activities_today}</div>
         </div>
         """, unsafe_allow_html=True)
     
@@ -81,7 +140,7 @@ with tab_dashboard:
         st.markdown(f"""
         <div style='background: white; padding: 1.25rem; border-radius: 12px; border: 1px solid #E5E7EB; border-right: 4px solid #10B981;'>
             <div style='font-size: 0.8rem; color: #6B7280;'>📆 פעילויות החודש</div>
-            <div style='font-size: 2rem; font-weight: 700; color: #1A2840;'>{len(activities_month.data) if activities_month.data else 0}</div>
+            <div style='font-size: 2rem; font-weight: 700; color: #1A2840;'>{activities_month}</div>
         </div>
         """, unsafe_allow_html=True)
     
@@ -89,7 +148,7 @@ with tab_dashboard:
         st.markdown(f"""
         <div style='background: white; padding: 1.25rem; border-radius: 12px; border: 1px solid #E5E7EB; border-right: 4px solid #047857;'>
             <div style='font-size: 0.8rem; color: #6B7280;'>💰 הכנסות החודש</div>
-            <div style='font-size: 2rem; font-weight: 700; color: #047857;'>₪{total_income:,}</div>
+            <div style='font-size: 2rem; font-weight: 700; color: #047857;'>₪{income_month:,}</div>
         </div>
         """, unsafe_allow_html=True)
     
@@ -97,7 +156,7 @@ with tab_dashboard:
         st.markdown(f"""
         <div style='background: white; padding: 1.25rem; border-radius: 12px; border: 1px solid #E5E7EB; border-right: 4px solid #6B7280;'>
             <div style='font-size: 0.8rem; color: #6B7280;'>👥 מדריכים פעילים</div>
-            <div style='font-size: 2rem; font-weight: 700; color: #1A2840;'>{len(employees.data) if employees.data else 0}</div>
+            <div style='font-size: 2rem; font-weight: 700; color: #1A2840;'>{employees}</div>
         </div>
         """, unsafe_allow_html=True)
     
@@ -117,26 +176,20 @@ with tab_dashboard:
     
     with col_table:
         st.markdown("#### 📅 פעילויות קרובות")
-        try:
-            end_date = (datetime.now() + timedelta(days=7)).date()
-            upcoming = supabase.table("activities").select("*, schools(name), users(full_name)").gte("date", str(today)).lte("date", str(end_date)).order("date").limit(8).execute()
-            
-            if upcoming.data:
-                for act in upcoming.data:
-                    status_icon = {'planned': '🟡', 'confirmed': '🟢', 'completed': '✅', 'cancelled': '🔴'}.get(act['status'], '⚪')
-                    emp_name = act['users']['full_name'] if act.get('users') else '❌ לא שובץ'
-                    school_name = act['schools']['name'] if act.get('schools') else '-'
-                    
-                    st.markdown(f"""
-                    <div style='background: white; padding: 0.75rem; border-radius: 8px; margin-bottom: 0.5rem; border-right: 3px solid #3B82F6;'>
-                        <span style='font-weight: 600;'>{status_icon} {act['date']}</span>
-                        <span style='color: #6B7280; margin-right: 1rem;'>🏫 {school_name} | 👷 {emp_name}</span>
-                    </div>
-                    """, unsafe_allow_html=True)
-            else:
-                st.info("אין פעילויות קרובות")
-        except Exception as e:
-            st.error(f"שגיאה: {str(e)}")
+        if upcoming:
+            for act in upcoming:
+                status_icon = {'planned': '🟡', 'confirmed': '🟢', 'completed': '✅', 'cancelled': '🔴'}.get(act['status'], '⚪')
+                emp_name = act['users']['full_name'] if act.get('users') else '❌ לא שובץ'
+                school_name = act['schools']['name'] if act.get('schools') else '-'
+                
+                st.markdown(f"""
+                <div style='background: white; padding: 0.75rem; border-radius: 8px; margin-bottom: 0.5rem; border-right: 3px solid #3B82F6;'>
+                    <span style='font-weight: 600;'>{status_icon} {act['date']}</span>
+                    <span style='color: #6B7280; margin-right: 1rem;'>🏫 {school_name} | 👷 {emp_name}</span>
+                </div>
+                """, unsafe_allow_html=True)
+        else:
+            st.info("אין פעילויות קרובות")
     
     with col_alerts:
         st.markdown("#### 🚨 התראות")
@@ -157,11 +210,11 @@ with tab_dashboard:
             """, unsafe_allow_html=True)
 
 # ========================================
-# טאב 2: ייבוא נתונים
+# סעיף 2: ייבוא נתונים
 # ========================================
-with tab_import:
+def import_section():
     st.markdown("### 📥 ייבוא נתונים היסטוריים")
-    st.info("💡 העלה קובץ Excel או CSV עם נתונים היסטוריים לייבוא למערכת")
+    st.info("💡 העלה קובץ Excel, CSV או Parquet/Arrow עם נתונים היסטוריים לייבוא למערכת")
     
     import_type = st.selectbox("סוג הנתונים לייבוא", 
         ["בתי ספר", "עובדים/מדריכים", "פעילויות היסטוריות", "רשומות כספיות"])
@@ -169,218 +222,104 @@ with tab_import:
     instructions = {
         "בתי ספר": "**עמודות:** name (חובה), contact_person, phone, email, price_per_day (חובה), address",
         "עובדים/מדריכים": "**עמודות:** full_name (חובה), email (חובה), phone, hourly_rate, daily_rate",
-        "פעילויות היסטוריות": "**עמודות:** date (YYYY-MM-DD), school_name, employee_name, time_start, time_end, status",
+        "פעילויות היסטוריות": "**עמודות:** date (DD/MM/YYYY, DD.MM.YYYY או YYYY-MM-DD), school_name, employee_name, time_start (H:MM), time_end, status",
         "רשומות כספיות": "**עמודות:** date (YYYY-MM-DD), type (income/expense), amount, category, description"
     }
     
     st.markdown(instructions[import_type])
     
-    uploaded_file = st.file_uploader("📁 העלה קובץ", type=['csv', 'xlsx', 'xls'])
+    uploaded_file = st.file_uploader("📁 העלה קובץ", type=['csv', 'xlsx', 'xls', 'parquet', 'arrow', 'feather'])
     
     if uploaded_file:
         try:
-            if uploaded_file.name.endswith('.csv'):
-                # ניסיון קידודים שונים
-                try:
-                    df = pd.read_csv(uploaded_file, encoding='utf-8')
-                except:
-                    uploaded_file.seek(0)
-                    try:
-                        df = pd.read_csv(uploaded_file, encoding='utf-8-sig')
-                    except:
-                        uploaded_file.seek(0)
-                        try:
-                            df = pd.read_csv(uploaded_file, encoding='cp1255')  # עברית
-                        except:
-                            uploaded_file.seek(0)
-                            df = pd.read_csv(uploaded_file, encoding='latin-1')
-            else:
-                df = pd.read_excel(uploaded_file)
-            
             st.markdown("#### 👀 תצוגה מקדימה:")
-            st.dataframe(df.head(10), use_container_width=True)
-            st.markdown(f"**סה״כ שורות:** {len(df)}")
+            st.dataframe(preview(uploaded_file), use_container_width=True)
+            st.markdown(f"**סה״כ שורות (משוער):** {estimate_rows(uploaded_file):,}")
             
-            if st.button("🚀 ייבא נתונים", use_container_width=True):
-                success_count = 0
-                error_count = 0
+            col1, col2 = st.columns(2)
+            with col1:
+                chunk_size = st.number_input("שורות לכל בקשה", min_value=1, max_value=5000,
+                                             value=IMPORT_CHUNK_SIZE, step=100)
+            with col2:
+                on_existing = st.radio("רשומות שכבר קיימות", ["skip", "update"], horizontal=True,
+                                       format_func=lambda x: {"skip": "דלג", "update": "עדכן"}[x])
+            
+            # בדיקה יבשה על כל הקובץ לפני כל כתיבה - הייבוא מוצע רק אחריה
+            dry_run_key = (getattr(uploaded_file, "file_id", uploaded_file.name), import_type, on_existing)
+            if st.button("🔍 בדיקה יבשה", use_container_width=True):
+                context = import_context(import_type, user['id'])
+                progress = st.progress(0.0, text="בודק...")
+                summary = validate_file(
+                    import_type, uploaded_file, context, on_existing,
+                    on_progress=lambda done, total: progress.progress(done / total, text=f"{done:,}/{total:,} שורות")
+                )
+                progress.empty()
+                suggestions = name_suggestions(uploaded_file, context) if import_type == "פעילויות היסטוריות" else []
+                st.session_state.import_dry_run = {"key": dry_run_key, "summary": summary, "names": suggestions}
+            
+            dry_run = st.session_state.get("import_dry_run")
+            if not dry_run or dry_run["key"] != dry_run_key:
+                st.caption("הרץ בדיקה יבשה כדי לראות מה ייובא לפני הכתיבה")
+            else:
+                summary = dry_run["summary"]
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric("שורות בקובץ", f"{summary['rows']:,}")
+                col2.metric("חדשות", f"{summary['new']:,}")
+                col3.metric("קיימות" + (" (יעודכנו)" if on_existing == "update" else " (ידולגו)"), f"{summary['existing']:,}")
+                col4.metric("שגיאות", f"{len(summary['errors']):,}")
                 
-                with st.spinner("מייבא..."):
-                    if import_type == "בתי ספר":
-                        for _, row in df.iterrows():
-                            try:
-                                supabase.table("schools").insert({
-                                    "name": row.get('name'),
-                                    "contact_person": row.get('contact_person') if pd.notna(row.get('contact_person')) else None,
-                                    "phone": str(row.get('phone', '')) if pd.notna(row.get('phone')) else None,
-                                    "email": row.get('email') if pd.notna(row.get('email')) else None,
-                                    "price_per_day": float(row.get('price_per_day', 0)),
-                                    "address": row.get('address') if pd.notna(row.get('address')) else None,
-                                    "status": "active"
-                                }).execute()
-                                success_count += 1
-                            except:
-                                error_count += 1
-                    
-                    elif import_type == "עובדים/מדריכים":
-                        for _, row in df.iterrows():
-                            try:
-                                supabase.table("users").insert({
-                                    "id": row.get('email'),
-                                    "email": row.get('email'),
-                                    "full_name": row.get('full_name'),
-                                    "phone": str(row.get('phone', '')) if pd.notna(row.get('phone')) else None,
-                                    "role": "employee",
-                                    "status": "active",
-                                    "hourly_rate": float(row.get('hourly_rate', 0)) if pd.notna(row.get('hourly_rate')) else 0,
-                                    "daily_rate": float(row.get('daily_rate', 0)) if pd.notna(row.get('daily_rate')) else 0
-                                }).execute()
-                                success_count += 1
-                            except:
-                                error_count += 1
-                    
-                    elif import_type == "פעילויות היסטוריות":
-                        schools_db = supabase.table("schools").select("id, name").execute()
-                        employees_db = supabase.table("users").select("id, full_name").eq("role", "employee").execute()
-                        school_map = {s['name'].strip(): s['id'] for s in schools_db.data} if schools_db.data else {}
-                        emp_map = {e['full_name'].strip(): e['id'] for e in employees_db.data} if employees_db.data else {}
-                        
-                        # מיפוי סטטוס עברית לאנגלית
-                        status_map = {
-                            'מלשוה': 'completed',
-                            'הושלם': 'completed',
-                            'הושלמה': 'completed',
-                            'completed': 'completed',
-                            'מתוכנן': 'planned',
-                            'מתוכננת': 'planned',
-                            'planned': 'planned',
-                            'מאושר': 'confirmed',
-                            'מאושרת': 'confirmed',
-                            'confirmed': 'confirmed',
-                            'בוטל': 'cancelled',
-                            'בוטלה': 'cancelled',
-                            'cancelled': 'cancelled'
-                        }
-                        
-                        # הצגת מידע לדיבוג
-                        st.markdown("#### 🔍 בדיקת התאמה:")
-                        st.markdown(f"**בתי ספר במערכת:** {list(school_map.keys())}")
-                        st.markdown(f"**מדריכים במערכת:** {list(emp_map.keys())}")
-                        
-                        errors_detail = []
-                        
-                        for idx, row in df.iterrows():
-                            try:
-                                school_name = str(row.get('school_name', '')).strip()
-                                emp_name = str(row.get('employee_name', '')).strip()
-                                
-                                school_id = school_map.get(school_name)
-                                emp_id = emp_map.get(emp_name)
-                                
-                                if not school_id:
-                                    error_count += 1
-                                    errors_detail.append(f"שורה {idx+2}: בית ספר '{school_name}' לא נמצא")
-                                    continue
-                                if not emp_id:
-                                    error_count += 1
-                                    errors_detail.append(f"שורה {idx+2}: מדריך '{emp_name}' לא נמצא")
-                                    continue
-                                
-                                # המרת תאריך - תמיכה בפורמטים שונים
-                                date_val = row.get('date')
-                                if pd.notna(date_val):
-                                    if isinstance(date_val, str):
-                                        date_val = date_val.strip()
-                                        # פורמט DD/MM/YYYY או D/MM/YYYY
-                                        if '/' in date_val:
-                                            parts = date_val.split('/')
-                                            if len(parts) == 3:
-                                                day = parts[0].zfill(2)
-                                                month = parts[1].zfill(2)
-                                                year = parts[2]
-                                                date_str = f"{year}-{month}-{day}"
-                                            else:
-                                                raise Exception("פורמט תאריך לא תקין")
-                                        # פורמט DD.MM.YYYY
-                                        elif '.' in date_val:
-                                            parts = date_val.split('.')
-                                            if len(parts) == 3:
-                                                day = parts[0].zfill(2)
-                                                month = parts[1].zfill(2)
-                                                year = parts[2]
-                                                date_str = f"{year}-{month}-{day}"
-                                            else:
-                                                raise Exception("פורמט תאריך לא תקין")
-                                        # פורמט YYYY-MM-DD
-                                        elif '-' in date_val:
-                                            date_str = date_val[:10]
-                                        else:
-                                            raise Exception("פורמט תאריך לא מוכר")
-                                    else:
-                                        # אם זה datetime object מ-Excel
-                                        date_str = pd.to_datetime(date_val).strftime('%Y-%m-%d')
-                                else:
-                                    error_count += 1
-                                    errors_detail.append(f"שורה {idx+2}: תאריך חסר")
-                                    continue
-                                
-                                # המרת סטטוס
-                                status_raw = str(row.get('status', 'completed')).strip() if pd.notna(row.get('status')) else 'completed'
-                                status = status_map.get(status_raw, 'completed')
-                                
-                                # המרת שעות
-                                time_start = str(row.get('time_start', '08:00')).strip()
-                                time_end = str(row.get('time_end', '14:00')).strip()
-                                # וידוא פורמט שעה
-                                if len(time_start) == 4:  # 8:00 -> 08:00
-                                    time_start = '0' + time_start
-                                if len(time_end) == 4:
-                                    time_end = '0' + time_end
-                                
-                                supabase.table("activities").insert({
-                                    "school_id": school_id,
-                                    "employee_id": emp_id,
-                                    "date": date_str,
-                                    "time_start": time_start,
-                                    "time_end": time_end,
-                                    "status": status,
-                                    "confirmed_by_employee": True
-                                }).execute()
-                                success_count += 1
-                            except Exception as e:
-                                error_count += 1
-                                errors_detail.append(f"שורה {idx+2}: {str(e)[:50]}")
-                        
-                        # הצגת שגיאות מפורטות
-                        if errors_detail:
-                            st.markdown("#### ❌ פירוט שגיאות:")
-                            for err in errors_detail[:20]:
-                                st.text(err)
-                    
-                    elif import_type == "רשומות כספיות":
-                        for _, row in df.iterrows():
-                            try:
-                                supabase.table("financial_records").insert({
-                                    "date": str(row.get('date'))[:10],
-                                    "type": row.get('type', 'expense'),
-                                    "amount": float(row.get('amount', 0)),
-                                    "category": row.get('category', 'אחר') if pd.notna(row.get('category')) else 'אחר',
-                                    "description": row.get('description') if pd.notna(row.get('description')) else None,
-                                    "created_by": user['id']
-                                }).execute()
-                                success_count += 1
-                            except:
-                                error_count += 1
+                # כל שם שלא נמצא בדיוק (גם התאמה קרובה מאוד) - לאישור. התאמה שאושרה נשמרת ככינוי,
+                # ורק אז השורות שלה נכנסות לייבוא
+                if dry_run["names"]:
+                    context = import_context(import_type)
+                    options = {"school": context["school_map"], "employee": context["emp_map"]}
+                    choices = {kind: [None] + sorted(names) for kind, names in options.items()}
+                    labels = {"school": "בית ספר", "employee": "מדריך"}
+                    with st.expander(f"🔤 {len(dry_run['names'])} שמות לא נמצאו בדיוק - נדרש אישור", expanded=True):
+                        with st.form("name_aliases"):
+                            chosen = []
+                            for i, item in enumerate(dry_run["names"]):
+                                names = choices[item["kind"]]
+                                default = names.index(item["match_name"]) if item["match_id"] else 0
+                                hint = f" (התאמה {item['score']:.0%})" if item["match_id"] else ""
+                                chosen.append((item, st.selectbox(
+                                    f"{labels[item['kind']]} '{item['name']}'{hint}", names, index=default,
+                                    format_func=lambda x: x or "— ללא התאמה —", key=f"alias_{i}")))
+                            if st.form_submit_button("💾 שמור התאמות", use_container_width=True):
+                                aliases = get_alias_store()
+                                for item, name in chosen:
+                                    if name:
+                                        aliases.add(item["kind"], item["name"], options[item["kind"]][name])
+                                del st.session_state.import_dry_run
+                                st.success("✅ ההתאמות נשמרו - הרץ שוב בדיקה יבשה")
                 
-                if success_count > 0:
-                    st.success(f"✅ יובאו {success_count} רשומות!")
-                    st.balloons()
-                if error_count > 0:
-                    st.warning(f"⚠️ {error_count} שגיאות")
+                confirmed = True
+                if summary["errors"]:
+                    st.markdown("#### ❌ פירוט שגיאות:")
+                    for line, message in summary["errors"][:20]:
+                        st.text(f"שורה {line}: {message}")
+                    if len(summary["errors"]) > 20:
+                        st.caption(f"ועוד {len(summary['errors']) - 20} שגיאות - ראה בדו״ח המלא")
+                    st.download_button("📥 הורד דו״ח שגיאות", error_report(summary["errors"]),
+                                       "import_errors.csv", use_container_width=True)
                     
+                    confirmed = st.checkbox("ייבא רק את השורות התקינות")
+                
+                to_write = summary["new"] + (summary["existing"] if on_existing == "update" else 0)
+                if st.button("🚀 ייבא נתונים", use_container_width=True, disabled=not confirmed or to_write == 0):
+                    get_import_jobs().submit(import_type, uploaded_file, import_context(import_type, user['id']),
+                                             int(chunk_size), on_existing, created_by=user['id'])
+                    del st.session_state.import_dry_run
+                    st.success("✅ הייבוא התחיל ברקע - אפשר להמשיך לעבוד או לסגור את הדף")
+            
         except Exception as e:
             st.error(f"❌ שגיאה: {str(e)}")
     
+    # עבודות ייבוא
+    st.markdown("---")
+    st.markdown("### 🗂️ עבודות ייבוא")
+    import_jobs_panel()
+    
     # תבניות להורדה
     st.markdown("---")
     st.markdown("### 📄 הורדת תבניות")
@@ -409,9 +348,9 @@ with tab_import:
         st.download_button("📥 תבנית פעילויות", template_activities.to_csv(index=False).encode('utf-8-sig'), "template_activities.csv", use_container_width=True)
 
 # ========================================
-# טאב 3: ניהול מערכת
+# סעיף 3: ניהול מערכת
 # ========================================
-with tab_admin:
+def admin_section():
     st.markdown("### ⚙️ ניהול מערכת")
     st.warning("⚠️ פעולות בדף זה הן בלתי הפיכות!")
     
@@ -420,16 +359,17 @@ with tab_admin:
     
     delete_type = st.selectbox("בחר מה למחוק", [
         "בחר...",
-        "פעילויות ישנות (לפני תאריך)",
+        "העברת פעילויות ישנות לארכיון (לפני תאריך)",
         "כל הפעילויות",
         "כל הרשומות הכספיות",
         "כל דיווחי הציוד",
         "🔴 איפוס מלא"
     ])
     
-    if delete_type == "פעילויות ישנות (לפני תאריך)":
-        delete_before = st.date_input("מחק פעילויות לפני", value=datetime.now().date() - timedelta(days=365))
-        st.info(f"ימחקו כל הפעילויות מלפני {delete_before}")
+    if delete_type == "העברת פעילויות ישנות לארכיון (לפני תאריך)":
+        delete_before = st.date_input("העבר לארכיון פעילויות לפני", value=datetime.now().date() - timedelta(days=365))
+        st.info(f"הפעילויות מלפני {delete_before} יישמרו בקבצי ארכיון (שנה לכל מחיצה) ואז יימחקו מהטבלה הפעילה. "
+                "הניתוחים ממשיכים לקרוא אותן מהארכיון")
     
     if delete_type != "בחר...":
         st.markdown("---")
@@ -446,23 +386,28 @@ with tab_admin:
                 else:
                     try:
                         with st.spinner("מוחק..."):
-                            if delete_type == "פעילויות ישנות (לפני תאריך)":
-                                supabase.table("activities").delete().lt("date", str(delete_before)).execute()
-                                st.success(f"✅ נמחקו פעילויות מלפני {delete_before}")
+                            if delete_type == "העברת פעילויות ישנות לארכיון (לפני תאריך)":
+                                progress = st.progress(0.0, text="שומר לארכיון...")
+                                phases = {"archive": "שומר לארכיון", "delete": "מוחק מהטבלה הפעילה"}
+                                result = archive_activities(
+                                    delete_before,
+                                    on_progress=lambda phase, done, total: progress.progress(
+                                        min(done / max(total, 1), 1.0), text=f"{phases[phase]}: {done:,}/{total:,}"))
+                                st.success(f"✅ {result['archived']:,} פעילויות נשמרו בארכיון ו-{result['deleted']:,} נמחקו")
                             elif delete_type == "כל הפעילויות":
-                                supabase.table("activities").delete().neq("id", "00000000-0000-0000-0000-000000000000").execute()
+                                delete("activities", ALL_ROWS)
                                 st.success("✅ נמחקו כל הפעילויות")
                             elif delete_type == "כל הרשומות הכספיות":
-                                supabase.table("financial_records").delete().neq("id", "00000000-0000-0000-0000-000000000000").execute()
+                                delete("financial_records", ALL_ROWS)
                                 st.success("✅ נמחקו כל הרשומות")
                             elif delete_type == "כל דיווחי הציוד":
-                                supabase.table("equipment_reports").delete().neq("id", "00000000-0000-0000-0000-000000000000").execute()
+                                delete("equipment_reports", ALL_ROWS)
                                 st.success("✅ נמחקו כל הדיווחים")
                             elif delete_type == "🔴 איפוס מלא":
-                                supabase.table("equipment_reports").delete().neq("id", "00000000-0000-0000-0000-000000000000").execute()
-                                supabase.table("financial_records").delete().neq("id", "00000000-0000-0000-0000-000000000000").execute()
-                                supabase.table("activities").delete().neq("id", "00000000-0000-0000-0000-000000000000").execute()
-                                supabase.table("school_budgets").delete().neq("id", "00000000-0000-0000-0000-000000000000").execute()
+                                delete("equipment_reports", ALL_ROWS)
+                                delete("financial_records", ALL_ROWS)
+                                delete("activities", ALL_ROWS)
+                                delete("school_budgets", ALL_ROWS)
                                 st.success("✅ המערכת אופסה")
                             st.rerun()
                     except Exception as e:
@@ -472,6 +417,14 @@ with tab_admin:
             if st.button("❌ ביטול", use_container_width=True):
                 st.rerun()
     
+    # ארכיון
+    archived = archive_stats()
+    if archived:
+        st.markdown("---")
+        st.markdown("### 🗄️ ארכיון פעילויות")
+        st.dataframe(pd.DataFrame({"שנה": list(archived), "פעילויות": list(archived.values())}),
+                     use_container_width=True, hide_index=True)
+    
     # סטטיסטיקות
     st.markdown("---")
     st.markdown("### 📊 סטטיסטיקות מערכת")
@@ -479,16 +432,69 @@ with tab_admin:
     try:
         col1, col2, col3, col4 = st.columns(4)
         with col1:
-            count = supabase.table("schools").select("id").execute()
-            st.metric("בתי ספר", len(count.data) if count.data else 0)
+            st.metric("בתי ספר", count_rows("schools"))
         with col2:
-            count = supabase.table("users").select("id").execute()
-            st.metric("משתמשים", len(count.data) if count.data else 0)
+            st.metric("משתמשים", count_rows("users"))
         with col3:
-            count = supabase.table("activities").select("id").execute()
-            st.metric("פעילויות", len(count.data) if count.data else 0)
+            # טבלה גדולה - מספיקה הערכה
+            st.metric("פעילויות", count_rows("activities", method="estimated"))
         with col4:
-            count = supabase.table("equipment").select("id").execute()
-            st.metric("פריטי ציוד", len(count.data) if count.data else 0)
+            st.metric("פריטי ציוד", count_rows("equipment"))
     except:
-        pass
\ No newline at end of file
+        pass
+    
+    # ביצועי שאילתות
+    st.markdown("---")
+    st.markdown("### 📈 ביצועי שאילתות")
+    
+    try:
+        log = session_log()
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("שאילתות בסשן", len(log))
+        with col2:
+            st.metric("זמן כולל", f"{sum(q['ms'] for q in log) / 1000:,.1f} שנ'")
+        with col3:
+            if MEASURE_PAYLOAD:
+                st.metric("נתונים שהורדו", f"{sum(q['bytes'] for q in log) / 1024:,.0f} KB")
+            else:
+                st.metric("נתונים שהורדו", "-", help="נמדד רק לשאילתות איטיות. למדידה מלאה: DREAM_BUILD_MEASURE_PAYLOAD=1")
+        with col4:
+            st.metric("שגיאות", len([q for q in log if q['error']]))
+        
+        memo = run_stats()
+        st.caption(f"🔁 בריצה הנוכחית: {memo['calls']} קריאות לנתונים, {memo['collapsed']} מהן הוגשו מה-memo בלי שאילתה")
+        
+        perf_view = st.radio("הצג:", ["לפי עמוד (סשן)", "לפי עמוד (כל המשתמשים)", "שאילתות איטיות", "אחרונות"], horizontal=True)
+        
+        if perf_view == "לפי עמוד (סשן)":
+            st.dataframe(session_summary(), use_container_width=True, hide_index=True)
+        elif perf_view == "לפי עמוד (כל המשתמשים)":
+            st.dataframe(page_summary(), use_container_width=True, hide_index=True)
+        elif perf_view == "שאילתות איטיות":
+            slow = slow_queries()
+            if slow:
+                st.dataframe(pd.DataFrame(slow), use_container_width=True, hide_index=True)
+            else:
+                st.info(f"אין שאילתות מעל {SLOW_QUERY_MS:.0f}ms")
+        else:
+            st.dataframe(pd.DataFrame(log[-50:][::-1]), use_container_width=True, hide_index=True)
+        
+        # מצב פיתוח: עמודות שה-views מורידים ואף מסך לא קרא (מועמדות להסרה מה-view)
+        if DEV_MODE:
+            unused = unused_columns()
+            with st.expander(f"🧹 עמודות שיורדות ולא נקראות ({sum(len(c) for c in unused.values())})"):
+                if unused:
+                    st.dataframe(pd.DataFrame([{"view": view, "עמודות": ", ".join(columns)} for view, columns in unused.items()]),
+                                 use_container_width=True, hide_index=True)
+                else:
+                    st.info("כל העמודות שהורדו נקראו")
+        
+        if st.button("🔄 איפוס מדידות"):
+            reset_stats()
+            st.rerun()
+    except Exception as e:
+        st.error(f"שגיאה: {str(e)}")
+
+
+render_section(section, dict(zip(SECTIONS, [dashboard_section, import_section, admin_section])))
@@ -1,8 +1,9 @@
 import streamlit as st
 from utils.auth import require_role
 from utils.styling import apply_custom_css
-from utils.supabase_client import supabase
+from utils.data import begin_run, get_employees, get_activities, count_activities, insert, update, delete, by_id
 from utils.nav import render_sidebar
+from utils.analytics import payroll_summary
 import pandas as pd
 from datetime import datetime, timedelta
 import plotly.graph_objects as go
@@ -11,6 +12,7 @@ import plotly.graph_objects as go
 st.set_page_config(page_title="ניהול עובדים | Dream & Build", page_icon="👥", layout="wide")
 apply_custom_css()
 render_sidebar()
+begin_run()
 
 # === וידוא הרשאות ===
 user = require_role('manager')
@@ -41,36 +43,29 @@ with tab1:
     
     try:
         # שליפת עובדים
-        query = supabase.table("users").select("*").eq("role", "employee").order("full_name")
-        if search:
-            query = query.or_(f"full_name.ilike.%{search}%,email.ilike.%{search}%")
-        if status_filter == "פעילים":
-            query = query.eq("status", "active")
-        elif status_filter == "ארכיון":
-            query = query.eq("status", "archived")
-        
-        employees = query.execute()
+        emp_status = {"פעילים": "active", "ארכיון": "archived", "הכל": None}[status_filter]
+        employees = get_employees(emp_status, search or None)
         
         # שליפת פעילויות לסטטיסטיקה
         month_start = datetime.now().replace(day=1).date()
-        activities = supabase.table("activities").select("employee_id, status").gte("date", str(month_start)).execute()
+        activities = get_activities(month_start, view="activities.employee_status")
         
         # חישוב פעילויות לכל עובד
         emp_activities = {}
         emp_completed = {}
-        if activities.data:
-            for act in activities.data:
+        if activities:
+            for act in activities:
                 eid = act['employee_id']
                 if eid:
                     emp_activities[eid] = emp_activities.get(eid, 0) + 1
                     if act['status'] == 'completed':
                         emp_completed[eid] = emp_completed.get(eid, 0) + 1
         
-        if employees.data:
+        if employees:
             # סטטיסטיקות
             col_s1, col_s2, col_s3 = st.columns(3)
-            total_emps = len(employees.data)
-            active_emps = len([e for e in employees.data if e.get('status') == 'active'])
+            total_emps = len(employees)
+            active_emps = len([e for e in employees if e.get('status') == 'active'])
             total_month_activities = sum(emp_activities.values())
             
             with col_s1:
@@ -84,7 +79,7 @@ with tab1:
             
             # טבלת עובדים
             rows = []
-            for emp in employees.data:
+            for emp in employees:
                 eid = emp['id']
                 status_badge = "✅ פעיל" if emp.get('status') == 'active' else "❌ לא פעיל"
                 
@@ -108,11 +103,11 @@ with tab1:
             st.markdown("---")
             st.markdown("### ⚙️ עריכת עובד")
             
-            emp_names = [e['full_name'] for e in employees.data]
+            emp_names = [e['full_name'] for e in employees]
             selected_name = st.selectbox("בחר עובד", emp_names)
             
             if selected_name:
-                selected_emp = next(e for e in employees.data if e['full_name'] == selected_name)
+                selected_emp = next(e for e in employees if e['full_name'] == selected_name)
                 
                 with st.form("edit_employee"):
                     col1, col2 = st.columns(2)
@@ -130,13 +125,13 @@ with tab1:
                         edit_daily = st.number_input("תעריף יומי (₪)", value=float(selected_emp.get('daily_rate', 0) or 0), min_value=0.0)
                     
                     if st.form_submit_button("💾 שמור שינויים", use_container_width=True):
-                        supabase.table("users").update({
+                        update("users", {
                             "full_name": edit_name,
                             "phone": edit_phone or None,
                             "hourly_rate": edit_hourly,
                             "daily_rate": edit_daily,
                             "status": edit_status
-                        }).eq("id", selected_emp['id']).execute()
+                        }, by_id(selected_emp['id']))
                         st.success("✅ נשמר!")
                         st.rerun()
                 
@@ -145,20 +140,20 @@ with tab1:
                 st.markdown("#### 🗑️ הסרת עובד")
                 
                 # בדיקה אם יש פעילויות לעובד
-                emp_activities = supabase.table("activities").select("id").eq("employee_id", selected_emp['id']).execute()
-                has_activities = len(emp_activities.data) > 0 if emp_activities.data else False
+                emp_activity_count = count_activities(employee_id=selected_emp['id'])
+                has_activities = emp_activity_count > 0
                 
                 if has_activities:
-                    st.warning(f"⚠️ לעובד זה יש {len(emp_activities.data)} פעילויות. לא ניתן למחוק לצמיתות - רק להעביר לארכיון.")
+                    st.warning(f"⚠️ לעובד זה יש {emp_activity_count} פעילויות. לא ניתן למחוק לצמיתות - רק להעביר לארכיון.")
                     
                     if selected_emp.get('status') == 'active':
                         if st.button("📦 העבר לארכיון (לא פעיל)", key="archive_emp", use_container_width=True):
-                            supabase.table("users").update({"status": "archived"}).eq("id", selected_emp['id']).execute()
+                            update("users", {"status": "archived"}, by_id(selected_emp['id']))
                             st.success("✅ העובד הועבר לארכיון")
                             st.rerun()
                     elif selected_emp.get('status') == 'archived':
                         if st.button("♻️ שחזר מארכיון", key="restore_emp", use_container_width=True):
-                            supabase.table("users").update({"status": "active"}).eq("id", selected_emp['id']).execute()
+                            update("users", {"status": "active"}, by_id(selected_emp['id']))
                             st.success("✅ העובד שוחזר")
                             st.rerun()
                 else:
@@ -166,12 +161,12 @@ with tab1:
                     with col_archive:
                         if selected_emp.get('status') == 'active':
                             if st.button("📦 העבר לארכיון", key="archive_emp2", use_container_width=True):
-                                supabase.table("users").update({"status": "archived"}).eq("id", selected_emp['id']).execute()
+                                update("users", {"status": "archived"}, by_id(selected_emp['id']))
                                 st.success("✅ הועבר לארכיון")
                                 st.rerun()
                         else:
                             if st.button("♻️ שחזר", key="restore_emp2", use_container_width=True):
-                                supabase.table("users").update({"status": "active"}).eq("id", selected_emp['id']).execute()
+                                update("users", {"status": "active"}, by_id(selected_emp['id']))
                                 st.success("✅ שוחזר")
                                 st.rerun()
                     with col_delete:
@@ -184,7 +179,7 @@ with tab1:
                         col1, col2 = st.columns(2)
                         with col1:
                             if st.button("✅ כן, מחק", key="confirm_del_emp", use_container_width=True):
-                                supabase.table("users").delete().eq("id", selected_emp['id']).execute()
+                                delete("users", by_id(selected_emp['id']))
                                 st.success("🗑️ העובד נמחק")
                                 del st.session_state['confirm_delete_emp']
                                 st.rerun()
@@ -212,46 +207,13 @@ with tab2:
     
     if st.button("🧮 חשב שכר", use_container_width=True):
         try:
-            # שליפת עובדים
-            employees = supabase.table("users").select("id, full_name, hourly_rate, daily_rate").eq("role", "employee").execute()
-            
-            # שליפת פעילויות שהושלמו
-            activities = supabase.table("activities") \
-                .select("employee_id, time_start, time_end") \
-                .gte("date", str(start_date)) \
-                .lte("date", str(end_date)) \
-                .eq("status", "completed") \
-                .execute()
+            # ספירת פעילויות וחישוב השכר ב-SQL על ההעתק המקומי - אותו חישוב כמו בייצוא השכר
+            payroll = payroll_summary(start_date, end_date)
             
-            if employees.data:
-                salary_data = []
-                
-                for emp in employees.data:
-                    eid = emp['id']
-                    emp_acts = [a for a in activities.data if a['employee_id'] == eid] if activities.data else []
-                    count = len(emp_acts)
-                    
-                    # חישוב שכר
-                    salary = 0
-                    method = "-"
-                    
-                    if emp.get('daily_rate') and emp['daily_rate'] > 0:
-                        salary = count * emp['daily_rate']
-                        method = "יומי"
-                    elif emp.get('hourly_rate') and emp['hourly_rate'] > 0:
-                        # חישוב שעות (הערכה של 5 שעות לפעילות)
-                        hours = count * 5
-                        salary = hours * emp['hourly_rate']
-                        method = "שעתי"
-                    
-                    salary_data.append({
-                        'עובד': emp['full_name'],
-                        'פעילויות': count,
-                        'שיטת חישוב': method,
-                        'שכר': salary
-                    })
-                
-                df_salary = pd.DataFrame(salary_data)
+            if not payroll.empty:
+                df_salary = payroll.rename(columns={
+                    'full_name': 'עובד', 'activities': 'פעילויות', 'method': 'שיטת חישוב', 'salary': 'שכר'
+                })[['עובד', 'פעילויות', 'שיטת חישוב', 'שכר']]
                 
                 # סיכום
                 total_salary = df_salary['שכר'].sum()
@@ -309,7 +271,7 @@ with tab3:
             else:
                 try:
                     # יצירת משתמש (בגרסה פשוטה - ישירות לטבלה)
-                    supabase.table("users").insert({
+                    insert("users", {
                         "id": new_email,  # ID זמני
                         "email": new_email,
                         "full_name": new_name,
@@ -318,7 +280,7 @@ with tab3:
                         "status": "active",
                         "hourly_rate": new_hourly,
                         "daily_rate": new_daily
-                    }).execute()
+                    })
                     st.success(f"✅ העובד '{new_name}' נוסף בהצלחה!")
                     st.balloons()
                     st.rerun()
@@ -1,8 +1,10 @@
 import streamlit as st
 from utils.auth import check_auth
 from utils.styling import apply_custom_css
-from utils.supabase_client import supabase
+from utils.data import begin_run, get_equipment, get_equipment_reports, insert, update, by_id
 from utils.nav import render_sidebar
+from utils.sections import held_rows, after_write
+from utils.board import render_board
 import pandas as pd
 from datetime import datetime
 
@@ -10,6 +12,7 @@ from datetime import datetime
 st.set_page_config(page_title="ניהול ציוד | Dream & Build", page_icon="🔧", layout="wide")
 apply_custom_css()
 render_sidebar()
+begin_run()
 
 # === וידוא הרשאות ===
 user = check_auth()
@@ -44,19 +47,13 @@ if is_manager:
         
         try:
             # שליפת ציוד
-            query = supabase.table("equipment").select("*").order("name")
-            if search:
-                query = query.ilike("name", f"%{search}%")
-            if category_filter != "הכל":
-                query = query.eq("category", category_filter)
+            equipment = get_equipment(search or None, category_filter if category_filter != "הכל" else None)
             
-            equipment = query.execute()
-            
-            if equipment.data:
+            if equipment:
                 # סטטיסטיקות
-                total_items = len(equipment.data)
-                low_stock = [e for e in equipment.data if (e.get('quantity_available', 0) or 0) <= (e.get('min_threshold', 0) or 0)]
-                out_of_stock = [e for e in equipment.data if (e.get('quantity_available', 0) or 0) == 0]
+                total_items = len(equipment)
+                low_stock = [e for e in equipment if (e.get('quantity_available', 0) or 0) <= (e.get('min_threshold', 0) or 0)]
+                out_of_stock = [e for e in equipment if (e.get('quantity_available', 0) or 0) == 0]
                 
                 col_s1, col_s2, col_s3 = st.columns(3)
                 with col_s1:
@@ -70,7 +67,7 @@ if is_manager:
                 
                 # טבלת מלאי
                 rows = []
-                for item in equipment.data:
+                for item in equipment:
                     qty = item.get('quantity_available', 0) or 0
                     threshold = item.get('min_threshold', 0) or 0
                     
@@ -100,11 +97,11 @@ if is_manager:
                 st.markdown("---")
                 st.markdown("### ⚙️ עדכון מלאי")
                 
-                item_names = [e['name'] for e in equipment.data]
+                item_names = [e['name'] for e in equipment]
                 selected_item_name = st.selectbox("בחר פריט", item_names)
                 
                 if selected_item_name:
-                    selected_item = next(e for e in equipment.data if e['name'] == selected_item_name)
+                    selected_item = next(e for e in equipment if e['name'] == selected_item_name)
                     
                     with st.form("update_stock"):
                         col1, col2 = st.columns(2)
@@ -115,10 +112,10 @@ if is_manager:
                             edit_threshold = st.number_input("מינימום להתראה", value=int(selected_item.get('min_threshold', 0) or 0), min_value=0)
                         
                         if st.form_submit_button("💾 עדכן", use_container_width=True):
-                            supabase.table("equipment").update({
+                            update("equipment", {
                                 "quantity_available": edit_qty,
                                 "min_threshold": edit_threshold
-                            }).eq("id", selected_item['id']).execute()
+                            }, by_id(selected_item['id']))
                             st.success("✅ עודכן!")
                             st.rerun()
             else:
@@ -132,11 +129,11 @@ if is_manager:
         st.markdown("### ⚠️ פריטים הדורשים התייחסות")
         
         try:
-            equipment = supabase.table("equipment").select("*").execute()
+            equipment = get_equipment(view="equipment.stock")
             
-            if equipment.data:
+            if equipment:
                 alerts = []
-                for item in equipment.data:
+                for item in equipment:
                     qty = item.get('quantity_available', 0) or 0
                     threshold = item.get('min_threshold', 0) or 0
                     
@@ -201,13 +198,13 @@ if is_manager:
                     st.error("❌ נא למלא שם פריט")
                 else:
                     try:
-                        supabase.table("equipment").insert({
+                        insert("equipment", {
                             "name": new_name,
                             "category": new_category,
                             "quantity_available": new_qty,
                             "min_threshold": new_threshold,
                             "notes": new_notes or None
-                        }).execute()
+                        })
                         st.success(f"✅ הפריט '{new_name}' נוסף!")
                         st.balloons()
                         st.rerun()
@@ -215,47 +212,38 @@ if is_manager:
                         st.error(f"❌ שגיאה: {str(e)}")
     
     # מנהל - טאב 4: דיווחי עובדים
-    with tab4:
+    # הרשימה היא fragment: "סמן כטופל" מעדכן את השורה המוחזקת ומריץ מחדש רק את הרשימה
+    @st.fragment
+    def reports_list():
         st.markdown("### 📝 דיווחי חוסרים מעובדים")
         
         try:
-            reports = supabase.table("equipment_reports") \
-                .select("*, users(full_name), equipment(name)") \
-                .order("created_at", desc=True) \
-                .limit(50) \
-                .execute()
+            reports = held_rows("equipment_reports", lambda: get_equipment_reports(limit=50))
             
-            if reports.data:
-                for report in reports.data:
-                    status_color = "#FEF3C7" if report.get('status') == 'pending' else "#D1FAE5"
-                    status_text = "ממתין" if report.get('status') == 'pending' else "טופל"
-                    
-                    st.markdown(f"""
-                    <div style='background: {status_color}; padding: 1rem; border-radius: 10px; margin-bottom: 0.5rem;'>
-                        <div style='display: flex; justify-content: space-between;'>
-                            <div>
-                                <div style='font-weight: 600;'>{report['equipment']['name'] if report.get('equipment') else 'לא ידוע'}</div>
-                                <div style='font-size: 0.85rem; color: #6B7280;'>
-                                    דיווח: {report['users']['full_name'] if report.get('users') else '-'} | 
-                                    {report.get('created_at', '')[:10]}
-                                </div>
-                                <div style='font-size: 0.9rem; margin-top: 0.25rem;'>{report.get('description', '')}</div>
-                            </div>
-                            <span style='font-size: 0.8rem;'>{status_text}</span>
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    # כפתור לסימון כטופל
-                    if report.get('status') == 'pending':
-                        if st.button("✅ סמן כטופל", key=f"resolve_{report['id']}"):
-                            supabase.table("equipment_reports").update({"status": "resolved"}).eq("id", report['id']).execute()
-                            st.rerun()
+            if reports:
+                # כל הדיווחים בטבלה אחת; "סמן כטופל" לדיווח שנבחר
+                board = pd.DataFrame([{
+                    'ציוד': report['equipment']['name'] if report.get('equipment') else 'לא ידוע',
+                    'דיווח': report['users']['full_name'] if report.get('users') else '-',
+                    'תאריך': (report.get('created_at') or '')[:10],
+                    'תיאור': report.get('description') or '',
+                    'סטטוס': '⏳ ממתין' if report.get('status') == 'pending' else '✅ טופל',
+                } for report in reports])
+                selected_idx = render_board(board)
+                
+                if selected_idx is not None and reports[selected_idx].get('status') == 'pending':
+                    report = reports[selected_idx]
+                    if st.button(f"✅ סמן כטופל - {board.iloc[selected_idx]['ציוד']}", key=f"resolve_{report['id']}"):
+                        update("equipment_reports", {"status": "resolved"}, by_id(report['id']))
+                        after_write("equipment_reports", report['id'], {"status": "resolved"})
             else:
                 st.success("✅ אין דיווחים ממתינים")
                 
         except Exception as e:
             st.error(f"שגיאה: {str(e)}")
+    
+    with tab4:
+        reports_list()
 
 # ========================================
 # עובד - טאב 1: דיווח חוסר
@@ -265,11 +253,11 @@ else:
         st.markdown("### 📝 דיווח על חוסר ציוד")
         
         try:
-            equipment = supabase.table("equipment").select("id, name").order("name").execute()
+            equipment = get_equipment(view="equipment.options")
             
-            if equipment.data:
+            if equipment:
                 with st.form("report_shortage"):
-                    item_options = {e['name']: e['id'] for e in equipment.data}
+                    item_options = {e['name']: e['id'] for e in equipment}
                     selected_item = st.selectbox("בחר פריט", list(item_options.keys()))
                     
                     report_type = st.selectbox("סוג הדיווח", ["חוסר במלאי", "פריט פגום", "צריך להזמין", "אחר"])
@@ -279,13 +267,13 @@ else:
                         if not description:
                             st.error("❌ נא לתאר את הבעיה")
                         else:
-                            supabase.table("equipment_reports").insert({
+                            insert("equipment_reports", {
                                 "equipment_id": item_options[selected_item],
                                 "reported_by": user['id'],
                                 "report_type": report_type,
                                 "description": description,
                                 "status": "pending"
-                            }).execute()
+                            })
                             st.success("✅ הדיווח נשלח בהצלחה!")
                             st.balloons()
             else:
@@ -299,14 +287,10 @@ else:
         st.markdown("### 📋 הדיווחים שלי")
         
         try:
-            my_reports = supabase.table("equipment_reports") \
-                .select("*, equipment(name)") \
-                .eq("reported_by", user['id']) \
-                .order("created_at", desc=True) \
-                .execute()
+            my_reports = get_equipment_reports(reported_by=user['id'])
             
-            if my_reports.data:
-                for report in my_reports.data:
+            if my_reports:
+                for report in my_reports:
                     status_color = "#FEF3C7" if report.get('status') == 'pending' else "#D1FAE5"
                     status_text = "⏳ ממתין" if report.get('status') == 'pending' else "✅ טופל"
                     
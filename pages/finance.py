@@ -1,7 +1,9 @@
 import streamlit as st
 from utils.auth import require_role
 from utils.styling import apply_custom_css
-from utils.supabase_client import supabase
+from utils.data import begin_run, get_activities, get_financial_records, insert
+from utils.analytics import activity_summary_by_school, financial_summary
+from utils.exports import EXPORTS, export_file_name
 from utils.nav import render_sidebar
 import pandas as pd
 from datetime import datetime, timedelta
@@ -12,6 +14,7 @@ import plotly.express as px
 st.set_page_config(page_title="דוחות כספיים | Dream & Build", page_icon="💰", layout="wide")
 apply_custom_css()
 render_sidebar()
+begin_run()
 
 # === וידוא הרשאות ===
 user = require_role('manager')
@@ -25,7 +28,7 @@ st.markdown("""
 st.markdown("<div style='height: 1rem;'></div>", unsafe_allow_html=True)
 
 # === טאבים ===
-tab1, tab2, tab3, tab4 = st.tabs(["📊 סיכום", "📈 הכנסות (אוטומטי)", "📉 הוצאות", "➕ הוספת רשומה"])
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 סיכום", "📈 הכנסות (אוטומטי)", "📉 הוצאות", "➕ הוספת רשומה", "📦 ייצוא"])
 
 # ========================================
 # טאב 1: סיכום
@@ -40,46 +43,20 @@ with tab1:
     
     try:
         # === הכנסות (מפעילויות) ===
-        activities = supabase.table("activities") \
-            .select("school_id, status") \
-            .gte("date", str(start_date)) \
-            .lte("date", str(end_date)) \
-            .in_("status", ["completed", "confirmed"]) \
-            .execute()
+        # אגרגציה ב-SQL על ההעתק המקומי במקום להוריד את כל הפעילויות
+        income_summary = activity_summary_by_school(start_date, end_date, statuses=("completed", "confirmed"))
+        total_income = int(round(income_summary['income'].sum())) if not income_summary.empty else 0
+        income_by_school = income_summary.groupby('school_name')['income'].sum().to_dict()
         
-        schools = supabase.table("schools").select("id, name, price_per_day").execute()
-        school_prices = {s['id']: s.get('price_per_day', 0) or 0 for s in schools.data} if schools.data else {}
-        school_names = {s['id']: s['name'] for s in schools.data} if schools.data else {}
+        # === הוצאות והכנסות נוספות (ידניות) ===
+        records = financial_summary(start_date, end_date)
+        expenses = records[records['type'] == 'expense']
         
-        total_income = 0
-        income_by_school = {}
-        if activities.data:
-            for act in activities.data:
-                sid = act['school_id']
-                price = school_prices.get(sid, 0)
-                total_income += price
-                name = school_names.get(sid, 'לא ידוע')
-                income_by_school[name] = income_by_school.get(name, 0) + price
+        total_expenses = expenses['amount'].sum() if not expenses.empty else 0
         
-        # === הוצאות (ידניות) ===
-        expenses = supabase.table("financial_records") \
-            .select("*") \
-            .eq("type", "expense") \
-            .gte("date", str(start_date)) \
-            .lte("date", str(end_date)) \
-            .execute()
+        additional_income = records[records['type'] == 'income']
         
-        total_expenses = sum([e.get('amount', 0) for e in expenses.data]) if expenses.data else 0
-        
-        # === הכנסות נוספות (ידניות) ===
-        additional_income = supabase.table("financial_records") \
-            .select("*") \
-            .eq("type", "income") \
-            .gte("date", str(start_date)) \
-            .lte("date", str(end_date)) \
-            .execute()
-        
-        additional_income_total = sum([e.get('amount', 0) for e in additional_income.data]) if additional_income.data else 0
+        additional_income_total = additional_income['amount'].sum() if not additional_income.empty else 0
         
         # === KPIs ===
         col1, col2, col3, col4 = st.columns(4)
@@ -142,9 +119,8 @@ with tab1:
         
         with col_chart2:
             st.markdown("#### 💸 הוצאות לפי קטגוריה")
-            if expenses.data:
-                df_exp = pd.DataFrame(expenses.data)
-                exp_by_cat = df_exp.groupby('category')['amount'].sum().reset_index()
+            if not expenses.empty:
+                exp_by_cat = expenses.groupby('category')['amount'].sum().reset_index()
                 
                 fig2 = go.Figure()
                 fig2.add_trace(go.Bar(
@@ -174,18 +150,12 @@ with tab2:
         inc_end = st.date_input("עד תאריך", value=datetime.now().date(), key="inc_end")
     
     try:
-        activities = supabase.table("activities") \
-            .select("*, schools(name, price_per_day)") \
-            .gte("date", str(inc_start)) \
-            .lte("date", str(inc_end)) \
-            .in_("status", ["completed", "confirmed"]) \
-            .order("date") \
-            .execute()
+        activities = get_activities(inc_start, inc_end, statuses=("completed", "confirmed"), view="activities.income_detail")
         
-        if activities.data:
+        if activities:
             rows = []
             total = 0
-            for act in activities.data:
+            for act in activities:
                 price = act['schools']['price_per_day'] if act.get('schools') else 0
                 total += price
                 rows.append({
@@ -223,16 +193,10 @@ with tab3:
         exp_end = st.date_input("עד תאריך", value=datetime.now().date(), key="exp_end")
     
     try:
-        expenses = supabase.table("financial_records") \
-            .select("*") \
-            .eq("type", "expense") \
-            .gte("date", str(exp_start)) \
-            .lte("date", str(exp_end)) \
-            .order("date", desc=True) \
-            .execute()
+        expenses = get_financial_records("expense", exp_start, exp_end, desc=True)
         
-        if expenses.data:
-            df = pd.DataFrame(expenses.data)
+        if expenses:
+            df = pd.DataFrame(expenses)
             df_display = df[['date', 'category', 'description', 'amount']].copy()
             df_display.columns = ['תאריך', 'קטגוריה', 'תיאור', 'סכום']
             
@@ -274,15 +238,50 @@ with tab4:
                 st.error("❌ נא להזין סכום")
             else:
                 try:
-                    supabase.table("financial_records").insert({
+                    insert("financial_records", {
                         "type": record_type,
                         "amount": amount,
                         "category": category,
                         "date": str(record_date),
                         "description": description or None,
                         "created_by": user['id']
-                    }).execute()
+                    })
                     st.success("✅ נשמר!")
                     st.rerun()
                 except Exception as e:
                     st.error(f"❌ שגיאה: {str(e)}")
+
+# ========================================
+# טאב 5: ייצוא
+# ========================================
+with tab5:
+    st.markdown("### 📦 ייצוא לקובץ Parquet")
+    st.info("💡 הקובץ נבנה בשרת דף אחר דף ונפתח ב-pandas, Excel (Power Query) ו-DuckDB")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        dataset = st.selectbox("נתונים", list(EXPORTS))
+    with col2:
+        export_start = st.date_input("מתאריך", value=datetime.now().replace(day=1).date(), key="export_start")
+    with col3:
+        export_end = st.date_input("עד תאריך", value=datetime.now().date(), key="export_end")
+    
+    export_key = (dataset, export_start, export_end)
+    if st.button("🛠️ הכן קובץ", use_container_width=True):
+        try:
+            with st.spinner("בונה קובץ..."):
+                build, prefix = EXPORTS[dataset]
+                st.session_state.finance_export = {
+                    "key": export_key,
+                    "data": build(export_start, export_end),
+                    "name": export_file_name(prefix, export_start, export_end),
+                }
+        except Exception as e:
+            st.error(f"❌ שגיאה: {str(e)}")
+    
+    # הקובץ שנבנה מוצע להורדה רק כל עוד הבחירה לא השתנתה
+    export = st.session_state.get("finance_export")
+    if export and export["key"] == export_key:
+        st.download_button(f"📥 הורד {export['name']} ({len(export['data']) / 1024:,.0f} KB)", export["data"],
+                           file_name=export["name"], mime="application/vnd.apache.parquet",
+                           use_container_width=True)
@@ -1,8 +1,12 @@
 import streamlit as st
 from utils.auth import check_auth
 from utils.styling import apply_custom_css
-from utils.supabase_client import supabase
+from utils.data import begin_run, get_active_employees, get_active_schools, get_activities, insert, update, delete, by_id
 from utils.nav import render_sidebar
+from utils.sections import section_selector, render_section, held_rows, after_write
+from utils.board import DAYS_HEBREW, STATUS_ICONS, activity_frame, render_board
+from utils.bulk_edit import editor_frame, plan_changes, apply_changes, STATUS_BY_LABEL, DATE, SCHOOL, EMPLOYEE, START, END, STATUS, REMOVE
+from utils.calendar_index import WEEK_DAYS, week_start, calendar_weeks, prefetch_around
 import pandas as pd
 from datetime import datetime, timedelta
 import hashlib
@@ -11,6 +15,7 @@ import hashlib
 st.set_page_config(page_title="ניהול לו״ז | Dream & Build", page_icon="📅", layout="wide")
 apply_custom_css()
 render_sidebar()
+begin_run()
 
 # === וידוא הרשאות ===
 user = check_auth()
@@ -47,14 +52,14 @@ def get_employee_color(employee_id: str) -> str:
 
 # === שליפת נתונים בסיסיים ===
 try:
-    employees_data = supabase.table("users").select("id, full_name").eq("role", "employee").eq("status", "active").execute()
-    emp_options = {e['full_name']: e['id'] for e in employees_data.data} if employees_data.data else {}
-    emp_colors = {e['id']: get_employee_color(e['id']) for e in employees_data.data} if employees_data.data else {}
-    emp_names_by_id = {e['id']: e['full_name'] for e in employees_data.data} if employees_data.data else {}
+    employees_data = get_active_employees()
+    emp_options = {e['full_name']: e['id'] for e in employees_data}
+    emp_colors = {e['id']: get_employee_color(e['id']) for e in employees_data}
+    emp_names_by_id = {e['id']: e['full_name'] for e in employees_data}
     
-    schools_data = supabase.table("schools").select("id, name, price_per_day").eq("status", "active").execute()
-    school_options = {s['name']: s['id'] for s in schools_data.data} if schools_data.data else {}
-    school_prices = {s['id']: s['price_per_day'] for s in schools_data.data} if schools_data.data else {}
+    schools_data = get_active_schools()
+    school_options = {s['name']: s['id'] for s in schools_data}
+    school_prices = {s['id']: s['price_per_day'] for s in schools_data}
 except:
     emp_options = {}
     emp_colors = {}
@@ -62,16 +67,76 @@ except:
     school_options = {}
     school_prices = {}
 
-# === טאבים ===
+# === סעיפים - רק הסעיף הנבחר רץ ===
 if is_manager:
-    tab1, tab2, tab3, tab4 = st.tabs(["📋 לוח פעילויות", "➕ פעילות בודדת", "🔄 תוכנית תהליכית", "📊 סיכום"])
+    SECTIONS = ["📋 לוח פעילויות", "🗓️ לוח שנה", "➕ פעילות בודדת", "🔄 תוכנית תהליכית", "📊 סיכום"]
 else:
-    tab1, tab2 = st.tabs(["📋 הפעילויות שלי", "✅ אישור ביצוע"])
+    SECTIONS = ["📋 הפעילויות שלי", "🗓️ לוח שנה", "✅ אישור ביצוע"]
+section = section_selector("schedule" if is_manager else "schedule_employee", SECTIONS)
+
+# === מקרא צבעים למדריכים ===
+def employee_legend():
+    st.markdown("#### 🎨 מקרא מדריכים:")
+    legend_html = "<div style='display: flex; flex-wrap: wrap; gap: 10px; margin-bottom: 1rem;'>"
+    for emp_name, emp_id in emp_options.items():
+        color = emp_colors.get(emp_id, "#6B7280")
+        legend_html += f"<span style='background: {color}; color: white; padding: 4px 12px; border-radius: 20px; font-size: 0.85rem;'>{emp_name}</span>"
+    legend_html += "<span style='background: #6B7280; color: white; padding: 4px 12px; border-radius: 20px; font-size: 0.85rem;'>❌ לא שובץ</span>"
+    legend_html += "</div>"
+    st.markdown(legend_html, unsafe_allow_html=True)
+
+# === עריכה מרובה ===
+def bulk_edit_panel(activities: list, scope: tuple):
+    """טבלה לעריכת כל הפעילויות בטווח; השינויים נבדקים ונשלחים יחד במנות"""
+    # עריכות שלא נשמרו לא עוברות לטווח/פילטר אחר
+    if st.session_state.get("_bulk_scope") != scope:
+        st.session_state.pop("bulk_editor", None)
+        st.session_state["_bulk_scope"] = scope
+    
+    # תוצאת השמירה הקודמת
+    result = st.session_state.pop("bulk_result", None)
+    if result:
+        st.success(f"✅ עודכנו {result['updated']} פעילויות, נמחקו {result['deleted']}")
+        if result['errors']:
+            st.error(f"❌ {len(result['errors'])} פעילויות לא נשמרו:")
+            st.dataframe(pd.DataFrame(result['errors'], columns=["פעילות", "שגיאה"]), use_container_width=True, hide_index=True)
+    
+    st.caption("ערוך מדריך, תאריך, שעות וסטטוס ישירות בטבלה, סמן שורות למחיקה ושמור הכל יחד")
+    original = editor_frame(activities)
+    edited = st.data_editor(
+        original,
+        key="bulk_editor",
+        use_container_width=True,
+        hide_index=True,
+        num_rows="fixed",
+        disabled=[SCHOOL],
+        column_config={
+            DATE: st.column_config.DateColumn(DATE, format="YYYY-MM-DD", required=True),
+            EMPLOYEE: st.column_config.SelectboxColumn(EMPLOYEE, options=list(emp_options.keys()), required=True),
+            START: st.column_config.TimeColumn(START, format="HH:mm", required=True),
+            END: st.column_config.TimeColumn(END, format="HH:mm", required=True),
+            STATUS: st.column_config.SelectboxColumn(STATUS, options=list(STATUS_BY_LABEL), required=True),
+            REMOVE: st.column_config.CheckboxColumn(REMOVE),
+        },
+    )
+    
+    plan = plan_changes(original, edited, activities, emp_options)
+    st.markdown(f"**{len(plan['upsert'])} לעדכון | {len(plan['delete'])} למחיקה**")
+    if plan['errors']:
+        st.error(f"❌ {len(plan['errors'])} שורות לא תקינות - שום שינוי לא יישמר עד שיתוקנו:")
+        st.dataframe(pd.DataFrame(plan['errors'], columns=["פעילות", "שגיאה"]), use_container_width=True, hide_index=True)
+    
+    if st.button("💾 שמור את כל השינויים", type="primary", use_container_width=True,
+                 disabled=bool(plan['errors']) or not (plan['upsert'] or plan['delete'])):
+        with st.spinner("שומר..."):
+            st.session_state["bulk_result"] = apply_changes(plan)
+        st.session_state.pop("bulk_editor", None)
+        st.rerun()
 
 # ========================================
-# טאב 1: לוח פעילויות
+# סעיף 1: לוח פעילויות
 # ========================================
-with tab1:
+def board_section():
     # פילטרים
     col_f1, col_f2, col_f3, col_f4 = st.columns(4)
     
@@ -92,14 +157,7 @@ with tab1:
     
     # מקרא צבעים למדריכים
     if is_manager and emp_options:
-        st.markdown("#### 🎨 מקרא מדריכים:")
-        legend_html = "<div style='display: flex; flex-wrap: wrap; gap: 10px; margin-bottom: 1rem;'>"
-        for emp_name, emp_id in emp_options.items():
-            color = emp_colors.get(emp_id, "#6B7280")
-            legend_html += f"<span style='background: {color}; color: white; padding: 4px 12px; border-radius: 20px; font-size: 0.85rem;'>{emp_name}</span>"
-        legend_html += "<span style='background: #6B7280; color: white; padding: 4px 12px; border-radius: 20px; font-size: 0.85rem;'>❌ לא שובץ</span>"
-        legend_html += "</div>"
-        st.markdown(legend_html, unsafe_allow_html=True)
+        employee_legend()
     
     # חישוב טווח תאריכים
     today = datetime.now().date()
@@ -116,36 +174,34 @@ with tab1:
     status_map = {"הכל": None, "מתוכנן": "planned", "מאושר": "confirmed", "הושלם": "completed", "בוטל": "cancelled"}
     
     try:
-        # בניית שאילתה
-        query = supabase.table("activities") \
-            .select("*, schools(name, price_per_day), users(full_name)") \
-            .gte("date", str(start_date)) \
-            .lte("date", str(end_date)) \
-            .order("date")
-        
         # פילטר עובד
         if not is_manager:
-            query = query.eq("employee_id", user['id'])
-        elif is_manager and emp_filter != "כל המדריכים":
-            query = query.eq("employee_id", emp_options.get(emp_filter))
+            filter_emp_id = user['id']
+        elif emp_filter != "כל המדריכים":
+            filter_emp_id = emp_options.get(emp_filter)
+        else:
+            filter_emp_id = None
         
         # פילטר בית ספר
-        if is_manager and school_filter != "כל בתי הספר":
-            query = query.eq("school_id", school_options.get(school_filter))
+        filter_school_id = school_options.get(school_filter) if is_manager and school_filter != "כל בתי הספר" else None
         
         # פילטר סטטוס
-        if status_map.get(status_filter):
-            query = query.eq("status", status_map[status_filter])
+        filter_statuses = (status_map[status_filter],) if status_map.get(status_filter) else None
         
-        activities = query.execute()
+        activities = get_activities(
+            start_date, end_date,
+            employee_id=filter_emp_id,
+            school_id=filter_school_id,
+            statuses=filter_statuses
+        )
         
-        if activities.data:
+        if activities:
             # סטטיסטיקות
             col_s1, col_s2, col_s3, col_s4 = st.columns(4)
-            total = len(activities.data)
-            completed = len([a for a in activities.data if a['status'] == 'completed'])
-            planned = len([a for a in activities.data if a['status'] in ['planned', 'confirmed']])
-            no_employee = len([a for a in activities.data if not a.get('employee_id')])
+            total = len(activities)
+            completed = len([a for a in activities if a['status'] == 'completed'])
+            planned = len([a for a in activities if a['status'] in ['planned', 'confirmed']])
+            no_employee = len([a for a in activities if not a.get('employee_id')])
             
             with col_s1:
                 st.metric("סה״כ", total)
@@ -162,84 +218,70 @@ with tab1:
             
             st.markdown("<div style='height: 1rem;'></div>", unsafe_allow_html=True)
             
-            # בניית טבלה צבעונית
-            days_hebrew = ['שני', 'שלישי', 'רביעי', 'חמישי', 'שישי', 'שבת', 'ראשון']
-            
-            # הצגת לוח צבעוני
-            st.markdown("#### 📅 לוח פעילויות:")
-            
-            for act in activities.data:
-                emp_id = act.get('employee_id')
-                color = emp_colors.get(emp_id, "#6B7280") if emp_id else "#6B7280"
-                status_icon = {'planned': '🟡', 'confirmed': '🟢', 'completed': '✅', 'cancelled': '🔴'}.get(act['status'], '⚪')
-                weekday = datetime.strptime(act['date'], '%Y-%m-%d').weekday()
-                day_name = days_hebrew[weekday]
-                
-                emp_name = act['users']['full_name'] if act.get('users') else '❌ לא שובץ'
-                school_name = act['schools']['name'] if act.get('schools') else '-'
+            # עריכה מרובה (מנהל) - כל הטווח בטבלה אחת
+            if is_manager and st.toggle("✏️ עריכה מרובה", key="schedule_bulk_mode"):
+                bulk_edit_panel(activities, (start_date, end_date, filter_emp_id, filter_school_id, filter_statuses))
+            else:
+                # לוח צבעוני - טבלה אחת (צבע המדריך בעמודת המדריך)
+                st.markdown("#### 📅 לוח פעילויות:")
+                if is_manager:
+                    st.caption("בחר שורה בטבלה לעריכה או מחיקה")
                 
-                st.markdown(f"""
-                <div style='background: white; padding: 1rem; border-radius: 10px; margin-bottom: 0.5rem; border-right: 5px solid {color}; display: flex; justify-content: space-between; align-items: center;'>
-                    <div>
-                        <div style='font-weight: 600; font-size: 1rem;'>{status_icon} {act['date']} ({day_name})</div>
-                        <div style='color: #6B7280; font-size: 0.9rem;'>🏫 {school_name} | 👷 <span style='color: {color}; font-weight: 600;'>{emp_name}</span> | 🕐 {act['time_start'][:5]} - {act['time_end'][:5]}</div>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            # === עריכה/מחיקת פעילות (מנהל) ===
-            if is_manager:
-                st.markdown("---")
-                st.markdown("### ⚙️ עריכה/מחיקת פעילות")
+                board = activity_frame(activities, colors=emp_colors if is_manager else None, employee=is_manager)
+                selected_idx = render_board(board, color_by="מדריך", selectable=is_manager)
                 
-                activity_labels = [f"{a['date']} | {a['schools']['name'] if a.get('schools') else '-'} | {a['users']['full_name'] if a.get('users') else 'לא שובץ'}" for a in activities.data]
-                selected_idx = st.selectbox("בחר פעילות", range(len(activity_labels)), format_func=lambda x: activity_labels[x])
+                # === עריכה/מחיקת פעילות (מנהל) ===
+                if is_manager and selected_idx is not None:
+                    st.markdown("---")
+                    st.markdown("### ⚙️ עריכה/מחיקת פעילות")
                 
-                selected_act = activities.data[selected_idx]
+                    selected_act = activities[selected_idx]
+                    row = board.iloc[selected_idx]
+                    st.markdown(f"**{row['תאריך']} ({row['יום']}) | {row['בית ספר']} | {row['מדריך']}**")
                 
-                col_edit, col_delete = st.columns([3, 1])
+                    col_edit, col_delete = st.columns([3, 1])
                 
-                with col_edit:
-                    with st.form("edit_activity"):
-                        col1, col2 = st.columns(2)
+                    with col_edit:
+                        with st.form("edit_activity"):
+                            col1, col2 = st.columns(2)
                         
-                        with col1:
-                            edit_date = st.date_input("📅 תאריך", value=datetime.strptime(selected_act['date'], '%Y-%m-%d'))
+                            with col1:
+                                edit_date = st.date_input("📅 תאריך", value=datetime.strptime(selected_act['date'], '%Y-%m-%d'))
                             
-                            emp_names = list(emp_options.keys())
-                            current_emp = selected_act['users']['full_name'] if selected_act.get('users') else None
-                            emp_idx = emp_names.index(current_emp) if current_emp in emp_names else 0
-                            edit_employee = st.selectbox("👷 מדריך *", emp_names, index=emp_idx if emp_names else 0)
+                                emp_names = list(emp_options.keys())
+                                current_emp = selected_act['users']['full_name'] if selected_act.get('users') else None
+                                emp_idx = emp_names.index(current_emp) if current_emp in emp_names else 0
+                                edit_employee = st.selectbox("👷 מדריך *", emp_names, index=emp_idx if emp_names else 0)
                         
-                        with col2:
-                            statuses = ['planned', 'confirmed', 'completed', 'cancelled']
-                            status_labels = {'planned': 'מתוכנן', 'confirmed': 'מאושר', 'completed': 'הושלם', 'cancelled': 'בוטל'}
-                            current_status_idx = statuses.index(selected_act['status']) if selected_act['status'] in statuses else 0
-                            edit_status = st.selectbox("סטטוס", statuses, index=current_status_idx, format_func=lambda x: status_labels[x])
+                            with col2:
+                                statuses = ['planned', 'confirmed', 'completed', 'cancelled']
+                                status_labels = {'planned': 'מתוכנן', 'confirmed': 'מאושר', 'completed': 'הושלם', 'cancelled': 'בוטל'}
+                                current_status_idx = statuses.index(selected_act['status']) if selected_act['status'] in statuses else 0
+                                edit_status = st.selectbox("סטטוס", statuses, index=current_status_idx, format_func=lambda x: status_labels[x])
                             
-                            col_t1, col_t2 = st.columns(2)
-                            with col_t1:
-                                edit_start = st.time_input("התחלה", value=datetime.strptime(selected_act['time_start'][:5], '%H:%M').time())
-                            with col_t2:
-                                edit_end = st.time_input("סיום", value=datetime.strptime(selected_act['time_end'][:5], '%H:%M').time())
+                                col_t1, col_t2 = st.columns(2)
+                                with col_t1:
+                                    edit_start = st.time_input("התחלה", value=datetime.strptime(selected_act['time_start'][:5], '%H:%M').time())
+                                with col_t2:
+                                    edit_end = st.time_input("סיום", value=datetime.strptime(selected_act['time_end'][:5], '%H:%M').time())
                         
-                        if st.form_submit_button("💾 שמור שינויים", use_container_width=True):
-                            supabase.table("activities").update({
-                                "date": str(edit_date),
-                                "employee_id": emp_options.get(edit_employee),
-                                "status": edit_status,
-                                "time_start": str(edit_start),
-                                "time_end": str(edit_end)
-                            }).eq("id", selected_act['id']).execute()
-                            st.success("✅ נשמר!")
-                            st.rerun()
+                            if st.form_submit_button("💾 שמור שינויים", use_container_width=True):
+                                update("activities", {
+                                    "date": str(edit_date),
+                                    "employee_id": emp_options.get(edit_employee),
+                                    "status": edit_status,
+                                    "time_start": str(edit_start),
+                                    "time_end": str(edit_end)
+                                }, by_id(selected_act['id']))
+                                st.success("✅ נשמר!")
+                                st.rerun()
                 
-                with col_delete:
-                    st.markdown("<div style='height: 2rem;'></div>", unsafe_allow_html=True)
-                    if st.button("🗑️ מחק פעילות", use_container_width=True, type="secondary"):
-                        supabase.table("activities").delete().eq("id", selected_act['id']).execute()
-                        st.success("🗑️ נמחק!")
-                        st.rerun()
+                    with col_delete:
+                        st.markdown("<div style='height: 2rem;'></div>", unsafe_allow_html=True)
+                        if st.button("🗑️ מחק פעילות", use_container_width=True, type="secondary"):
+                            delete("activities", by_id(selected_act['id']))
+                            st.success("🗑️ נמחק!")
+                            st.rerun()
         else:
             st.info("אין פעילויות בטווח הנבחר")
             
@@ -247,10 +289,108 @@ with tab1:
         st.error(f"שגיאה: {str(e)}")
 
 # ========================================
-# טאב 2: פעילות בודדת (מנהל) / אישור ביצוע (עובד)
+# סעיף: לוח שנה (שבוע / חודש)
+# ========================================
+def calendar_html(weeks: dict, month: int | None = None) -> str:
+    """טבלת HTML אחת: שורה לכל שבוע (ראשון-שבת), פעילות כתגית בצבע המדריך.
+    month - תצוגת חודש: ימים מחוץ לחודש מוצגים באפור"""
+    today = datetime.now().date()
+    cell_height = "90px" if month else "160px"
+    header = "".join(f"<th style='padding: 6px; background: #F3F4F6; font-size: 0.85rem;'>{day}</th>" for day in WEEK_DAYS)
+    rows = []
+    for start, days in weeks.items():
+        cells = []
+        for offset in range(7):
+            day = start + timedelta(days=offset)
+            background = "#EFF6FF" if day == today else ("#F9FAFB" if month and day.month != month else "white")
+            chips = []
+            for act in days.get(day, []):
+                color = emp_colors.get(act.get('employee_id'), "#6B7280") if is_manager else get_employee_color(user['id'])
+                school_name = act['schools']['name'] if act.get('schools') else '-'
+                emp_name = f" | {act['users']['full_name'] if act.get('users') else 'לא שובץ'}" if is_manager else ""
+                faded = " opacity: 0.45; text-decoration: line-through;" if act['status'] == 'cancelled' else ""
+                chips.append(f"<div style='background: {color}; color: white; border-radius: 6px; padding: 2px 6px; "
+                             f"margin-top: 3px; font-size: 0.75rem;{faded}'>{STATUS_ICONS.get(act['status'], '⚪')} "
+                             f"{(act.get('time_start') or '')[:5]} {school_name}{emp_name}</div>")
+            cells.append(f"<td style='vertical-align: top; border: 1px solid #E5E7EB; padding: 4px; height: {cell_height}; "
+                         f"background: {background};'><div style='font-size: 0.8rem; color: #6B7280;'>{day.strftime('%d/%m')}</div>"
+                         f"{''.join(chips)}</td>")
+        rows.append(f"<tr>{''.join(cells)}</tr>")
+    return (f"<table dir='rtl' style='width: 100%; border-collapse: collapse; table-layout: fixed;'>"
+            f"<tr>{header}</tr>{''.join(rows)}</table>")
+
+
+def calendar_section():
+    # התאריך שהלוח מוצג סביבו - נשמר גם אחרי מעבר עמוד
+    if "calendar_anchor" not in st.session_state:
+        st.session_state.calendar_anchor = datetime.now().date()
+    
+    col_v, col_e, col_s = st.columns(3)
+    with col_v:
+        view = st.radio("תצוגה", ["שבוע", "חודש"], horizontal=True, key="calendar_view")
+    filter_emp_id = filter_school_id = None
+    if is_manager:
+        with col_e:
+            emp_filter = st.selectbox("🎨 מדריך", ["כל המדריכים"] + list(emp_options.keys()), key="calendar_employee")
+            filter_emp_id = emp_options.get(emp_filter)
+        with col_s:
+            school_filter = st.selectbox("בית ספר", ["כל בתי הספר"] + list(school_options.keys()), key="calendar_school")
+            filter_school_id = school_options.get(school_filter)
+    
+    anchor = st.session_state.calendar_anchor
+    step = timedelta(weeks=1) if view == "שבוע" else None
+    
+    def move(direction: int):
+        current = st.session_state.calendar_anchor
+        if step:
+            st.session_state.calendar_anchor = current + direction * step
+        else:
+            # תחילת החודש הקודם / הבא
+            month_index = current.year * 12 + current.month - 1 + direction
+            st.session_state.calendar_anchor = current.replace(year=month_index // 12, month=month_index % 12 + 1, day=1)
+    
+    def go_today():
+        st.session_state.calendar_anchor = datetime.now().date()
+    
+    col_prev, col_title, col_today, col_next = st.columns([1, 3, 1, 1])
+    with col_prev:
+        st.button("→ הקודם", on_click=move, args=(-1,), use_container_width=True)
+    with col_today:
+        st.button("היום", on_click=go_today, use_container_width=True)
+    with col_next:
+        st.button("הבא ←", on_click=move, args=(1,), use_container_width=True)
+    
+    if view == "שבוע":
+        first_week, count, month = week_start(anchor), 1, None
+        title = f"{first_week.strftime('%d/%m/%Y')} - {(first_week + timedelta(days=6)).strftime('%d/%m/%Y')}"
+    else:
+        first_day = anchor.replace(day=1)
+        last_day = (first_day.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+        first_week, month = week_start(first_day), first_day.month
+        count = (week_start(last_day) - first_week).days // 7 + 1
+        title = first_day.strftime('%m/%Y')
+    with col_title:
+        st.markdown(f"<h4 style='text-align: center; margin: 0.25rem 0;'>🗓️ {title}</h4>", unsafe_allow_html=True)
+    
+    try:
+        # עובד רואה רק את הפעילויות שלו - גם השליפה מסוננת
+        fetch_emp_id = None if is_manager else user['id']
+        weeks = calendar_weeks(first_week, count, fetch_emp_id, filter_emp_id, filter_school_id)
+        if is_manager and emp_options:
+            employee_legend()
+        st.markdown(calendar_html(weeks, month), unsafe_allow_html=True)
+        total = sum(len(acts) for days in weeks.values() for acts in days.values())
+        st.caption(f"{total} פעילויות בתצוגה")
+        # השבועות שלפני ואחרי נטענים ברקע - המעבר אליהם לא מחכה לשרת
+        prefetch_around(first_week, count, fetch_emp_id)
+    except Exception as e:
+        st.error(f"שגיאה: {str(e)}")
+
+# ========================================
+# סעיף 2: פעילות בודדת (מנהל) / אישור ביצוע (עובד)
 # ========================================
 if is_manager:
-    with tab2:
+    def single_section():
         st.markdown("### ➕ שיבוץ פעילות בודדת")
         
         with st.form("add_activity"):
@@ -281,7 +421,7 @@ if is_manager:
                     st.error("❌ חובה לבחור בית ספר ומדריך!")
                 else:
                     try:
-                        supabase.table("activities").insert({
+                        insert("activities", {
                             "school_id": school_options[new_school],
                             "employee_id": emp_options[new_employee],
                             "date": str(new_date),
@@ -289,7 +429,7 @@ if is_manager:
                             "time_end": str(new_end),
                             "status": new_status,
                             "notes": new_notes or None
-                        }).execute()
+                        })
                         st.success("✅ הפעילות נוצרה!")
                         st.balloons()
                         st.rerun()
@@ -297,9 +437,9 @@ if is_manager:
                         st.error(f"❌ שגיאה: {str(e)}")
     
     # ========================================
-    # טאב 3: תוכנית תהליכית
+    # סעיף 3: תוכנית תהליכית
     # ========================================
-    with tab3:
+    def series_section():
         st.markdown("### 🔄 יצירת תוכנית תהליכית")
         st.info("💡 צור סדרת פעילויות שחוזרות על עצמן - לדוגמה: 5 מפגשים בימי ראשון")
         
@@ -340,8 +480,7 @@ if is_manager:
                 date = first_date + timedelta(weeks=i)
                 preview_dates.append(date)
             
-            days_hebrew = ['שני', 'שלישי', 'רביעי', 'חמישי', 'שישי', 'שבת', 'ראשון']
-            preview_text = ", ".join([f"{d.strftime('%d/%m/%Y')} ({days_hebrew[d.weekday()]})" for d in preview_dates[:5]])
+            preview_text = ", ".join([f"{d.strftime('%d/%m/%Y')} ({DAYS_HEBREW[d.weekday()]})" for d in preview_dates[:5]])
             if len(preview_dates) > 5:
                 preview_text += f" ועוד {len(preview_dates) - 5}..."
             
@@ -378,7 +517,7 @@ if is_manager:
                                 "notes": f"תוכנית תהליכית - {series_count} מפגשים"
                             })
                         
-                        supabase.table("activities").insert(activities_to_create).execute()
+                        insert("activities", activities_to_create)
                         
                         st.success(f"✅ נוצרו {series_count} פעילויות בהצלחה!")
                         st.balloons()
@@ -387,24 +526,20 @@ if is_manager:
                         st.error(f"❌ שגיאה: {str(e)}")
     
     # ========================================
-    # טאב 4: סיכום לפי מדריך
+    # סעיף 4: סיכום לפי מדריך
     # ========================================
-    with tab4:
+    def summary_section():
         st.markdown("### 📊 סיכום פעילויות לפי מדריך")
         
         try:
             month_start = datetime.now().replace(day=1).date()
             month_end = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
             
-            all_activities = supabase.table("activities") \
-                .select("employee_id, status") \
-                .gte("date", str(month_start)) \
-                .lte("date", str(month_end)) \
-                .execute()
+            all_activities = get_activities(month_start, month_end, view="activities.employee_status")
             
-            if all_activities.data and emp_options:
+            if all_activities and emp_options:
                 for emp_name, emp_id in emp_options.items():
-                    emp_acts = [a for a in all_activities.data if a['employee_id'] == emp_id]
+                    emp_acts = [a for a in all_activities if a['employee_id'] == emp_id]
                     total = len(emp_acts)
                     completed = len([a for a in emp_acts if a['status'] == 'completed'])
                     planned = len([a for a in emp_acts if a['status'] in ['planned', 'confirmed']])
@@ -426,41 +561,45 @@ if is_manager:
             st.error(f"שגיאה: {str(e)}")
 
 else:
-    # טאב אישור ביצוע לעובד
-    with tab2:
+    # סעיף אישור ביצוע לעובד
+    def confirm_section():
         st.markdown("### ✅ אישור ביצוע פעילויות")
         
         try:
             today = datetime.now().date()
-            pending = supabase.table("activities") \
-                .select("*, schools(name)") \
-                .eq("employee_id", user['id']) \
-                .eq("confirmed_by_employee", False) \
-                .lte("date", str(today)) \
-                .in_("status", ["planned", "confirmed"]) \
-                .execute()
+            # אישור מסיר את השורה מהרשימה המוחזקת ומריץ מחדש רק את הסעיף
+            pending = held_rows("pending_confirmations", lambda: get_activities(
+                end=today,
+                employee_id=user['id'],
+                statuses=("planned", "confirmed"),
+                confirmed=False,
+                view="activities.pending"
+            ), (user['id'], str(today)))
             
-            if pending.data:
-                st.warning(f"⚠️ יש לך {len(pending.data)} פעילויות שממתינות לאישור")
+            if pending:
+                st.warning(f"⚠️ יש לך {len(pending)} פעילויות שממתינות לאישור")
                 
-                for act in pending.data:
-                    col1, col2 = st.columns([3, 1])
-                    with col1:
-                        st.markdown(f"""
-                        <div style='background: #FEF3C7; padding: 1rem; border-radius: 10px; border-right: 4px solid #F59E0B;'>
-                            <div style='font-weight: 600;'>{act['date']} - {act['schools']['name'] if act.get('schools') else '-'}</div>
-                            <div style='font-size: 0.9rem; color: #6B7280;'>{act['time_start'][:5]} - {act['time_end'][:5]}</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    with col2:
-                        if st.button("✅ אשר", key=f"confirm_{act['id']}"):
-                            supabase.table("activities").update({
-                                "confirmed_by_employee": True,
-                                "status": "completed"
-                            }).eq("id", act['id']).execute()
-                            st.rerun()
+                # טבלה אחת; האישור על השורה שנבחרה
+                selected_idx = render_board(activity_frame(pending, employee=False, status=False))
+                if selected_idx is None:
+                    st.caption("בחר פעילות בטבלה לאישור ביצוע")
+                else:
+                    act = pending[selected_idx]
+                    school_name = act['schools']['name'] if act.get('schools') else '-'
+                    if st.button(f"✅ אשר ביצוע - {act['date']} | {school_name}", key="confirm_selected", use_container_width=True):
+                        update("activities", {
+                            "confirmed_by_employee": True,
+                            "status": "completed"
+                        }, by_id(act['id']))
+                        after_write("pending_confirmations", act['id'])
             else:
                 st.success("✅ כל הפעילויות אושרו!")
                 
         except Exception as e:
             st.error(f"שגיאה: {str(e)}")
+
+
+if is_manager:
+    render_section(section, dict(zip(SECTIONS, [board_section, calendar_section, single_section, series_section, summary_section])))
+else:
+    render_section(section, dict(zip(SECTIONS, [board_section, calendar_section, confirm_section])))
@@ -1,8 +1,11 @@
 import streamlit as st
 from utils.auth import require_role
 from utils.styling import apply_custom_css
-from utils.supabase_client import supabase
+from utils.data import begin_run, get_schools, get_active_schools, get_active_employees, get_activities, count_activities, get_budgets, fetch_parallel, insert, update, delete, by_id
+from utils.analytics import activity_summary_by_school
 from utils.nav import render_sidebar
+from utils.sections import section_selector, render_section, held_rows, after_write
+from utils.board import STATUS_LABELS, activity_frame, render_board
 import pandas as pd
 from datetime import datetime
 import plotly.graph_objects as go
@@ -11,6 +14,7 @@ import plotly.graph_objects as go
 st.set_page_config(page_title="ניהול בתי ספר | Dream & Build", page_icon="🏫", layout="wide")
 apply_custom_css()
 render_sidebar()
+begin_run()
 
 # === וידוא הרשאות ===
 user = require_role('manager')
@@ -23,13 +27,14 @@ st.markdown("""
 
 st.markdown("<div style='height: 1rem;'></div>", unsafe_allow_html=True)
 
-# === טאבים ===
-tab1, tab2, tab3, tab4 = st.tabs(["📋 רשימה ותקציבים", "📅 פעילויות בית ספר", "➕ הוספת בית ספר", "📊 ניתוח"])
+# === סעיפים - רק הסעיף הנבחר רץ ===
+SECTIONS = ["📋 רשימה ותקציבים", "📅 פעילויות בית ספר", "➕ הוספת בית ספר", "📊 ניתוח"]
+section = section_selector("schools", SECTIONS)
 
 # ========================================
-# טאב 1: רשימה ותקציבים
+# סעיף 1: רשימה ותקציבים
 # ========================================
-with tab1:
+def list_section():
     try:
         # פילטר סטטוס
         col_filter1, col_filter2 = st.columns([1, 1])
@@ -39,37 +44,33 @@ with tab1:
             year_filter = st.selectbox("שנה לחישוב תקציב:", [2025, 2026, 2024, "הכל"], index=0)
         
         # שליפת בתי ספר
-        if status_filter == "פעילים":
-            schools = supabase.table("schools").select("*").eq("status", "active").order("name").execute()
-        elif status_filter == "ארכיון":
-            schools = supabase.table("schools").select("*").eq("status", "archived").order("name").execute()
-        else:
-            schools = supabase.table("schools").select("*").order("name").execute()
-        
-        # שליפת תקציבים
+        school_status = {"פעילים": "active", "ארכיון": "archived", "הכל": None}[status_filter]
         current_year = datetime.now().year
-        budgets = supabase.table("school_budgets").select("*").eq("year", current_year).execute()
-        budgets_dict = {b['school_id']: b for b in budgets.data} if budgets.data else {}
         
         # שליפת פעילויות - לפי הפילטר שנבחר
         if year_filter == "הכל":
-            activities = supabase.table("activities").select("school_id, status").in_("status", ["completed", "confirmed"]).execute()
+            year_start = year_end = None
         else:
             year_start = f"{year_filter}-01-01"
             year_end = f"{year_filter}-12-31"
-            activities = supabase.table("activities").select("school_id, status").gte("date", year_start).lte("date", year_end).in_("status", ["completed", "confirmed"]).execute()
+        
+        # בתי ספר, תקציבים ופעילויות - במקביל
+        results = fetch_parallel(
+            schools=lambda: get_schools(school_status),
+            budgets=lambda: get_budgets(current_year),
+            activities=lambda: activity_summary_by_school(year_start, year_end, statuses=("completed", "confirmed"))
+        )
+        schools = results['schools']
+        budgets_dict = {b['school_id']: b for b in results['budgets']}
+        activities = results['activities']
         
         # חישוב פעילויות לכל בית ספר
-        activities_count = {}
-        if activities.data:
-            for act in activities.data:
-                sid = act['school_id']
-                activities_count[sid] = activities_count.get(sid, 0) + 1
+        activities_count = dict(zip(activities['school_id'], activities['activities']))
         
-        if schools.data:
+        if schools:
             # יצירת טבלת סיכום
             rows = []
-            for school in schools.data:
+            for school in schools:
                 sid = school['id']
                 act_count = activities_count.get(sid, 0)
                 price = school.get('price_per_day', 0) or 0
@@ -102,15 +103,15 @@ with tab1:
             # === סטטיסטיקות מהירות ===
             col1, col2, col3, col4 = st.columns(4)
             with col1:
-                st.metric("סה״כ בתי ספר", len(schools.data))
+                st.metric("סה״כ בתי ספר", len(schools))
             with col2:
                 total_activities = sum(activities_count.values())
                 st.metric("סה״כ פעילויות השנה", total_activities)
             with col3:
-                total_income = sum([activities_count.get(s['id'], 0) * (s.get('price_per_day', 0) or 0) for s in schools.data])
+                total_income = sum([activities_count.get(s['id'], 0) * (s.get('price_per_day', 0) or 0) for s in schools])
                 st.metric("סה״כ הכנסות", f"₪{total_income:,}")
             with col4:
-                active_schools = len([s for s in schools.data if s.get('status') == 'active'])
+                active_schools = len([s for s in schools if s.get('status') == 'active'])
                 st.metric("בתי ספר פעילים", active_schools)
             
             st.markdown("<div style='height: 1rem;'></div>", unsafe_allow_html=True)
@@ -130,11 +131,11 @@ with tab1:
             col_select, col_actions = st.columns([1, 2])
             
             with col_select:
-                school_names = [s['name'] for s in schools.data]
+                school_names = [s['name'] for s in schools]
                 selected_name = st.selectbox("בחר בית ספר", school_names)
             
             if selected_name:
-                selected_school = next(s for s in schools.data if s['name'] == selected_name)
+                selected_school = next(s for s in schools if s['name'] == selected_name)
                 selected_id = selected_school['id']
                 selected_budget = budgets_dict.get(selected_id, {})
                 
@@ -178,7 +179,7 @@ with tab1:
                         edit_notes = st.text_area("הערות", value=selected_school.get('notes', '') or '')
                         
                         if st.form_submit_button("💾 שמור שינויים", use_container_width=True):
-                            supabase.table("schools").update({
+                            update("schools", {
                                 "name": edit_name,
                                 "contact_person": edit_contact,
                                 "phone": edit_phone,
@@ -187,7 +188,7 @@ with tab1:
                                 "status": edit_status,
                                 "address": edit_address,
                                 "notes": edit_notes
-                            }).eq("id", selected_id).execute()
+                            }, by_id(selected_id))
                             st.success("✅ נשמר בהצלחה!")
                             st.rerun()
                 
@@ -219,10 +220,10 @@ with tab1:
                             
                             if selected_budget:
                                 # עדכון
-                                supabase.table("school_budgets").update(budget_data).eq("id", selected_budget['id']).execute()
+                                update("school_budgets", budget_data, by_id(selected_budget['id']))
                             else:
                                 # יצירה
-                                supabase.table("school_budgets").insert(budget_data).execute()
+                                insert("school_budgets", budget_data)
                             
                             st.success("✅ התקציב נשמר!")
                             st.rerun()
@@ -248,20 +249,20 @@ with tab1:
                     st.markdown("#### 🗑️ הסרת בית ספר")
                     
                     # בדיקה אם יש פעילויות לבית הספר
-                    activities_count = supabase.table("activities").select("id").eq("school_id", selected_school['id']).execute()
-                    has_activities = len(activities_count.data) > 0 if activities_count.data else False
+                    school_activity_count = count_activities(school_id=selected_school['id'])
+                    has_activities = school_activity_count > 0
                     
                     if has_activities:
-                        st.warning(f"⚠️ לבית ספר זה יש {len(activities_count.data)} פעילויות. לא ניתן למחוק לצמיתות - רק להעביר לארכיון.")
+                        st.warning(f"⚠️ לבית ספר זה יש {school_activity_count} פעילויות. לא ניתן למחוק לצמיתות - רק להעביר לארכיון.")
                         
                         if selected_school.get('status') == 'active':
                             if st.button("📦 העבר לארכיון", key="archive_school", use_container_width=True):
-                                supabase.table("schools").update({"status": "archived"}).eq("id", selected_school['id']).execute()
+                                update("schools", {"status": "archived"}, by_id(selected_school['id']))
                                 st.success("✅ בית הספר הועבר לארכיון")
                                 st.rerun()
                         else:
                             if st.button("♻️ שחזר מארכיון", key="restore_school", use_container_width=True):
-                                supabase.table("schools").update({"status": "active"}).eq("id", selected_school['id']).execute()
+                                update("schools", {"status": "active"}, by_id(selected_school['id']))
                                 st.success("✅ בית הספר שוחזר")
                                 st.rerun()
                     else:
@@ -269,12 +270,12 @@ with tab1:
                         with col_archive:
                             if selected_school.get('status') == 'active':
                                 if st.button("📦 העבר לארכיון", key="archive_school2", use_container_width=True):
-                                    supabase.table("schools").update({"status": "archived"}).eq("id", selected_school['id']).execute()
+                                    update("schools", {"status": "archived"}, by_id(selected_school['id']))
                                     st.success("✅ הועבר לארכיון")
                                     st.rerun()
                             else:
                                 if st.button("♻️ שחזר", key="restore_school2", use_container_width=True):
-                                    supabase.table("schools").update({"status": "active"}).eq("id", selected_school['id']).execute()
+                                    update("schools", {"status": "active"}, by_id(selected_school['id']))
                                     st.success("✅ שוחזר")
                                     st.rerun()
                         with col_delete:
@@ -287,8 +288,8 @@ with tab1:
                             col1, col2 = st.columns(2)
                             with col1:
                                 if st.button("✅ כן, מחק", key="confirm_del_school", use_container_width=True):
-                                    supabase.table("school_budgets").delete().eq("school_id", selected_school['id']).execute()
-                                    supabase.table("schools").delete().eq("id", selected_school['id']).execute()
+                                    delete("school_budgets", (("eq", "school_id", selected_school['id']),))
+                                    delete("schools", by_id(selected_school['id']))
                                     st.success("🗑️ בית הספר נמחק")
                                     del st.session_state['confirm_delete_school']
                                     st.rerun()
@@ -303,101 +304,83 @@ with tab1:
         st.error(f"שגיאה: {str(e)}")
 
 # ========================================
-# טאב 2: פעילויות בית ספר
+# סעיף 2: פעילויות בית ספר
 # ========================================
-with tab2:
+def activities_section():
     st.markdown("### 📅 ניהול פעילויות לפי בית ספר")
     
     try:
-        schools_list = supabase.table("schools").select("id, name").eq("status", "active").order("name").execute()
-        employees_list = supabase.table("users").select("id, full_name").eq("role", "employee").eq("status", "active").execute()
+        schools_list = get_active_schools("schools.names")
+        employees_list = get_active_employees()
         
-        emp_options = {e['full_name']: e['id'] for e in employees_list.data} if employees_list.data else {}
+        emp_options = {e['full_name']: e['id'] for e in employees_list}
         
-        if schools_list.data:
-            school_names = [s['name'] for s in schools_list.data]
+        if schools_list:
+            school_names = [s['name'] for s in schools_list]
             selected_school_name = st.selectbox("🏫 בחר בית ספר", school_names, key="school_activities")
             
             if selected_school_name:
-                selected_school = next(s for s in schools_list.data if s['name'] == selected_school_name)
+                selected_school = next(s for s in schools_list if s['name'] == selected_school_name)
                 school_id = selected_school['id']
                 
-                # שליפת כל הפעילויות של בית הספר
-                school_activities = supabase.table("activities") \
-                    .select("*, users(full_name)") \
-                    .eq("school_id", school_id) \
-                    .order("date") \
-                    .execute()
+                # שליפת כל הפעילויות של בית הספר - מוחזקות בין ריצות הסעיף; עריכה ומחיקה
+                # מתקנות את השורה במקום ומריצות מחדש רק את הסעיף
+                school_activities = held_rows("school_activities",
+                                              lambda: get_activities(school_id=school_id, view="activities.by_school"),
+                                              (school_id,))
                 
-                if school_activities.data:
-                    st.markdown(f"#### 📋 פעילויות ב{selected_school_name} ({len(school_activities.data)} פעילויות)")
+                if school_activities:
+                    st.markdown(f"#### 📋 פעילויות ב{selected_school_name} ({len(school_activities)} פעילויות)")
                     
-                    # טבלת פעילויות
-                    days_hebrew = ['שני', 'שלישי', 'רביעי', 'חמישי', 'שישי', 'שבת', 'ראשון']
+                    # טבלת פעילויות - אלמנט אחד; עריכה ומחיקה לשורה שנבחרה
+                    st.caption("בחר שורה בטבלה לעריכה או מחיקה")
+                    board = activity_frame(school_activities, school=False)
+                    selected_idx = render_board(board)
                     
-                    for act in school_activities.data:
-                        weekday = datetime.strptime(act['date'], '%Y-%m-%d').weekday()
-                        status_icon = {'planned': '🟡', 'confirmed': '🟢', 'completed': '✅', 'cancelled': '🔴'}.get(act['status'], '⚪')
-                        emp_name = act['users']['full_name'] if act.get('users') else '❌ לא שובץ'
-                        
-                        col_info, col_edit, col_delete = st.columns([4, 1, 1])
+                    if selected_idx is not None:
+                        act = school_activities[selected_idx]
+                        row = board.iloc[selected_idx]
                         
+                        col_info, col_delete = st.columns([5, 1])
                         with col_info:
-                            st.markdown(f"""
-                            <div style='background: white; padding: 0.75rem; border-radius: 8px; margin-bottom: 0.25rem;'>
-                                <span style='font-weight: 600;'>{status_icon} {act['date']} ({days_hebrew[weekday]})</span>
-                                <span style='color: #6B7280; margin-right: 1rem;'>👷 {emp_name} | 🕐 {act['time_start'][:5]}-{act['time_end'][:5]}</span>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        
-                        with col_edit:
-                            if st.button("✏️", key=f"edit_{act['id']}", help="ערוך"):
-                                st.session_state[f"editing_{act['id']}"] = True
-                        
+                            st.markdown(f"**✏️ {row['תאריך']} ({row['יום']}) | {row['מדריך']} | {row['שעות']}**")
                         with col_delete:
-                            if st.button("🗑️", key=f"del_{act['id']}", help="מחק"):
-                                supabase.table("activities").delete().eq("id", act['id']).execute()
-                                st.rerun()
+                            if st.button("🗑️ מחק", key=f"del_{act['id']}", use_container_width=True):
+                                delete("activities", by_id(act['id']))
+                                after_write("school_activities", act['id'])
                         
                         # טופס עריכה
-                        if st.session_state.get(f"editing_{act['id']}"):
-                            with st.expander("✏️ עריכת פעילות", expanded=True):
-                                with st.form(f"edit_form_{act['id']}"):
-                                    col1, col2 = st.columns(2)
-                                    
-                                    with col1:
-                                        edit_date = st.date_input("תאריך", value=datetime.strptime(act['date'], '%Y-%m-%d'), key=f"date_{act['id']}")
-                                        
-                                        emp_names = list(emp_options.keys())
-                                        current_emp = act['users']['full_name'] if act.get('users') else None
-                                        emp_idx = emp_names.index(current_emp) if current_emp in emp_names else 0
-                                        edit_emp = st.selectbox("מדריך", emp_names, index=emp_idx, key=f"emp_{act['id']}")
-                                    
-                                    with col2:
-                                        edit_start = st.time_input("התחלה", value=datetime.strptime(act['time_start'][:5], '%H:%M').time(), key=f"start_{act['id']}")
-                                        edit_end = st.time_input("סיום", value=datetime.strptime(act['time_end'][:5], '%H:%M').time(), key=f"end_{act['id']}")
-                                    
-                                    statuses = ['planned', 'confirmed', 'completed', 'cancelled']
-                                    edit_status = st.selectbox("סטטוס", statuses, index=statuses.index(act['status']), 
-                                                              format_func=lambda x: {'planned': 'מתוכנן', 'confirmed': 'מאושר', 'completed': 'הושלם', 'cancelled': 'בוטל'}[x],
-                                                              key=f"status_{act['id']}")
-                                    
-                                    col_save, col_cancel = st.columns(2)
-                                    with col_save:
-                                        if st.form_submit_button("💾 שמור", use_container_width=True):
-                                            supabase.table("activities").update({
-                                                "date": str(edit_date),
-                                                "employee_id": emp_options.get(edit_emp),
-                                                "time_start": str(edit_start),
-                                                "time_end": str(edit_end),
-                                                "status": edit_status
-                                            }).eq("id", act['id']).execute()
-                                            st.session_state[f"editing_{act['id']}"] = False
-                                            st.rerun()
-                                    with col_cancel:
-                                        if st.form_submit_button("❌ ביטול", use_container_width=True):
-                                            st.session_state[f"editing_{act['id']}"] = False
-                                            st.rerun()
+                        with st.form(f"edit_form_{act['id']}"):
+                            col1, col2 = st.columns(2)
+                            
+                            with col1:
+                                edit_date = st.date_input("תאריך", value=datetime.strptime(act['date'], '%Y-%m-%d'), key=f"date_{act['id']}")
+                                
+                                emp_names = list(emp_options.keys())
+                                current_emp = act['users']['full_name'] if act.get('users') else None
+                                emp_idx = emp_names.index(current_emp) if current_emp in emp_names else 0
+                                edit_emp = st.selectbox("מדריך", emp_names, index=emp_idx, key=f"emp_{act['id']}")
+                            
+                            with col2:
+                                edit_start = st.time_input("התחלה", value=datetime.strptime(act['time_start'][:5], '%H:%M').time(), key=f"start_{act['id']}")
+                                edit_end = st.time_input("סיום", value=datetime.strptime(act['time_end'][:5], '%H:%M').time(), key=f"end_{act['id']}")
+                            
+                            statuses = list(STATUS_LABELS)
+                            edit_status = st.selectbox("סטטוס", statuses, index=statuses.index(act['status']), 
+                                                      format_func=lambda x: STATUS_LABELS[x],
+                                                      key=f"status_{act['id']}")
+                            
+                            if st.form_submit_button("💾 שמור", use_container_width=True):
+                                changes = {
+                                    "date": str(edit_date),
+                                    "employee_id": emp_options.get(edit_emp),
+                                    "time_start": str(edit_start),
+                                    "time_end": str(edit_end),
+                                    "status": edit_status
+                                }
+                                update("activities", changes, by_id(act['id']))
+                                after_write("school_activities", act['id'],
+                                            {**changes, "users": {"full_name": edit_emp}})
                 else:
                     st.info(f"אין פעילויות ל{selected_school_name}")
         else:
@@ -407,9 +390,9 @@ with tab2:
         st.error(f"שגיאה: {str(e)}")
 
 # ========================================
-# טאב 3: הוספת בית ספר
+# סעיף 3: הוספת בית ספר
 # ========================================
-with tab3:
+def add_section():
     st.markdown("### ➕ הוספת בית ספר חדש")
     
     with st.form("add_school_form"):
@@ -438,7 +421,7 @@ with tab3:
             else:
                 try:
                     # הוספת בית ספר
-                    result = supabase.table("schools").insert({
+                    new_rows = insert("schools", {
                         "name": new_name,
                         "contact_person": new_contact or None,
                         "phone": new_phone or None,
@@ -447,17 +430,17 @@ with tab3:
                         "address": new_address or None,
                         "notes": new_notes or None,
                         "status": "active"
-                    }).execute()
+                    })
                     
                     # הוספת תקציב אם הוזן
-                    if new_budget > 0 and result.data:
-                        school_id = result.data[0]['id']
-                        supabase.table("school_budgets").insert({
+                    if new_budget > 0 and new_rows:
+                        school_id = new_rows[0]['id']
+                        insert("school_budgets", {
                             "school_id": school_id,
                             "budget_amount": new_budget,
                             "year": datetime.now().year,
                             "alert_threshold": 1000
-                        }).execute()
+                        })
                     
                     st.success(f"✅ בית הספר '{new_name}' נוסף בהצלחה!")
                     st.balloons()
@@ -466,29 +449,21 @@ with tab3:
                     st.error(f"❌ שגיאה: {str(e)}")
 
 # ========================================
-# טאב 4: ניתוח
+# סעיף 4: ניתוח
 # ========================================
-with tab4:
+def analysis_section():
     st.markdown("### 📊 ניתוח בתי ספר")
     
     try:
-        schools = supabase.table("schools").select("*").eq("status", "active").execute()
+        schools = get_active_schools("schools.names")
         
-        if schools.data:
-            # שליפת כל הפעילויות
-            all_activities = supabase.table("activities").select("school_id, date, status").execute()
+        if schools:
+            # ספירות והכנסות לכל בית ספר פעיל - SQL על ההעתק המקומי
+            summary = activity_summary_by_school(school_status="active")
             
-            if all_activities.data:
-                # ניתוח
-                df_acts = pd.DataFrame(all_activities.data)
-                school_names = {s['id']: s['name'] for s in schools.data}
-                school_prices = {s['id']: s.get('price_per_day', 0) or 0 for s in schools.data}
-                
-                df_acts['school_name'] = df_acts['school_id'].map(school_names)
-                df_acts['price'] = df_acts['school_id'].map(school_prices)
-                
+            if not summary.empty:
                 # גרף פעילויות לפי בית ספר
-                school_counts = df_acts['school_name'].value_counts().reset_index()
+                school_counts = summary.groupby('school_name')['activities'].sum().sort_values(ascending=False).reset_index()
                 school_counts.columns = ['בית ספר', 'פעילויות']
                 
                 col1, col2 = st.columns(2)
@@ -506,8 +481,7 @@ with tab4:
                 
                 with col2:
                     # הכנסות לפי בית ספר
-                    completed = df_acts[df_acts['status'].isin(['completed', 'confirmed'])]
-                    income_by_school = completed.groupby('school_name')['price'].sum().reset_index()
+                    income_by_school = summary.groupby('school_name')['income'].sum().reset_index()
                     income_by_school.columns = ['בית ספר', 'הכנסות']
                     
                     fig2 = go.Figure()
@@ -523,4 +497,7 @@ with tab4:
         else:
             st.info("אין בתי ספר פעילים")
     except Exception as e:
-        st.error(f"שגיאה: {str(e)}")
\ No newline at end of file
+        st.error(f"שגיאה: {str(e)}")
+
+
+render_section(section, dict(zip(SECTIONS, [list_section, activities_section, add_section, analysis_section])))
@@ -0,0 +1,22 @@
+import os
+
+# הטסטים רצים מול ה-backend המזויף (utils.fake_supabase), והעתק מקומי וטבלת כינויים בזיכרון
+os.environ.setdefault("DREAM_BUILD_BACKEND", "fake")
+os.environ.setdefault("DREAM_BUILD_REPLICA", ":memory:")
+os.environ.setdefault("DREAM_BUILD_ALIASES", ":memory:")
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture
+def backend():
+    """ה-Client המזויף שהאפליקציה משתמשת בו, עם טבלאות ריקות ו-cache נקי"""
+    import streamlit as st
+    from utils.supabase_client import get_supabase_client
+
+    client = get_supabase_client()
+    client.tables.clear()
+    st.cache_data.clear()
+    yield client
+    client.tables.clear()
+    st.cache_data.clear()
@@ -0,0 +1,87 @@
+from datetime import date, time
+import pytest
+from utils.bulk_edit import (DATE, EMPLOYEE, END, REMOVE, START, STATUS, apply_changes, editor_frame, plan_changes)
+
+EMPLOYEES = {"דנה": "u1", "יוסי": "u2"}
+
+
+def _activities(count: int = 3) -> list[dict]:
+    return [{"id": f"a{i}", "school_id": "s1", "employee_id": "u1", "date": f"2025-01-0{i + 1}",
+             "time_start": "08:00:00", "time_end": "12:00:00", "status": "planned",
+             "schools": {"name": "אלונים"}, "users": {"full_name": "דנה"}} for i in range(count)]
+
+
+def _plan(edit, activities=None):
+    activities = activities or _activities()
+    original = editor_frame(activities)
+    edited = original.copy()
+    edit(edited)
+    return plan_changes(original, edited, activities, EMPLOYEES)
+
+
+def test_unchanged_rows_are_not_sent():
+    assert _plan(lambda edited: None) == {"upsert": [], "delete": [], "errors": []}
+
+
+def test_changed_row_is_sent_as_full_row():
+    def edit(edited):
+        edited.loc["a1", EMPLOYEE] = "יוסי"
+        edited.loc["a1", END] = time(13, 30)
+    plan = _plan(edit)
+    assert plan["delete"] == [] and plan["errors"] == []
+    assert plan["upsert"] == [("2025-01-02 | אלונים", {
+        "id": "a1", "school_id": "s1", "employee_id": "u2", "date": "2025-01-02",
+        "time_start": "08:00:00", "time_end": "13:30:00", "status": "planned",
+    })]
+
+
+def test_remove_wins_over_edits():
+    def edit(edited):
+        edited.loc["a2", STATUS] = "בוטל"
+        edited.loc["a2", REMOVE] = True
+    assert _plan(edit) == {"upsert": [], "delete": [("2025-01-03 | אלונים", "a2")], "errors": []}
+
+
+@pytest.mark.parametrize("column, value, message", [
+    (DATE, None, "חסר תאריך"),
+    (EMPLOYEE, "מדריך לא קיים", "חובה לבחור מדריך"),
+    (START, None, "חסרה שעת התחלה/סיום"),
+    (END, time(7, 0), "שעת הסיום לפני שעת ההתחלה"),
+    (STATUS, "לא ידוע", "סטטוס לא מוכר"),
+])
+def test_invalid_rows_are_reported(column, value, message):
+    def edit(edited):
+        edited[column] = edited[column].astype(object)
+        edited.loc["a0", column] = value
+    assert _plan(edit) == {"upsert": [], "delete": [], "errors": [("2025-01-01 | אלונים", message)]}
+
+
+def test_failed_delete_batch_falls_back_to_single_rows(monkeypatch):
+    calls = []
+
+    def delete(table, filters):
+        ids = filters[0][2]
+        calls.append(ids)
+        if "a2" in ids:
+            raise Exception("row is locked")
+        return [{"id": activity_id} for activity_id in ids]
+
+    monkeypatch.setattr("utils.bulk_edit.delete", delete)
+    plan = {"upsert": [], "delete": [("ראשונה", "a1"), ("שנייה", "a2"), ("שלישית", "a3")], "errors": []}
+    assert apply_changes(plan) == {"updated": 0, "deleted": 2, "errors": [("שנייה", "row is locked")]}
+    assert calls == [("a1", "a2", "a3"), ("a1",), ("a2",), ("a3",)]
+
+
+def test_apply_changes_writes_to_backend(backend):
+    activities = _activities(5)
+    backend.seed("activities", [{key: value for key, value in act.items() if key not in ("schools", "users")}
+                                for act in activities])
+
+    def edit(edited):
+        edited.loc["a0", START] = time(9, 0)
+        edited.loc["a4", REMOVE] = True
+    result = apply_changes(_plan(edit, activities), batch_size=2)
+    assert result == {"updated": 1, "deleted": 1, "errors": []}
+    rows = {row["id"]: row for row in backend.tables["activities"]}
+    assert sorted(rows) == ["a0", "a1", "a2", "a3"]
+    assert rows["a0"]["time_start"] == "09:00:00" and rows["a0"]["date"] == str(date(2025, 1, 1))
@@ -0,0 +1,50 @@
+from datetime import date, timedelta
+from utils.calendar_index import BLOCK_WEEKS, CalendarIndex, block_start, calendar_weeks, week_start
+
+
+def _activity(activity_id: str, day: date, employee_id: str = "u1", school_id: str = "s1") -> dict:
+    return {"id": activity_id, "date": day.isoformat(), "employee_id": employee_id, "school_id": school_id,
+            "time_start": "08:00:00", "time_end": "12:00:00", "status": "planned"}
+
+
+def test_weeks_start_on_sunday():
+    sunday = date(2025, 1, 5)
+    assert all(week_start(sunday + timedelta(days=i)) == sunday for i in range(7))
+    assert week_start(sunday - timedelta(days=1)) == sunday - timedelta(weeks=1)
+    assert block_start(sunday).weekday() == 6
+
+
+def test_index_buckets_by_week_and_day():
+    sunday = date(2025, 1, 5)
+    index = CalendarIndex([_activity("a1", sunday), _activity("a2", sunday + timedelta(days=6)),
+                           _activity("a3", sunday), _activity("a4", sunday + timedelta(days=7))])
+    week = index.week(sunday)
+    assert list(week) == [sunday, sunday + timedelta(days=6)]
+    assert [act["id"] for act in week[sunday]] == ["a1", "a3"]
+    assert [act["id"] for act in index.week(sunday + timedelta(weeks=1))[sunday + timedelta(days=7)]] == ["a4"]
+    assert index.week(sunday - timedelta(weeks=1)) == {}
+
+
+def test_index_filters_by_employee_and_school():
+    sunday = date(2025, 1, 5)
+    index = CalendarIndex([_activity("a1", sunday, "u1", "s1"), _activity("a2", sunday, "u2", "s1"),
+                           _activity("a3", sunday, "u1", "s2")])
+    ids = lambda week: [act["id"] for acts in week.values() for act in acts]
+    assert ids(index.week(sunday, employee_id="u1")) == ["a1", "a3"]
+    assert ids(index.week(sunday, school_id="s1")) == ["a1", "a2"]
+    assert ids(index.week(sunday, employee_id="u1", school_id="s1")) == ["a1"]
+
+
+def test_range_across_block_boundary(backend):
+    next_block = block_start(date(2025, 1, 5)) + timedelta(weeks=BLOCK_WEEKS)
+    last_week = next_block - timedelta(weeks=1)
+    backend.seed("activities", [_activity("before", last_week + timedelta(days=2)),
+                                _activity("after", next_block + timedelta(days=1)),
+                                _activity("other", next_block + timedelta(days=1), employee_id="u2"),
+                                _activity("later", next_block + timedelta(weeks=1))])
+    weeks = calendar_weeks(last_week, 2)
+    assert list(weeks) == [last_week, next_block]
+    assert [act["id"] for acts in weeks[last_week].values() for act in acts] == ["before"]
+    assert sorted(act["id"] for acts in weeks[next_block].values() for act in acts) == ["after", "other"]
+    mine = calendar_weeks(last_week, 2, employee_id="u1")
+    assert [act["id"] for acts in mine[next_block].values() for act in acts] == ["after"]
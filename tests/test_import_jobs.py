@@ -0,0 +1,49 @@
+import io
+import os
+import time
+import utils.importer
+from utils.import_jobs import ACTIVE_STATUSES, ImportJobs
+
+SCHOOLS_CSV = "name,price_per_day\n" + "".join(f"בית ספר {i},{100 + i}\n" for i in range(5))
+
+
+def _file() -> io.BytesIO:
+    file = io.BytesIO(SCHOOLS_CSV.encode("utf-8"))
+    file.name = "schools.csv"
+    return file
+
+
+def _wait(jobs: ImportJobs, job_id: str, timeout: float = 10) -> dict:
+    deadline = time.monotonic() + timeout
+    while (job := jobs.get(job_id))["status"] in ACTIVE_STATUSES:
+        assert time.monotonic() < deadline, "העבודה לא הסתיימה"
+        time.sleep(0.02)
+    return job
+
+
+def test_cancel_and_resume_from_checkpoint(backend, tmp_path, monkeypatch):
+    read_chunks = utils.importer.read_chunks
+    monkeypatch.setattr("utils.importer.read_chunks", lambda file, chunk_rows=2: read_chunks(file, chunk_rows))
+    import_chunks = utils.importer.import_chunks
+    jobs = ImportJobs(str(tmp_path), max_workers=1)
+
+    def cancel_during_first_chunk(*args, **kwargs):
+        for chunk in import_chunks(*args, **kwargs):
+            jobs.cancel(job_id)  # לחיצה על "בטל" בזמן שהמנה נכתבת
+            yield chunk
+
+    monkeypatch.setattr("utils.import_jobs.import_chunks", cancel_during_first_chunk)
+    job_id = jobs.submit("בתי ספר", _file(), {"created_by": None})
+    job = _wait(jobs, job_id)
+    assert (job["status"], job["checkpoint"], job["rows_done"], job["inserted"]) == ("cancelled", 1, 2, 2)
+    assert len(backend.tables["schools"]) == 2
+
+    monkeypatch.setattr("utils.import_jobs.import_chunks", import_chunks)
+    assert jobs.resume(job_id)
+    job = _wait(jobs, job_id)
+    # המשך מה-checkpoint: המנה הראשונה לא נקראת שוב (אחרת היא הייתה נספרת כ"דולגו")
+    assert (job["status"], job["checkpoint"], job["rows_done"]) == ("completed", 3, 5)
+    assert (job["inserted"], job["skipped"], job["error_count"]) == (5, 0, 0)
+    assert sorted(row["name"] for row in backend.tables["schools"]) == [f"בית ספר {i}" for i in range(5)]
+    assert not os.path.exists(job["file_path"])
+    assert not jobs.resume(job_id)
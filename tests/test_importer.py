@@ -0,0 +1,105 @@
+import io
+import pandas as pd
+from utils.importer import (existing_keys, import_file, natural_key, normalize_activities, normalize_dates,
+                            normalize_statuses, normalize_times, plan_rows)
+
+
+def _csv(text: str, name: str = "import.csv") -> io.BytesIO:
+    file = io.BytesIO(text.encode("utf-8"))
+    file.name = name
+    return file
+
+
+def test_update_import_keeps_role_and_status(backend):
+    backend.seed("users", [{"id": "u1", "email": "dana@example.com", "full_name": "דנה", "role": "manager",
+                            "status": "inactive", "daily_rate": 300}])
+    backend.seed("schools", [{"id": "s1", "name": "אלונים", "price_per_day": 500, "status": "inactive"}])
+
+    users = import_file("עובדים/מדריכים", _csv("email,full_name,daily_rate\ndana@example.com,דנה לוי,350\n"),
+                        on_existing="update")
+    schools = import_file("בתי ספר", _csv("name,price_per_day\nאלונים,650\n"), on_existing="update")
+
+    assert (users["updated"], users["errors"]) == (1, [])
+    assert (schools["updated"], schools["errors"]) == (1, [])
+    [user] = backend.tables["users"]
+    assert (user["id"], user["role"], user["status"]) == ("u1", "manager", "inactive")
+    assert (user["full_name"], user["daily_rate"]) == ("דנה לוי", 350.0)
+    [school] = backend.tables["schools"]
+    assert (school["id"], school["status"], school["price_per_day"]) == ("s1", "inactive", 650.0)
+
+
+def test_natural_key_normalizes_time_amount_and_text():
+    activity = {"school_id": "s1", "employee_id": "u1", "date": "2025-01-05", "time_start": "08:00:00"}
+    assert natural_key("פעילויות היסטוריות", activity) == ("s1", "u1", "2025-01-05", "08:00")
+    record = {"date": "2025-01-05", "amount": "150", "category": " ציוד  משרדי ", "description": None}
+    assert natural_key("רשומות כספיות", record) == ("2025-01-05", 150.0, "ציוד משרדי", "")
+    assert natural_key("בתי ספר", {"name": "Alonim  School"}) == natural_key("בתי ספר", {"name": "alonim school"})
+
+
+def test_duplicate_in_file_reports_first_line_across_chunks():
+    seen = {}
+    first = plan_rows("בתי ספר", [(2, {"name": "אלונים"}), (3, {"name": "הדר"}), (4, {"name": "אלונים "})], {}, seen)
+    second = plan_rows("בתי ספר", [(5, {"name": "הדר"})], {}, seen)
+    assert [line for line, _ in first["new"]] == [2, 3]
+    assert first["errors"] == [(4, "כפילות של שורה 2 בקובץ")]
+    assert second["new"] == [] and second["errors"] == [(5, "כפילות של שורה 3 בקובץ")]
+
+
+def test_existing_key_is_skipped_or_updated():
+    existing = {natural_key("בתי ספר", {"name": "אלונים"}): {"id": "s1", "status": "inactive"}}
+    rows = [(2, {"name": "אלונים", "price_per_day": 650.0, "status": "active"}), (3, {"name": "הדר"})]
+    skipped = plan_rows("בתי ספר", rows, existing, {})
+    assert (skipped["skipped"], skipped["update"], [line for line, _ in skipped["new"]]) == (1, [], [3])
+    updated = plan_rows("בתי ספר", rows, existing, {}, on_existing="update")
+    assert updated["update"] == [(2, {"name": "אלונים", "price_per_day": 650.0, "status": "inactive", "id": "s1"})]
+
+
+def test_existing_keys_reads_only_the_chunk_date_range(backend):
+    backend.seed("activities", [{"id": f"a{day}", "school_id": "s1", "employee_id": "u1",
+                                 "date": f"2025-01-{day:02d}", "time_start": "08:00:00"} for day in range(1, 11)])
+    rows = [(2, {"date": "2025-01-03"}), (3, {"date": "2025-01-05"})]
+    keys = existing_keys("פעילויות היסטוריות", rows, {})
+    assert sorted(value["id"] for value in keys.values()) == ["a3", "a4", "a5"]
+    assert keys[("s1", "u1", "2025-01-04", "08:00")] == {"id": "a4"}
+
+
+def test_existing_keys_of_small_tables_are_read_once(backend):
+    backend.seed("schools", [{"id": "s1", "name": "אלונים", "status": "inactive"}])
+    cache = {}
+    keys = existing_keys("בתי ספר", [], cache)
+    backend.seed("schools", [{"id": "s2", "name": "הדר"}])
+    assert existing_keys("בתי ספר", [], cache) is keys
+    assert keys == {("אלונים",): {"id": "s1", "status": "inactive"}}
+
+
+def test_normalize_dates_formats_and_excel_serials():
+    raw = pd.Series(["05/02/2024", "5.2.2024", "2024-02-05", "45000", "45000.75", "31/02/2024", "abc", None, " "])
+    assert normalize_dates(raw).tolist() == ["2024-02-05", "2024-02-05", "2024-02-05", "2023-03-15", "2023-03-15",
+                                             pd.NA, pd.NA, pd.NA, pd.NA]
+    assert normalize_dates(pd.Series(pd.to_datetime(["2024-02-05 10:00"]))).tolist() == ["2024-02-05"]
+
+
+def test_normalize_dates_drops_the_time_part():
+    raw = pd.Series(["1/2/2024 08:00", "2024-02-05T08:00:00", "05.02.2024  14:30"])
+    assert normalize_dates(raw).tolist() == ["2024-02-01", "2024-02-05", "2024-02-05"]
+
+
+def test_normalize_times_and_statuses():
+    times = pd.Series(["8:00", "08:30:00", "0.5", "", None, "25:00", "abc"])
+    assert normalize_times(times, "08:00").tolist() == ["08:00", "08:30", "12:00", "08:00", "08:00", pd.NA, pd.NA]
+    statuses = pd.Series(["הושלם", "בוטלה", "planned", "", None, "xyz"])
+    assert normalize_statuses(statuses).tolist() == ["completed", "cancelled", "planned", "completed", "completed", pd.NA]
+
+
+def test_normalize_activities_reports_first_error_per_row():
+    df = pd.DataFrame({
+        "school_name": ["אלונים", "אלונים", "הדר", "אלונים", "אלונים"],
+        "employee_name": ["דנה", "דנה", "דנה", "דנה", "דנה"],
+        "date": ["1/2/2024 08:00", "32/01/2024", "2024-02-01", "2024-02-01", None],
+        "time_start": ["8:00", "8:00", "8:00", "9 בבוקר", "8:00"],
+        "status": ["הושלם", "", "", "", "xyz"],
+    }, index=[0, 1, 2, 3, 4])
+    clean, errors = normalize_activities(df, {"אלונים": "s1"}, {"דנה": "u1"})
+    assert pd.isna(errors[0]) and clean.loc[0, "date"] == "2024-02-01"
+    assert errors[1:].tolist() == ["פורמט תאריך לא תקין: '32/01/2024'", "בית ספר 'הדר' לא נמצא",
+                                   "שעת התחלה לא תקינה: '9 בבוקר'", "תאריך חסר"]
@@ -0,0 +1,54 @@
+import pandas as pd
+from utils.importer import _resolve_names
+from utils.name_index import AliasStore, Match, NameIndex, normalize_name
+
+SCHOOLS = {"בית ספר אלונים": "s1", "בית ספר גאולים": "s2", "בית ספר הדר": "s3", "בית ספר רמון": "s4"}
+
+
+def test_normalize_strips_niqqud_quotes_and_separators():
+    assert normalize_name('בֵּית  סֵפֶר "אַלּוֹנִים"') == normalize_name("בית ספר אלונים")
+    assert normalize_name("Noam-Levi") == "noam levi"
+    assert normalize_name(None) == ""
+
+
+def test_normalize_final_letters_and_abbreviations():
+    assert normalize_name("בית ספר גאולים") == normalize_name("בית ספר גאולימ")
+    assert normalize_name('ביה"ס אלונים') == normalize_name("בית ספר אלונים")
+    assert normalize_name('ממ"ד יונתן') == normalize_name("ממלכתי דתי יונתן")
+
+
+def test_common_tokens_do_not_count():
+    index = NameIndex(SCHOOLS)
+    assert index._common == {"בית", "ספר"}
+    assert index._grams_of(normalize_name("בית ספר הדר")) == {" ה", "הד", "דר", "ר "}
+
+
+def test_exact_and_alias_lookups_score_one():
+    index = NameIndex(SCHOOLS, {normalize_name("אלונים ישן"): "s1"})
+    assert index.lookup('ביה"ס אלונים') == Match("s1", "בית ספר אלונים", 1.0)
+    assert index.lookup("אלונים ישן") == Match("s1", "בית ספר אלונים", 1.0)
+    assert index.lookup("") is None
+
+
+def test_near_match_is_scored_with_dice():
+    index = NameIndex({"רמון": "s1", "הדר": "s2"})
+    # " רמונ " / " רמונה ": 4 זוגות משותפים מתוך 5 + 6
+    assert index.lookup("רמונה") == Match("s1", "רמון", round(2 * 4 / 11, 3))
+    assert index.lookup("תל אביב") is None
+
+
+def test_near_match_is_never_applied_automatically():
+    names = pd.Series(["בית ספר אלונים ב", 'ביה"ס אלונים'])
+    ids, errors = _resolve_names(names, SCHOOLS, "school", "בית ספר")
+    assert NameIndex(SCHOOLS).lookup(names[0]).score >= 0.85
+    assert pd.isna(ids[0]) and "האם התכוונת ל-'בית ספר אלונים'" in errors[0]
+    assert ids[1] == "s1" and pd.isna(errors[1])
+
+
+def test_alias_store_keeps_normalized_names_per_kind():
+    store = AliasStore(":memory:")
+    store.add("school", "אלונים  ישן", "s1")
+    store.add("school", "אלונים ישן", "s2")
+    store.add("school", "  ", "s3")
+    assert store.aliases("school") == {normalize_name("אלונים ישן"): "s2"}
+    assert store.aliases("employee") == {}
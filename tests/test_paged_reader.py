@@ -0,0 +1,49 @@
+import pytest
+from utils.data import PagedReader
+from utils.fake_supabase import FakeQuery
+
+
+@pytest.fixture
+def counts(monkeypatch):
+    """ה-count שנשלח בכל select (None - בלי ספירה)"""
+    sent = []
+    select = FakeQuery.select
+
+    def recording_select(self, *columns, count=None, head=None):
+        sent.append(count)
+        return select(self, *columns, count=count, head=head)
+
+    monkeypatch.setattr(FakeQuery, "select", recording_select)
+    return sent
+
+
+def _seed(backend, rows: int = 25):
+    backend.seed("activities", [{"id": f"a{i:03d}", "school_id": "s1", "employee_id": "u1",
+                                 "date": f"2025-01-{i % 3 + 1:02d}", "status": "planned"} for i in range(rows)])
+
+
+def test_reads_past_server_row_cap(backend, counts, monkeypatch):
+    _seed(backend)
+    monkeypatch.setattr(backend, "max_rows", 4)
+    reader = PagedReader("activities", "id, date", order="date", page_size=10)
+    chunks = list(reader)
+    assert max(len(chunk) for chunk in chunks) == 4
+    assert sorted(row["id"] for chunk in chunks for row in chunk) == [f"a{i:03d}" for i in range(25)]
+    assert (reader.rows_read, reader.total, reader.truncated) == (25, 25, False)
+    # ספירה מדויקת בדף הראשון בלבד
+    assert counts == ["exact"] + [None] * (len(chunks) - 1)
+
+
+def test_max_rows_marks_truncated(backend):
+    _seed(backend)
+    reader = PagedReader("activities", "id", filters=(("eq", "status", "planned"),), page_size=3, max_rows=7)
+    assert [len(chunk) for chunk in reader] == [3, 3, 1]
+    assert (reader.rows_read, reader.total, reader.truncated) == (7, 25, True)
+
+
+def test_filters_and_empty_result(backend):
+    _seed(backend)
+    reader = PagedReader("activities", "id", filters=(("eq", "date", "2025-01-02"),), page_size=5)
+    assert sum(len(chunk) for chunk in reader) == reader.total == 8
+    empty = PagedReader("activities", "id", filters=(("eq", "status", "cancelled"),))
+    assert list(empty) == [] and (empty.rows_read, empty.total, empty.truncated) == (0, 0, False)
@@ -0,0 +1,94 @@
+from utils.fake_supabase import FakeClient
+from utils.replica import Replica
+
+
+def _client(rows: int = 25, max_rows: int | None = None) -> FakeClient:
+    client = FakeClient(max_rows=max_rows)
+    client.seed("users", [{"id": "u1", "full_name": "דנה", "role": "employee", "email": "dana@example.com",
+                           "phone": "050-0000000", "daily_rate": 300}])
+    client.seed("activities", [{"id": f"a{i:03d}", "school_id": "s1", "employee_id": "u1",
+                                "date": "2025-01-01", "status": "completed"} for i in range(rows)])
+    return client
+
+
+def _ids(replica: Replica, table: str = "activities") -> set:
+    replica.sync(table, force=True)
+    return {row["id"] for row in replica.query(f"SELECT id FROM {table}")}
+
+
+class _DeleteDuringRead(FakeClient):
+    """אחרי after_reads קריאות מהטבלה נמחקת השורה victim - כמו מחיקה בזמן סנכרון"""
+
+    def __init__(self, source: FakeClient, table: str, victim: str, after_reads: int = 1):
+        super().__init__(tables=source.tables, max_rows=source.max_rows)
+        self._table, self._victim, self._after, self._reads = table, victim, after_reads, 0
+
+    def table(self, name: str):
+        query = super().table(name)
+        execute = query.execute
+
+        def execute_and_delete():
+            result = execute()
+            if name == self._table and query._op == "select":
+                self._reads += 1
+                if self._reads == self._after:
+                    FakeClient.table(self, name).delete().eq("id", self._victim).execute()
+            return result
+
+        query.execute = execute_and_delete
+        return query
+
+
+def test_full_copy_reads_past_server_row_cap(monkeypatch):
+    monkeypatch.setattr("utils.replica.SYNC_PAGE_SIZE", 10)
+    replica = Replica(_client(25, max_rows=4), ":memory:")
+    assert len(_ids(replica)) == 25
+
+
+def test_copies_only_projected_columns():
+    replica = Replica(_client(), ":memory:")
+    replica.sync("users", force=True)
+    columns = set(replica.query_frame("SELECT * FROM users").columns)
+    assert {"full_name", "daily_rate"} <= columns
+    assert not {"email", "phone"} & columns
+
+
+def test_old_copy_with_extra_columns_is_rebuilt():
+    replica = Replica(_client(), ":memory:")
+    replica._store("users", [{"id": "u1", "email": "dana@example.com", "updated_at": "2025-01-01"}])
+    replica.sync("users", force=True)
+    assert "email" not in set(replica.query_frame("SELECT * FROM users").columns)
+
+
+def test_incremental_sync_pulls_changes_past_row_cap(monkeypatch):
+    monkeypatch.setattr("utils.replica.SYNC_PAGE_SIZE", 10)
+    client = _client(5, max_rows=4)
+    replica = Replica(client, ":memory:")
+    _ids(replica)
+    client.table("activities").insert([{"id": f"b{i:03d}", "school_id": "s1", "employee_id": "u1",
+                                        "date": "2025-02-01", "status": "planned"} for i in range(9)]).execute()
+    client.table("activities").update({"status": "cancelled"}).eq("id", "a000").execute()
+    assert len(_ids(replica)) == 14
+    assert replica.query("SELECT status FROM activities WHERE id = 'a000'")[0]["status"] == "cancelled"
+
+
+def test_delete_during_full_copy_does_not_skip_rows(monkeypatch):
+    monkeypatch.setattr("utils.replica.SYNC_PAGE_SIZE", 10)
+    replica = Replica(_DeleteDuringRead(_client(25), "activities", "a002"), ":memory:")
+    assert _ids(replica) >= {f"a{i:03d}" for i in range(25)} - {"a002"}
+
+
+def test_reconcile_forgets_only_deleted_rows(monkeypatch):
+    monkeypatch.setattr("utils.replica.SYNC_PAGE_SIZE", 10)
+    source = _client(25)
+    replica = Replica(source, ":memory:", reconcile_interval=0)
+    everything = _ids(replica)
+
+    # מחיקה מחוץ לאפליקציה, ועוד מחיקה אחרי הדף הראשון של קריאת המזהים
+    # (הקריאה הראשונה היא בדיקת השינויים, השנייה - הדף הראשון של ההשוואה)
+    source.table("activities").delete().eq("id", "a020").execute()
+    replica.client = _DeleteDuringRead(source, "activities", "a001", after_reads=2)
+    assert _ids(replica) - {"a001"} == everything - {"a020", "a001"}
+
+    replica.client = source
+    assert _ids(replica) == everything - {"a020", "a001"}
@@ -0,0 +1,134 @@
+import pandas as pd
+from utils.replica import get_replica
+from utils.archive import archived_years, archive_version, read_archive
+
+# === ניתוחים על ההעתק המקומי ===
+# אגרגציות שהיו דורשות להוריד את כל הפעילויות רצות כאן כ-SQL על SQLite
+
+
+def _activity_where(start=None, end=None, statuses=None, school_status=None) -> tuple[str, list]:
+    """תנאי WHERE ופרמטרים לשאילתות פעילויות"""
+    clauses, params = ["1 = 1"], []
+    if start:
+        clauses.append("a.date >= ?")
+        params.append(str(start))
+    if end:
+        clauses.append("a.date <= ?")
+        params.append(str(end))
+    if statuses:
+        clauses.append(f"a.status IN ({', '.join('?' for _ in statuses)})")
+        params.extend(statuses)
+    if school_status:
+        clauses.append("s.status = ?")
+        params.append(school_status)
+    return " AND ".join(clauses), params
+
+
+# === פעילויות שהועברו לארכיון ===
+# שנים שבארכיון (utils.archive) נטענות להעתק המקומי כטבלה נפרדת, והשאילתות קוראות
+# איחוד של הטבלה החיה והארכיון - רק כשהטווח מגיע לשנה שבארכיון
+ARCHIVE_TABLE = "activities_archive"
+ARCHIVE_COLUMNS = ("id", "school_id", "employee_id", "date", "status", "school_name", "price_per_day")
+
+
+def _load_archive() -> pd.DataFrame:
+    frame = read_archive(columns=ARCHIVE_COLUMNS)
+    return frame.assign(date=frame["date"].astype("string"))
+
+
+def _activities_from(start=None) -> str:
+    """מקור הפעילויות לשאילתה: activities, ואיחוד עם הארכיון כשהטווח מגיע לשנה שבארכיון.
+    לשורות מהארכיון יש שם בית ספר ומחיר מזמן הארכוב (school_name, price_per_day)"""
+    live = "SELECT id, school_id, employee_id, date, status, NULL AS school_name, NULL AS price_per_day FROM activities"
+    years = archived_years()
+    if not years or (start and int(str(start)[:4]) > years[-1]):
+        return f"({live})"
+    get_replica().load_table(ARCHIVE_TABLE, archive_version(), _load_archive)
+    return f"""(
+        {live}
+        UNION ALL
+        SELECT {', '.join(ARCHIVE_COLUMNS)} FROM {ARCHIVE_TABLE} WHERE id NOT IN (SELECT id FROM activities)
+    )"""
+
+
+def activity_summary_by_school(start=None, end=None, statuses: tuple | None = None,
+                               income_statuses: tuple = ("completed", "confirmed"),
+                               school_status: str | None = None) -> pd.DataFrame:
+    """לכל בית ספר: מספר פעילויות והכנסה (מחיר ליום × פעילויות בסטטוס income_statuses).
+    עמודות: school_id, school_name, activities, income"""
+    where, params = _activity_where(start, end, statuses, school_status)
+    income_in = ", ".join("?" for _ in income_statuses)
+    sql = f"""
+        SELECT a.school_id AS school_id,
+               COALESCE(s.name, a.school_name, 'לא ידוע') AS school_name,
+               COUNT(*) AS activities,
+               SUM(CASE WHEN a.status IN ({income_in}) THEN COALESCE(s.price_per_day, a.price_per_day, 0) ELSE 0 END) AS income
+        FROM {_activities_from(start)} a
+        LEFT JOIN schools s ON s.id = a.school_id
+        WHERE {where}
+        GROUP BY a.school_id
+        ORDER BY activities DESC
+    """
+    return get_replica().query_frame(sql, tuple(income_statuses) + tuple(params), tables={
+        "activities": ("school_id", "employee_id", "date", "status"),
+        "schools": ("name", "price_per_day", "status"),
+    })
+
+
+def total_income(start=None, end=None, statuses: tuple = ("completed", "confirmed"),
+                 school_status: str | None = None) -> int:
+    """סך ההכנסות מפעילויות בתקופה, בשקלים שלמים (לתצוגה)"""
+    summary = activity_summary_by_school(start, end, statuses, statuses, school_status)
+    return int(round(summary["income"].sum())) if not summary.empty else 0
+
+
+def financial_summary(start=None, end=None) -> pd.DataFrame:
+    """סכום רשומות כספיות ידניות לפי סוג וקטגוריה. עמודות: type, category, amount"""
+    clauses, params = ["1 = 1"], []
+    if start:
+        clauses.append("date >= ?")
+        params.append(str(start))
+    if end:
+        clauses.append("date <= ?")
+        params.append(str(end))
+    sql = f"""
+        SELECT type, category, SUM(COALESCE(amount, 0)) AS amount
+        FROM financial_records
+        WHERE {' AND '.join(clauses)}
+        GROUP BY type, category
+    """
+    return get_replica().query_frame(sql, tuple(params), tables={
+        "financial_records": ("type", "category", "date", "amount"),
+    })
+
+
+# הערכת שעות לפעילות לחישוב שכר שעתי
+HOURS_PER_ACTIVITY = 5
+
+
+def payroll_summary(start=None, end=None, statuses: tuple = ("completed",)) -> pd.DataFrame:
+    """שכר לכל מדריך לפי פעילויות בתקופה: תעריף יומי × פעילויות, אחרת תעריף שעתי × HOURS_PER_ACTIVITY × פעילויות.
+    עמודות: employee_id, full_name, activities, method, salary"""
+    where, params = _activity_where(start, end, statuses)
+    sql = f"""
+        SELECT u.id AS employee_id,
+               u.full_name AS full_name,
+               COALESCE(c.activities, 0) AS activities,
+               CASE WHEN COALESCE(u.daily_rate, 0) > 0 THEN 'יומי'
+                    WHEN COALESCE(u.hourly_rate, 0) > 0 THEN 'שעתי'
+                    ELSE '-' END AS method,
+               CASE WHEN COALESCE(u.daily_rate, 0) > 0 THEN COALESCE(c.activities, 0) * u.daily_rate
+                    WHEN COALESCE(u.hourly_rate, 0) > 0 THEN COALESCE(c.activities, 0) * ? * u.hourly_rate
+                    ELSE 0 END AS salary
+        FROM users u
+        LEFT JOIN (SELECT a.employee_id AS employee_id, COUNT(*) AS activities
+                   FROM {_activities_from(start)} a
+                   WHERE {where}
+                   GROUP BY a.employee_id) c ON c.employee_id = u.id
+        WHERE u.role = 'employee'
+        ORDER BY u.full_name
+    """
+    return get_replica().query_frame(sql, (HOURS_PER_ACTIVITY, *params), tables={
+        "activities": ("school_id", "employee_id", "date", "status"),
+        "users": ("full_name", "role", "hourly_rate", "daily_rate"),
+    })
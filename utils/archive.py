@@ -0,0 +1,126 @@
+import os
+import glob
+from datetime import datetime
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from utils.data import PagedReader, delete
+from utils.views import columns_for
+from utils.exports import ACTIVITY_SCHEMA, EXPORT_COMPRESSION, activity_record
+
+# === ארכיון פעילויות ישנות ===
+# במקום מחיקה אחת לא חסומה: פעילויות לפני תאריך נכתבות קודם לקבצי Parquet מקומיים
+# (מחיצה לכל שנה, כולל שם בית הספר, מחיר ליום ושם המדריך), ורק אחרי שהקבצים נסגרו
+# הן נמחקות מהשרת במנות לפי id. הטבלה החיה נשארת קטנה, והניתוחים (utils.analytics)
+# קוראים שנים שבארכיון מהקבצים. ריצה שנעצרה באמצע המחיקה פשוט מורצת שוב -
+# שורה שנמצאת גם בטבלה וגם בארכיון נספרת פעם אחת
+ARCHIVE_DIR = os.environ.get("DREAM_BUILD_ARCHIVE",
+                             os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "archive"))
+
+# כמה id בכל בקשת מחיקה - רשימת ה-id נשלחת ב-URL
+ARCHIVE_DELETE_BATCH = 200
+
+
+def _table_dir(table: str = "activities") -> str:
+    return os.path.join(ARCHIVE_DIR, table)
+
+
+def _parts(table: str = "activities") -> list[str]:
+    return sorted(glob.glob(os.path.join(_table_dir(table), "year=*", "*.parquet")))
+
+
+def _year_of(path: str) -> int:
+    """year=2023/part-....parquet -> 2023"""
+    return int(os.path.basename(os.path.dirname(path)).split("=")[1])
+
+
+def archived_years(table: str = "activities") -> list[int]:
+    """השנים שיש להן קבצים בארכיון"""
+    return sorted({_year_of(path) for path in _parts(table)})
+
+
+def archive_version(table: str = "activities") -> tuple:
+    """חתימת קבצי הארכיון - משתנה כשנוסף/הוחלף קובץ (לרענון עותקים שנטענו)"""
+    return tuple((path, os.stat(path).st_mtime_ns) for path in _parts(table))
+
+
+def archive_stats(table: str = "activities") -> dict:
+    """שנה -> מספר שורות, מהמטא-דאטה של הקבצים בלי לקרוא נתונים"""
+    stats = {}
+    for path in _parts(table):
+        year = _year_of(path)
+        stats[year] = stats.get(year, 0) + pq.ParquetFile(path).metadata.num_rows
+    return stats
+
+
+def read_archive(start=None, end=None, columns: tuple | None = None, table: str = "activities") -> pd.DataFrame:
+    """שורות מהארכיון בטווח (כולל). רק מחיצות השנים בטווח נפתחות, וסינון התאריך
+    נדחף לקריאת הקבצים. שורה שנכתבה בכמה ריצות מופיעה פעם אחת"""
+    first = int(str(start)[:4]) if start else None
+    last = int(str(end)[:4]) if end else None
+    paths = [path for path in _parts(table)
+             if (first is None or _year_of(path) >= first) and (last is None or _year_of(path) <= last)]
+    if not paths:
+        return pd.DataFrame(columns=list(columns or ACTIVITY_SCHEMA.names))
+    dataset = ds.dataset(paths, schema=ACTIVITY_SCHEMA, format="parquet")
+    condition = None
+    if start:
+        condition = ds.field("date") >= pd.Timestamp(str(start)).date()
+    if end:
+        upper = ds.field("date") <= pd.Timestamp(str(end)).date()
+        condition = upper if condition is None else condition & upper
+    frame = dataset.to_table(columns=list(columns) if columns else None, filter=condition).to_pandas()
+    return frame.drop_duplicates("id") if "id" in frame else frame
+
+
+def _write_archive(before, run_id: str, on_progress=None) -> dict:
+    """שלב 1: הפעילויות לפני before -> קובץ לכל שנה. הקבצים נכתבים כ-.tmp ומקבלים את
+    שמם הסופי רק אחרי שנסגרו, כך שקובץ בארכיון תמיד שלם. מחזיר שנה -> נתיב"""
+    reader = PagedReader("activities", columns_for("activities.export", "activities"),
+                         (("lt", "date", str(before)),), order="date")
+    writers, paths = {}, {}
+    try:
+        for page in reader:
+            years = {}
+            for record in map(activity_record, page):
+                years.setdefault(record["date"].year, []).append(record)
+            for year, records in years.items():
+                if year not in writers:
+                    directory = os.path.join(_table_dir(), f"year={year}")
+                    os.makedirs(directory, exist_ok=True)
+                    paths[year] = os.path.join(directory, f"part-{run_id}.parquet")
+                    writers[year] = pq.ParquetWriter(paths[year] + ".tmp", ACTIVITY_SCHEMA,
+                                                     compression=EXPORT_COMPRESSION)
+                writers[year].write_table(pa.Table.from_pylist(records, schema=ACTIVITY_SCHEMA))
+            if on_progress:
+                on_progress("archive", reader.rows_read, reader.total or reader.rows_read)
+    except BaseException:
+        # ריצה שנכשלה לא משאירה קבצים חלקיים, ושום שורה עוד לא נמחקה
+        for year, writer in writers.items():
+            writer.close()
+            os.remove(paths[year] + ".tmp")
+        raise
+    for year, writer in writers.items():
+        writer.close()
+        os.replace(paths[year] + ".tmp", paths[year])
+    return paths
+
+
+def archive_activities(before, on_progress=None, batch_size: int = ARCHIVE_DELETE_BATCH) -> dict:
+    """העברת פעילויות לפני before לארכיון ומחיקתן מהשרת במנות.
+    on_progress(שלב, בוצעו, סה״כ) - שלב "archive" ואז "delete".
+    מחזיר {"archived", "deleted", "years"}"""
+    run_id = datetime.now().strftime("%Y%m%d%H%M%S")
+    paths = _write_archive(before, run_id, on_progress)
+    total = sum(pq.ParquetFile(path).metadata.num_rows for path in paths.values())
+
+    # שלב 2: המחיקה לפי ה-id שבקבצים שנכתבו - רק מה שנשמר בארכיון נמחק
+    deleted = 0
+    for path in paths.values():
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=["id"]):
+            ids = tuple(batch.column("id").to_pylist())
+            deleted += len(delete("activities", (("in", "id", ids),)))
+            if on_progress:
+                on_progress("delete", deleted, total)
+    return {"archived": total, "deleted": deleted, "years": sorted(paths)}
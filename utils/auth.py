@@ -1,5 +1,6 @@
 import streamlit as st
 from utils.supabase_client import supabase
+from utils.data import insert
 
 def register(email: str, password: str, full_name: str, phone: str, role: str):
     """רישום משתמש חדש"""
@@ -21,7 +22,7 @@ def register(email: str, password: str, full_name: str, phone: str, role: str):
                 "status": "active"
             }
             
-            supabase.table("users").insert(user_data).execute()
+            insert("users", user_data)
             
             return {
                 "success": True,
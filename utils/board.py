@@ -0,0 +1,65 @@
+from datetime import date
+import pandas as pd
+import streamlit as st
+
+# === לוח פעילויות בטבלה אחת ===
+# במקום st.markdown (ועמודות וכפתורים) לכל שורה - כל הרשימה נבנית במעבר אחד לטבלה
+# ונשלחת כ-st.dataframe אחד. הדפדפן מצייר רק את השורות שעל המסך, כך שהעלות בדפדפן
+# וב-websocket לא גדלה עם הטווח. פעולות (עריכה/מחיקה/אישור) על השורה שנבחרה בטבלה
+
+# לפי date.weekday(): 0 = שני
+DAYS_HEBREW = ['שני', 'שלישי', 'רביעי', 'חמישי', 'שישי', 'שבת', 'ראשון']
+
+STATUS_ICONS = {'planned': '🟡', 'confirmed': '🟢', 'completed': '✅', 'cancelled': '🔴'}
+STATUS_LABELS = {'planned': 'מתוכנן', 'confirmed': 'מאושר', 'completed': 'הושלם', 'cancelled': 'בוטל'}
+
+NO_EMPLOYEE = '❌ לא שובץ'
+NO_EMPLOYEE_COLOR = "#6B7280"
+
+# עמודה פנימית עם צבע השורה - לא מוצגת (עמודות שמתחילות ב-_ מוסתרות)
+COLOR_COLUMN = "_color"
+
+
+def activity_frame(activities: list[dict], colors: dict | None = None,
+                   school: bool = True, employee: bool = True, status: bool = True) -> pd.DataFrame:
+    """פעילויות -> טבלה לתצוגה, במעבר אחד. יום בשבוע מחושב פעם אחת לכל תאריך;
+    colors (מדריך -> צבע) מוסיף לכל שורה את צבע המדריך"""
+    weekdays = {}
+    rows = []
+    for act in activities:
+        day = act['date']
+        if day not in weekdays:
+            weekdays[day] = DAYS_HEBREW[date.fromisoformat(day[:10]).weekday()]
+        row = {'תאריך': day, 'יום': weekdays[day]}
+        if school:
+            row['בית ספר'] = act['schools']['name'] if act.get('schools') else '-'
+        if employee:
+            row['מדריך'] = act['users']['full_name'] if act.get('users') else NO_EMPLOYEE
+        row['שעות'] = f"{(act.get('time_start') or '')[:5]} - {(act.get('time_end') or '')[:5]}"
+        if status:
+            row['סטטוס'] = f"{STATUS_ICONS.get(act['status'], '⚪')} {STATUS_LABELS.get(act['status'], act['status'])}"
+        if colors is not None:
+            row[COLOR_COLUMN] = colors.get(act.get('employee_id'), NO_EMPLOYEE_COLOR)
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def render_board(frame: pd.DataFrame, color_by: str | None = None, selectable: bool = True) -> int | None:
+    """הטבלה כאלמנט אחד. color_by - עמודה שנצבעת בצבע השורה (אם יש).
+    מחזיר את מספר השורה שנבחרה (או None). הבחירה מתאפסת כשהשורות משתנות - אחרי כתיבה
+    הטבלה נבנית מחדש ולא נשארת בחירה על שורה אחרת"""
+    columns = [column for column in frame.columns if not str(column).startswith("_")]
+    data = frame
+    if color_by and COLOR_COLUMN in frame and not frame.empty:
+        styles = [f"color: {color}; font-weight: 600" for color in frame[COLOR_COLUMN]]
+        data = frame.style.apply(lambda _: styles, subset=[color_by])
+
+    if not selectable:
+        st.dataframe(data, column_order=columns, use_container_width=True, hide_index=True)
+        return None
+
+    # בלי key: זהות הטבלה כוללת את הנתונים
+    event = st.dataframe(data, column_order=columns, use_container_width=True, hide_index=True,
+                         on_select="rerun", selection_mode="single-row")
+    selected = event.selection.rows
+    return selected[0] if selected and selected[0] < len(frame) else None
@@ -0,0 +1,117 @@
+from datetime import date, time
+import pandas as pd
+from utils.data import delete
+from utils.importer import insert_chunked
+from utils.board import STATUS_LABELS
+
+# === עריכה מרובה של פעילויות ===
+# הטבלה הערוכה (st.data_editor) מושווית לטבלה המקורית לפי id, ורק שורות שהשתנו נשלחות:
+# עדכונים כ-upsert במנות (שורה שנכשלה מדווחת לבד - כמו בייבוא) ומחיקות במנות לפי id.
+# כל השינויים נבדקים לפני השליחה; אם יש שגיאה - שום דבר לא נשלח
+
+BULK_BATCH_SIZE = 200
+
+# עמודות הטבלה הערוכה
+DATE, SCHOOL, EMPLOYEE, START, END, STATUS, REMOVE = "תאריך", "בית ספר", "מדריך", "התחלה", "סיום", "סטטוס", "🗑️ מחק"
+EDITABLE = (DATE, EMPLOYEE, START, END, STATUS)
+
+STATUS_BY_LABEL = {label: status for status, label in STATUS_LABELS.items()}
+
+
+def _time(value) -> time | None:
+    return time.fromisoformat(value[:5]) if value else None
+
+
+def editor_frame(activities: list[dict]) -> pd.DataFrame:
+    """פעילויות -> טבלה לעריכה, עם id כאינדקס"""
+    frame = pd.DataFrame([{
+        "id": act['id'],
+        DATE: date.fromisoformat(act['date'][:10]),
+        SCHOOL: act['schools']['name'] if act.get('schools') else '-',
+        EMPLOYEE: act['users']['full_name'] if act.get('users') else None,
+        START: _time(act.get('time_start')),
+        END: _time(act.get('time_end')),
+        STATUS: STATUS_LABELS.get(act['status'], act['status']),
+        REMOVE: False,
+    } for act in activities], columns=["id", DATE, SCHOOL, EMPLOYEE, START, END, STATUS, REMOVE])
+    return frame.set_index("id")
+
+
+def _label(row) -> str:
+    return f"{row[DATE]} | {row[SCHOOL]}"
+
+
+def _same(left: pd.Series, right: pd.Series) -> pd.Series:
+    return (left == right) | (left.isna() & right.isna())
+
+
+def _validate(row, emp_options: dict) -> str | None:
+    """הודעת השגיאה הראשונה לשורה (או None)"""
+    if pd.isna(row[DATE]):
+        return "חסר תאריך"
+    if pd.isna(row[EMPLOYEE]) or row[EMPLOYEE] not in emp_options:
+        return "חובה לבחור מדריך"
+    if pd.isna(row[START]) or pd.isna(row[END]):
+        return "חסרה שעת התחלה/סיום"
+    if row[END] <= row[START]:
+        return "שעת הסיום לפני שעת ההתחלה"
+    if row[STATUS] not in STATUS_BY_LABEL:
+        return "סטטוס לא מוכר"
+    return None
+
+
+def plan_changes(original: pd.DataFrame, edited: pd.DataFrame, activities: list[dict], emp_options: dict) -> dict:
+    """השוואה לפי id. מחזיר {"upsert": [(תווית, שורה)], "delete": [(תווית, id)], "errors": [(תווית, הודעה)]}"""
+    edited = edited.reindex(original.index)
+    changed = pd.Series(False, index=original.index)
+    for column in EDITABLE:
+        changed |= ~_same(edited[column], original[column])
+    removed = edited[REMOVE].fillna(False).astype(bool)
+
+    school_ids = {act['id']: act.get('school_id') for act in activities}
+    plan = {"upsert": [], "delete": [], "errors": []}
+    for activity_id in original.index[removed]:
+        plan["delete"].append((_label(original.loc[activity_id]), activity_id))
+    for activity_id in original.index[changed & ~removed]:
+        row = edited.loc[activity_id]
+        label = _label(original.loc[activity_id])
+        error = _validate(row, emp_options)
+        if error:
+            plan["errors"].append((label, error))
+            continue
+        # שורה מלאה: upsert בודק NOT NULL לפני שמזהה שה-id קיים
+        plan["upsert"].append((label, {
+            "id": activity_id,
+            "school_id": school_ids.get(activity_id),
+            "employee_id": emp_options[row[EMPLOYEE]],
+            "date": str(row[DATE]),
+            "time_start": row[START].strftime("%H:%M:%S"),
+            "time_end": row[END].strftime("%H:%M:%S"),
+            "status": STATUS_BY_LABEL[row[STATUS]],
+        }))
+    return plan
+
+
+def _delete_batch(batch: list) -> tuple[int, list]:
+    """מחיקת מנה בבקשה אחת; אם נכשלה - כל שורה לבד, כדי לדעת מה נכשל"""
+    try:
+        return len(delete("activities", (("in", "id", tuple(activity_id for _, activity_id in batch)),))), []
+    except Exception as e:
+        if len(batch) == 1:
+            return 0, [(batch[0][0], (getattr(e, "message", None) or str(e))[:100])]
+        results = [_delete_batch([item]) for item in batch]
+        return sum(ok for ok, _ in results), [error for _, errors in results for error in errors]
+
+
+def apply_changes(plan: dict, batch_size: int = BULK_BATCH_SIZE) -> dict:
+    """שליחת תוכנית שנבדקה. מחזיר {"updated", "deleted", "errors": [(תווית, הודעה)]}"""
+    updated, errors = 0, []
+    if plan["upsert"]:
+        result = insert_chunked("activities", plan["upsert"], batch_size, upsert=True)
+        updated, errors = result["inserted"], list(result["errors"])
+    deleted = 0
+    for start in range(0, len(plan["delete"]), batch_size):
+        ok, failed = _delete_batch(plan["delete"][start:start + batch_size])
+        deleted += ok
+        errors += failed
+    return {"updated": updated, "deleted": deleted, "errors": errors}
@@ -0,0 +1,114 @@
+import logging
+import threading
+from datetime import date, timedelta
+from concurrent.futures import Future, ThreadPoolExecutor
+from utils.data import cached_query, get_activities
+
+# === אינדקס ללוח שנה ===
+# הפעילויות נשלפות בבלוקים קבועים של כמה שבועות, ומחולקות פעם אחת לכל שליפה
+# לפי שבוע (מיום ראשון - שבוע הלימודים) ויום. מעבר בין שבועות בתוך בלוק, וסינון לפי
+# מדריך או בית ספר, הם חיפוש במילון - בלי שאילתה. הבלוקים הסמוכים נטענים ברקע
+# ל-cache, כך שגם מעבר לבלוק הבא לא מחכה לשרת
+
+# שבועות בכל בלוק - תצוגת חודש (עד 6 שבועות) נופלת ברוב המקרים בבלוק אחד או שניים
+BLOCK_WEEKS = 6
+
+# יום ראשון שממנו נספרים הבלוקים - כך שלכל שבוע יש בלוק קבוע
+_EPOCH = date(2000, 1, 2)
+
+# שמות הימים לפי סדר שבוע הלימודים (ראשון ראשון)
+WEEK_DAYS = ['ראשון', 'שני', 'שלישי', 'רביעי', 'חמישי', 'שישי', 'שבת']
+
+
+def week_start(day: date) -> date:
+    """יום ראשון של השבוע שבו נמצא day"""
+    return day - timedelta(days=(day.weekday() + 1) % 7)
+
+
+def block_start(day: date) -> date:
+    """היום הראשון של הבלוק שבו נמצא day"""
+    days = BLOCK_WEEKS * 7
+    return _EPOCH + timedelta(days=(day - _EPOCH).days // days * days)
+
+
+class CalendarIndex:
+    """פעילויות לפי שבוע -> יום -> רשימה. נבנה במעבר אחד על תוצאת השליפה"""
+
+    def __init__(self, activities: list[dict]):
+        self._weeks: dict[date, dict[date, list]] = {}
+        days = {}
+        for act in activities:
+            key = act['date'][:10]
+            if key not in days:
+                days[key] = date.fromisoformat(key)
+            day = days[key]
+            self._weeks.setdefault(week_start(day), {}).setdefault(day, []).append(act)
+
+    def week(self, start: date, employee_id: str | None = None, school_id: str | None = None) -> dict[date, list]:
+        """יום -> פעילויות בשבוע שמתחיל ב-start (ימים בלי פעילויות לא מופיעים)"""
+        days = self._weeks.get(start, {})
+        if not employee_id and not school_id:
+            return days
+        return {day: [act for act in acts
+                      if (not employee_id or act.get('employee_id') == employee_id)
+                      and (not school_id or act.get('school_id') == school_id)]
+                for day, acts in days.items()}
+
+
+@cached_query("activities", "schools", "users")
+def get_calendar_block(start: date, employee_id: str | None = None) -> CalendarIndex:
+    """האינדקס של בלוק אחד (BLOCK_WEEKS שבועות מ-start); employee_id - רק הפעילויות של המדריך"""
+    end = start + timedelta(days=BLOCK_WEEKS * 7 - 1)
+    return CalendarIndex(get_activities(start, end, employee_id=employee_id))
+
+
+def calendar_weeks(first_week: date, count: int, employee_id: str | None = None,
+                   filter_employee: str | None = None, filter_school: str | None = None) -> dict[date, dict]:
+    """שבוע -> (יום -> פעילויות) עבור count שבועות מ-first_week, מהבלוקים שמכסים אותם.
+    employee_id - איזה בלוקים נשלפים (מדריך מחובר); filter_* - סינון בתוך האינדקס"""
+    weeks = {}
+    for i in range(count):
+        start = first_week + timedelta(weeks=i)
+        index = get_calendar_block(block_start(start), employee_id)
+        weeks[start] = index.week(start, filter_employee, filter_school)
+    return weeks
+
+
+# === טעינה מראש ברקע ===
+_PREFETCH_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="calendar-prefetch")
+_PREFETCH_LOCK = threading.Lock()
+_PREFETCHING: set = set()
+
+logger = logging.getLogger("dream_build.calendar")
+
+
+def _prefetch(block: date, employee_id: str | None):
+    # בלי הקשר הריצה: ה-thread ממשיך אחרי שהריצה שביקשה הסתיימה, ולכן ממלא רק את ה-cache
+    # (warm) ולא נוגע ב-memo, ב-session_state או בפאנל שלה
+    try:
+        get_calendar_block.warm(block, employee_id)
+    finally:
+        with _PREFETCH_LOCK:
+            _PREFETCHING.discard((block, employee_id))
+
+
+def _log_failure(block: date, employee_id: str | None):
+    def done(future: Future):
+        error = future.exception()
+        if error is not None:
+            logger.error("טעינה מראש של בלוק %s (מדריך %s) נכשלה", block, employee_id, exc_info=error)
+    return done
+
+
+def prefetch_around(first_week: date, count: int, employee_id: str | None = None):
+    """טעינת הבלוקים שלפני ואחרי הטווח המוצג ל-cache, בלי לחכות לתוצאה"""
+    before = block_start(first_week - timedelta(weeks=1))
+    after = block_start(first_week + timedelta(weeks=count))
+    for block in {before, after}:
+        key = (block, employee_id)
+        with _PREFETCH_LOCK:
+            if key in _PREFETCHING:
+                continue
+            _PREFETCHING.add(key)
+        future = _PREFETCH_POOL.submit(_prefetch, block, employee_id)
+        future.add_done_callback(_log_failure(block, employee_id))
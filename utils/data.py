@@ -0,0 +1,439 @@
+import streamlit as st
+import pandas as pd
+import threading
+import inspect
+import functools
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from utils.supabase_client import supabase
+from utils.replica import get_replica
+from utils.views import columns_for, column_set, track, DEV_MODE
+
+# === זמני תפוגה ל-cache לפי טבלה (שניות) ===
+# טבלאות שמשתנות לעיתים רחוקות מקבלות TTL ארוך, פעילויות - קצר
+CACHE_TTL = {
+    "schools": 600,
+    "users": 600,
+    "school_budgets": 600,
+    "equipment": 120,
+    "equipment_reports": 60,
+    "financial_records": 120,
+    "activities": 60,
+}
+DEFAULT_TTL = 60
+
+# גודל דף בקריאה מדורגת - תואם ל-max-rows ברירת המחדל של PostgREST
+PAGE_SIZE = 1000
+
+# מספר מקסימלי של שאילתות במקביל
+MAX_PARALLEL = 8
+
+
+# === memo לריצה אחת ===
+# Streamlit מריץ את כל הטאבים בכל rerun, כך שאותה שאילתה נקראת כמה פעמים בריצה.
+# ה-memo נשמר ב-session_state ומתאפס ב-begin_run() בראש כל עמוד.
+# מפתח: שם הפונקציה + הארגומנטים המנורמלים בלי ה-view; שאילתה מוגשת גם מ-view רחב יותר
+# עם אותם פילטרים (schools.names מתוך schools.list)
+_MEMO_LOCK = threading.Lock()
+
+# thread שממלא רק את ה-cache (warm) - בלי memo, גם אם יש לו הקשר ריצה
+_NO_MEMO = threading.local()
+
+
+def begin_run():
+    """איפוס ה-memo בתחילת ריצת עמוד. במצב פיתוח מוצג בסרגל הצד מונה כפילויות"""
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return
+    st.session_state["_run_memo"] = {
+        "page": ctx.page_script_hash,
+        "entries": {},
+        "calls": 0,
+        "collapsed": 0,
+        "panel": st.sidebar.empty() if DEV_MODE else None,
+    }
+
+
+def begin_fragment():
+    """ריצה חוזרת של fragment בלבד (בלי begin_run): ה-memo מתרוקן כדי שהסעיף לא יוגש
+    מתוצאות של הריצה המלאה הקודמת. בריצה מלאה - לא עושה כלום"""
+    ctx = get_script_run_ctx()
+    if ctx is None or not ctx.fragment_ids_this_run:
+        return
+    memo = _run_memo()
+    if memo is not None:
+        with _MEMO_LOCK:
+            memo["entries"] = {}
+
+
+def _run_memo() -> dict | None:
+    """ה-memo של הריצה הנוכחית, או None מחוץ לריצה / בעמוד שלא קרא ל-begin_run / בתוך warm"""
+    if getattr(_NO_MEMO, "active", False):
+        return None
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return None
+    memo = st.session_state.get("_run_memo")
+    if memo is None or memo["page"] != ctx.page_script_hash:
+        return None
+    return memo
+
+
+def run_stats() -> dict:
+    """מספר הקריאות בריצה הנוכחית וכמה מהן אוחדו (הוגשו מה-memo)"""
+    memo = _run_memo()
+    if memo is None:
+        return {"calls": 0, "collapsed": 0}
+    return {"calls": memo["calls"], "collapsed": memo["collapsed"]}
+
+
+def _normalize(value):
+    """ערך ארגומנט כמפתח יציב: רשימות -> tuple, תאריכים -> מחרוזת ISO"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize(item) for item in value)
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def _memoized(name: str, tables: tuple, arguments: dict, call):
+    """הגשת קריאה מה-memo של הריצה, או הרצתה ושמירת התוצאה"""
+    memo = _run_memo()
+    if memo is None:
+        return call(**arguments)
+
+    view = arguments.get("view")
+    wanted = column_set(view) if view else frozenset()
+    key = (name, tuple((arg, _normalize(value)) for arg, value in arguments.items() if arg != "view"))
+
+    with _MEMO_LOCK:
+        memo["calls"] += 1
+        hit = next((result for columns, _, result in memo["entries"].get(key, []) if wanted <= columns), None)
+        if hit is not None:
+            memo["collapsed"] += 1
+    if hit is None:
+        hit = call(**arguments)
+        with _MEMO_LOCK:
+            memo["entries"].setdefault(key, []).append((wanted, tables, hit))
+
+    if memo["panel"] is not None:
+        memo["panel"].caption(f"🔁 {memo['collapsed']} מתוך {memo['calls']} שאילתות הוגשו מה-memo")
+    # עמודים מוסיפים עמודות ל-DataFrame - כל קורא מקבל עותק רדוד
+    return hit.copy(deep=False) if isinstance(hit, pd.DataFrame) else hit
+
+
+# === מיפוי טבלה -> פונקציות cache שתלויות בה ===
+_TABLE_DEPENDENTS: dict[str, list] = {}
+
+
+def cached_query(*tables: str):
+    """cache לפונקציית קריאה לפי ה-TTL הקצר ביותר מבין הטבלאות שהיא קוראת.
+    הפונקציה נרשמת כתלויה בכל הטבלאות, כדי שכתיבה אליהן תנקה רק אותה.
+    בתוך ריצה אחת קריאות זהות מוגשות מה-memo של הריצה (begin_run).
+    במצב פיתוח תוצאות של פונקציות עם פרמטר view עוברות מעקב עמודות (utils.views)"""
+    ttl = min(CACHE_TTL.get(table, DEFAULT_TTL) for table in tables)
+
+    def decorator(func):
+        cached = st.cache_data(ttl=ttl, show_spinner=False)(func)
+        for table in tables:
+            _TABLE_DEPENDENTS.setdefault(table, []).append(cached)
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            result = _memoized(func.__qualname__, tables, bound.arguments, cached)
+            if DEV_MODE and "view" in bound.arguments and isinstance(result, list):
+                result = track(bound.arguments["view"], result)
+            return result
+
+        def warm(*args, **kwargs):
+            """מילוי ה-cache בלבד - בלי memo ופאנל הריצה (שאולי כבר הסתיימה), כך שאפשר
+            לקרוא לה מ-thread ברקע"""
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            _NO_MEMO.active = True
+            try:
+                cached(**bound.arguments)
+            finally:
+                _NO_MEMO.active = False
+
+        wrapper.clear = cached.clear
+        wrapper.warm = warm
+        return wrapper
+
+    return decorator
+
+
+def invalidate(*tables: str):
+    """ניקוי ה-cache רק של שאילתות שתלויות בטבלאות שהשתנו; ההעתק המקומי יסתנכרן בקריאה הבאה"""
+    get_replica().mark_stale(*tables)
+    memo = _run_memo()
+    if memo is not None:
+        with _MEMO_LOCK:
+            for key in list(memo["entries"]):
+                memo["entries"][key] = [entry for entry in memo["entries"][key] if not set(entry[1]) & set(tables)]
+    cleared = set()
+    for table in tables:
+        for func in _TABLE_DEPENDENTS.get(table, []):
+            if id(func) not in cleared:
+                func.clear()
+                cleared.add(id(func))
+
+
+def _apply_filters(query, filters: tuple):
+    """הוספת פילטרים (op, column, value) לשאילתה"""
+    for op, column, value in filters:
+        if op == "in":
+            query = query.in_(column, list(value))
+        elif op == "or":
+            query = query.or_(value)
+        else:
+            query = getattr(query, op)(column, value)
+    return query
+
+
+def _build_query(table: str, columns: str = "*", filters: tuple = (), order: str | None = None, desc: bool = False,
+                 count: str | None = None):
+    """בניית שאילתת select מתוך רשימת פילטרים (op, column, value)"""
+    query = _apply_filters(supabase.table(table).select(columns, count=count), filters)
+    if order:
+        query = query.order(order, desc=desc)
+    return query
+
+
+# === הרצה מקבילית ===
+def fetch_parallel(**calls) -> dict:
+    """הרצת קריאות בלתי תלויות במקביל (thread pool) והחזרת התוצאות לפי שם.
+    כל ערך הוא פונקציה בלי ארגומנטים, למשל: fetch_parallel(schools=lambda: get_active_schools()).
+    חוזרת רק אחרי שכל הקריאות הסתיימו; שגיאה בקריאה כלשהי נזרקת הלאה"""
+    if not calls:
+        return {}
+    ctx = get_script_run_ctx()
+
+    def attach_context():
+        # כדי ש-cache ו-session_state יעבדו גם מתוך ה-threads
+        add_script_run_ctx(threading.current_thread(), ctx)
+
+    with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL, len(calls)), initializer=attach_context) as pool:
+        futures = {name: pool.submit(call) for name, call in calls.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+# === קריאה מדורגת (pagination) ===
+class PagedReader:
+    """קריאת טבלה בדפים דרך .range() - איטרציה מחזירה רשימות של עד page_size רשומות.
+    אחרי האיטרציה: rows_read, total (ספירה מהשרת) ו-truncated אם לא כל השורות נקראו"""
+
+    def __init__(self, table: str, columns: str = "*", filters: tuple = (), order: str = "id",
+                 page_size: int = PAGE_SIZE, max_rows: int | None = None):
+        self.table = table
+        self.columns = columns
+        self.filters = filters
+        self.order = order
+        self.page_size = page_size
+        self.max_rows = max_rows
+        self.rows_read = 0
+        self.total = None
+        self.truncated = False
+
+    def __iter__(self):
+        self.rows_read = 0
+        self.total = None
+        while self.max_rows is None or self.rows_read < self.max_rows:
+            want = self.page_size
+            if self.max_rows is not None:
+                want = min(want, self.max_rows - self.rows_read)
+
+            # ספירה מדויקת רק בדף הראשון
+            count = "exact" if self.rows_read == 0 else None
+            query = _build_query(self.table, self.columns, self.filters, order=self.order, count=count)
+            if self.order != "id":
+                query = query.order("id")  # סדר יציב בין דפים
+            result = query.range(self.rows_read, self.rows_read + want - 1).execute()
+            if count:
+                self.total = result.count
+
+            chunk = result.data or []
+            if not chunk:
+                break
+            self.rows_read += len(chunk)
+            yield chunk
+
+            # השרת עלול להחזיר פחות מהמבוקש (max-rows נמוך יותר) - ממשיכים לפי הספירה
+            if self.total is not None:
+                if self.rows_read >= self.total:
+                    break
+            elif len(chunk) < want:
+                break
+
+        self.truncated = self.total is not None and self.rows_read < self.total
+
+
+# === כתיבה ===
+# כל כתיבה מתויגת בטבלה שלה ובטבלאות נוספות שהיא משפיעה עליהן (touches),
+# וה-cache מתנקה רק עבור שאילתות שתלויות בטבלאות האלה
+
+# PostgREST לא מאפשר update/delete בלי פילטר - פילטר שתופס את כל הרשומות
+ALL_ROWS = (("neq", "id", "00000000-0000-0000-0000-000000000000"),)
+
+
+def by_id(row_id) -> tuple:
+    """פילטר לפי מזהה רשומה"""
+    return (("eq", "id", row_id),)
+
+
+def insert(table: str, rows, touches: tuple = ()) -> list[dict]:
+    """הוספת רשומה אחת או רשימת רשומות"""
+    result = supabase.table(table).insert(rows).execute()
+    invalidate(table, *touches)
+    return result.data or []
+
+
+def update(table: str, values: dict, filters: tuple, touches: tuple = ()) -> list[dict]:
+    """עדכון רשומות שעונות על הפילטרים"""
+    result = _apply_filters(supabase.table(table).update(values), filters).execute()
+    invalidate(table, *touches)
+    return result.data or []
+
+
+def delete(table: str, filters: tuple, touches: tuple = ()) -> list[dict]:
+    """מחיקת רשומות שעונות על הפילטרים"""
+    result = _apply_filters(supabase.table(table).delete(), filters).execute()
+    invalidate(table, *touches)
+    get_replica().forget(table, [row["id"] for row in result.data or [] if "id" in row])
+    return result.data or []
+
+
+# === בתי ספר ===
+@cached_query("schools")
+def get_schools(status: str | None = None, view: str = "schools.list") -> list[dict]:
+    """בתי ספר לפי סטטוס (None = כולם), ממוינים לפי שם"""
+    filters = (("eq", "status", status),) if status else ()
+    return _build_query("schools", columns_for(view, "schools"), filters, order="name").execute().data or []
+
+
+def get_active_schools(view: str = "schools.options") -> list[dict]:
+    """בתי ספר פעילים"""
+    return get_schools("active", view)
+
+
+# === עובדים ===
+@cached_query("users")
+def get_employees(status: str | None = None, search: str | None = None, view: str = "employees.list") -> list[dict]:
+    """מדריכים לפי סטטוס וחיפוש חופשי בשם/אימייל"""
+    filters = [("eq", "role", "employee")]
+    if search:
+        filters.append(("or", None, f"full_name.ilike.%{search}%,email.ilike.%{search}%"))
+    if status:
+        filters.append(("eq", "status", status))
+    return _build_query("users", columns_for(view, "users"), tuple(filters), order="full_name").execute().data or []
+
+
+def get_active_employees(view: str = "employees.options") -> list[dict]:
+    """מדריכים פעילים"""
+    return get_employees("active", view=view)
+
+
+# === פעילויות ===
+def _activity_filters(start=None, end=None, employee_id=None, school_id=None, statuses=None, confirmed=None) -> tuple:
+    """פילטרים משותפים לשאילתות פעילויות"""
+    filters = []
+    if start:
+        filters.append(("gte", "date", str(start)))
+    if end:
+        filters.append(("lte", "date", str(end)))
+    if employee_id:
+        filters.append(("eq", "employee_id", employee_id))
+    if school_id:
+        filters.append(("eq", "school_id", school_id))
+    if statuses:
+        filters.append(("in", "status", tuple(statuses)))
+    if confirmed is not None:
+        filters.append(("eq", "confirmed_by_employee", confirmed))
+    return tuple(filters)
+
+
+@cached_query("activities", "schools", "users")
+def get_activities(
+    start=None,
+    end=None,
+    employee_id: str | None = None,
+    school_id: str | None = None,
+    statuses: tuple | None = None,
+    confirmed: bool | None = None,
+    view: str = "activities.board",
+    limit: int | None = None,
+) -> list[dict]:
+    """פעילויות בטווח תאריכים (כולל), עם פילטרים אופציונליים, ממוינות לפי תאריך.
+    בלי limit - נקראות כל השורות בדפים, כך שמגבלת השורות של השרת לא חותכת את התוצאה"""
+    filters = _activity_filters(start, end, employee_id, school_id, statuses, confirmed)
+    columns = columns_for(view, "activities")
+    if limit:
+        return _build_query("activities", columns, filters, order="date").limit(limit).execute().data or []
+    return [row for chunk in PagedReader("activities", columns, filters, order="date") for row in chunk]
+
+
+# === ספירות ===
+# ספירה בצד השרת (HEAD + Content-Range) במקום להוריד עמודת id ולחשב len().
+# method: "exact" - count(*) מדויק, "planned" - הערכת ה-planner,
+# "estimated" - מדויק לטבלאות קטנות והערכה לגדולות
+@cached_query(*CACHE_TTL)
+def count_rows(table: str, filters: tuple = (), method: str = "exact") -> int:
+    """מספר הרשומות בטבלה שעונות על הפילטרים, בלי להוריד אותן"""
+    result = _apply_filters(supabase.table(table).select("id", count=method, head=True), filters).execute()
+    return result.count or 0
+
+
+def count_activities(start=None, end=None, employee_id: str | None = None, school_id: str | None = None,
+                     statuses: tuple | None = None, method: str = "exact") -> int:
+    """מספר פעילויות לפי אותם פילטרים כמו get_activities"""
+    return count_rows("activities", _activity_filters(start, end, employee_id, school_id, statuses), method)
+
+
+# === ציוד ===
+@cached_query("equipment")
+def get_equipment(search: str | None = None, category: str | None = None, view: str = "equipment.list") -> list[dict]:
+    """פריטי ציוד, עם חיפוש לפי שם וסינון לפי קטגוריה"""
+    filters = []
+    if search:
+        filters.append(("ilike", "name", f"%{search}%"))
+    if category:
+        filters.append(("eq", "category", category))
+    return _build_query("equipment", columns_for(view, "equipment"), tuple(filters), order="name").execute().data or []
+
+
+@cached_query("equipment_reports", "equipment", "users")
+def get_equipment_reports(reported_by: str | None = None, limit: int | None = None,
+                          view: str = "equipment_reports.list") -> list[dict]:
+    """דיווחי ציוד מהחדש לישן, עם שם הפריט ושם המדווח"""
+    filters = (("eq", "reported_by", reported_by),) if reported_by else ()
+    query = _build_query("equipment_reports", columns_for(view, "equipment_reports"), filters,
+                         order="created_at", desc=True)
+    if limit:
+        query = query.limit(limit)
+    return query.execute().data or []
+
+
+# === תקציבים וכספים ===
+@cached_query("school_budgets")
+def get_budgets(year: int, view: str = "school_budgets.list") -> list[dict]:
+    """תקציבי בתי ספר לשנה נתונה"""
+    return _build_query("school_budgets", columns_for(view, "school_budgets"), (("eq", "year", year),)).execute().data or []
+
+
+@cached_query("financial_records")
+def get_financial_records(record_type: str | None = None, start=None, end=None, desc: bool = False,
+                          view: str = "financial_records.list") -> list[dict]:
+    """רשומות כספיות ידניות (income/expense) בטווח תאריכים"""
+    filters = []
+    if record_type:
+        filters.append(("eq", "type", record_type))
+    if start:
+        filters.append(("gte", "date", str(start)))
+    if end:
+        filters.append(("lte", "date", str(end)))
+    return _build_query("financial_records", columns_for(view, "financial_records"), tuple(filters),
+                        order="date", desc=desc).execute().data or []
@@ -0,0 +1,131 @@
+import io
+from datetime import date
+import pyarrow as pa
+import pyarrow.parquet as pq
+from utils.data import PagedReader
+from utils.views import columns_for
+
+# === ייצוא לקבצי Parquet ===
+# הדפים מהשרת (PagedReader) נכתבים ישירות ל-ParquetWriter כקבוצת שורות לכל דף,
+# כך שבזיכרון יש בכל רגע דף אחד ולא כל התקופה. הסכמה קבועה לכל ייצוא -
+# דף ריק או עמודה שכולה NULL לא משנים את סוגי העמודות בקובץ
+
+EXPORT_COMPRESSION = "zstd"
+
+ACTIVITY_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("date", pa.date32()),
+    ("time_start", pa.string()),
+    ("time_end", pa.string()),
+    ("status", pa.string()),
+    ("confirmed_by_employee", pa.bool_()),
+    ("school_id", pa.string()),
+    ("school_name", pa.string()),
+    ("price_per_day", pa.float64()),
+    ("employee_id", pa.string()),
+    ("employee_name", pa.string()),
+    ("notes", pa.string()),
+])
+
+FINANCIAL_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("date", pa.date32()),
+    ("type", pa.string()),
+    ("category", pa.string()),
+    ("description", pa.string()),
+    ("amount", pa.float64()),
+])
+
+PAYROLL_SCHEMA = pa.schema([
+    ("employee_id", pa.string()),
+    ("full_name", pa.string()),
+    ("activities", pa.int64()),
+    ("method", pa.string()),
+    ("salary", pa.float64()),
+])
+
+
+def _date_filters(start, end) -> tuple:
+    return (("gte", "date", str(start)), ("lte", "date", str(end)))
+
+
+def _as_date(value):
+    return date.fromisoformat(str(value)[:10]) if value else None
+
+
+def _as_float(value):
+    return float(value) if value is not None else None
+
+
+def _write_pages(pages, schema: pa.Schema, convert) -> bytes:
+    """כל דף -> רשומות לפי הסכמה -> קבוצת שורות בקובץ. מחזיר את תוכן הקובץ"""
+    buffer = io.BytesIO()
+    with pq.ParquetWriter(buffer, schema, compression=EXPORT_COMPRESSION) as writer:
+        for page in pages:
+            writer.write_table(pa.Table.from_pylist([convert(row) for row in page], schema=schema))
+    return buffer.getvalue()
+
+
+def activity_record(row: dict) -> dict:
+    """שורת activities.export כרשומה שטוחה לפי ACTIVITY_SCHEMA (גם לארכיון)"""
+    school = row.get("schools") or {}
+    employee = row.get("users") or {}
+    return {
+        "id": row.get("id"),
+        "date": _as_date(row.get("date")),
+        "time_start": row.get("time_start"),
+        "time_end": row.get("time_end"),
+        "status": row.get("status"),
+        "confirmed_by_employee": row.get("confirmed_by_employee"),
+        "school_id": row.get("school_id"),
+        "school_name": school.get("name"),
+        "price_per_day": _as_float(school.get("price_per_day")),
+        "employee_id": row.get("employee_id"),
+        "employee_name": employee.get("full_name"),
+        "notes": row.get("notes"),
+    }
+
+
+def _financial_record(row: dict) -> dict:
+    return {
+        "id": row.get("id"),
+        "date": _as_date(row.get("date")),
+        "type": row.get("type"),
+        "category": row.get("category"),
+        "description": row.get("description"),
+        "amount": _as_float(row.get("amount")),
+    }
+
+
+def export_activities(start, end) -> bytes:
+    """פעילויות בטווח (כולל) עם שם בית הספר, מחיר ליום ושם המדריך"""
+    reader = PagedReader("activities", columns_for("activities.export", "activities"), _date_filters(start, end),
+                         order="date")
+    return _write_pages(reader, ACTIVITY_SCHEMA, activity_record)
+
+
+def export_financial_records(start, end) -> bytes:
+    """רשומות כספיות ידניות בטווח (כולל)"""
+    reader = PagedReader("financial_records", columns_for("financial_records.export", "financial_records"),
+                         _date_filters(start, end), order="date")
+    return _write_pages(reader, FINANCIAL_SCHEMA, _financial_record)
+
+
+def export_payroll(start, end) -> bytes:
+    """שכר מחושב לכל מדריך בטווח - אותו חישוב כמו במסך השכר"""
+    # import מקומי: analytics קורא את הארכיון, שכותב בסכמת הייצוא של הפעילויות
+    from utils.analytics import payroll_summary
+    payroll = payroll_summary(start, end)
+    return _write_pages([payroll.to_dict("records")], PAYROLL_SCHEMA, dict)
+
+
+# שם בממשק -> (פונקציית ייצוא, קידומת לשם הקובץ)
+EXPORTS = {
+    "פעילויות": (export_activities, "activities"),
+    "רשומות כספיות": (export_financial_records, "financial_records"),
+    "שכר מחושב": (export_payroll, "payroll"),
+}
+
+
+def export_file_name(prefix: str, start, end) -> str:
+    return f"{prefix}_{start}_{end}.parquet"
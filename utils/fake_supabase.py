@@ -0,0 +1,457 @@
+import re
+import copy
+import json
+import time
+import uuid
+import threading
+import functools
+from datetime import datetime, timezone
+from postgrest.exceptions import APIError
+
+# === Supabase מזויף בזיכרון ===
+# תחליף ל-Client בתצורה backend = "fake": טבלאות בזיכרון התהליך, בלי רשת.
+# מממש רק את מה שהאפליקציה משתמשת בו - select עם joins מוטמעים, פילטרים,
+# order/limit/range, count/head, insert/update/upsert/delete ו-auth בסיסי.
+# latency_ms מוסיף השהיה לכל execute() כדי לדמות רשת, ו-max_rows חותך כל select
+# כמו max-rows של PostgREST.
+
+# עמודת המפתח הזר לכל join מוטמע: (טבלה, משאב מוטמע) -> עמודה
+FOREIGN_KEYS = {
+    ("activities", "schools"): "school_id",
+    ("activities", "users"): "employee_id",
+    ("school_budgets", "schools"): "school_id",
+    ("equipment_reports", "users"): "reported_by",
+    ("equipment_reports", "equipment"): "equipment_id",
+    ("financial_records", "users"): "created_by",
+}
+
+# ערכי ברירת מחדל של עמודות כמו בסכמה
+TABLE_DEFAULTS = {
+    "activities": {"status": "planned", "confirmed_by_employee": False},
+    "schools": {"status": "active"},
+    "users": {"status": "active"},
+    "equipment_reports": {"status": "pending"},
+}
+
+# עמודות NOT NULL בלי ברירת מחדל. כמו ב-Postgres, נבדקות על השורה המלאה גם ב-upsert
+# של שורה קיימת (לפני זיהוי ההתנגשות)
+NOT_NULL = {
+    "schools": ("name",),
+    "users": ("email", "full_name", "role"),
+}
+
+# משתמש מנהל ברירת מחדל, כדי שאפשר יהיה להתחבר ל-backend ריק
+DEFAULT_ACCOUNTS = {"manager@example.com": "fake-password"}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _split_top(text: str, sep: str = ",") -> list[str]:
+    """פיצול לפי מפריד ברמה העליונה בלבד - לא בתוך סוגריים או מירכאות"""
+    parts, depth, quoted, token = [], 0, False, ""
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        if char == sep and depth == 0 and not quoted:
+            parts.append(token.strip())
+            token = ""
+        else:
+            token += char
+    if token.strip():
+        parts.append(token.strip())
+    return parts
+
+
+def _coerce(row_value, value):
+    """המרת ערך הפילטר לטיפוס של ערך השורה, כמו ההמרה של PostgREST"""
+    if value is None or row_value is None or isinstance(value, type(row_value)):
+        return value
+    if isinstance(row_value, bool):
+        return str(value).lower() == "true"
+    if isinstance(row_value, (int, float)):
+        try:
+            return type(row_value)(value)
+        except (TypeError, ValueError):
+            return value
+    return str(value)
+
+
+@functools.lru_cache(maxsize=256)
+def _like(pattern: str, flags=0):
+    regex = "".join(".*" if c == "%" else "." if c == "_" else re.escape(c) for c in pattern)
+    return re.compile(f"^{regex}$", flags | re.DOTALL)
+
+
+def _compare(op: str, row_value, value) -> bool:
+    """פעולת השוואה אחת של PostgREST על ערך בשורה"""
+    if op == "is":
+        target = {"null": None, "true": True, "false": False}.get(str(value).lower(), value)
+        return row_value is target
+    if op == "in":
+        return row_value in {_coerce(row_value, v) for v in value}
+    if row_value is None:
+        return False
+    if op in ("like", "ilike"):
+        return bool(_like(str(value), re.IGNORECASE if op == "ilike" else 0).match(str(row_value)))
+    value = _coerce(row_value, value)
+    if op == "eq":
+        return row_value == value
+    if op == "neq":
+        return row_value != value
+    if op == "gt":
+        return row_value > value
+    if op == "gte":
+        return row_value >= value
+    if op == "lt":
+        return row_value < value
+    if op == "lte":
+        return row_value <= value
+    raise APIError({"message": f"operator {op} not supported by fake backend", "code": "PGRST100"})
+
+
+def _parse_logic(expression: str):
+    """פילטר or_ בתחביר PostgREST -> פונקציה על שורה.
+    תומך ב-col.op.value, ערכים במירכאות, ו-and(...)/or(...) מקוננים"""
+    conditions = []
+    for term in _split_top(expression):
+        negate = term.startswith("not.")
+        if negate:
+            term = term[4:]
+        group = re.match(r"^(and|or)\((.*)\)$", term, re.DOTALL)
+        if group:
+            inner = _parse_logic(group.group(2))
+            combine = all if group.group(1) == "and" else any
+            condition = (lambda inner, combine: lambda row: combine(c(row) for c in inner))(inner, combine)
+        else:
+            column, op, value = term.split(".", 2)
+            if value.startswith('"') and value.endswith('"'):
+                value = value[1:-1].replace('\\"', '"')
+            if op == "in":
+                value = [v.strip('"') for v in _split_top(value.strip("()"))]
+            condition = (lambda column, op, value: lambda row: _compare(op, row.get(column), value))(column, op, value)
+        conditions.append((lambda c, negate: (lambda row: not c(row)) if negate else c)(condition, negate))
+    return conditions
+
+
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class FakeQuery:
+    """בונה שאילתה בסגנון postgrest-py על טבלה בזיכרון"""
+
+    def __init__(self, client, table: str):
+        self._client = client
+        self._table = table
+        self._op = None
+        self._payload = None
+        self._options = {}
+        self._columns = "*"
+        self._count = None
+        self._head = False
+        self._filters = []
+        self._orders = []
+        self._limit = None
+        self._range = None
+
+    # === פעולות ===
+    def select(self, *columns, count=None, head=None):
+        self._op = "select"
+        self._columns = ",".join(columns) or "*"
+        self._count = count
+        self._head = bool(head)
+        return self
+
+    def insert(self, json, count=None, returning=None, upsert=False, default_to_null=True):
+        self._op = "upsert" if upsert else "insert"
+        self._payload = json
+        return self
+
+    def upsert(self, json, count=None, returning=None, ignore_duplicates=False, on_conflict="", default_to_null=True):
+        self._op = "upsert"
+        self._payload = json
+        self._options = {"ignore_duplicates": ignore_duplicates, "on_conflict": on_conflict or "id"}
+        return self
+
+    def update(self, json, count=None, returning=None):
+        self._op = "update"
+        self._payload = json
+        return self
+
+    def delete(self, count=None, returning=None):
+        self._op = "delete"
+        return self
+
+    # === פילטרים ===
+    def _filter(self, op, column, value):
+        self._filters.append(lambda row: _compare(op, row.get(column), value))
+        return self
+
+    def eq(self, column, value):
+        return self._filter("eq", column, value)
+
+    def neq(self, column, value):
+        return self._filter("neq", column, value)
+
+    def gt(self, column, value):
+        return self._filter("gt", column, value)
+
+    def gte(self, column, value):
+        return self._filter("gte", column, value)
+
+    def lt(self, column, value):
+        return self._filter("lt", column, value)
+
+    def lte(self, column, value):
+        return self._filter("lte", column, value)
+
+    def like(self, column, pattern):
+        return self._filter("like", column, pattern)
+
+    def ilike(self, column, pattern):
+        return self._filter("ilike", column, pattern)
+
+    def is_(self, column, value):
+        return self._filter("is", column, value)
+
+    def in_(self, column, values):
+        return self._filter("in", column, list(values))
+
+    def or_(self, filters, reference_table=None):
+        conditions = _parse_logic(filters)
+        self._filters.append(lambda row: any(c(row) for c in conditions))
+        return self
+
+    # === מיון וחיתוך ===
+    def order(self, column, desc=False, nullsfirst=None, foreign_table=None):
+        self._orders.append((column, desc, desc if nullsfirst is None else nullsfirst))
+        return self
+
+    def limit(self, size, foreign_table=None):
+        self._limit = size
+        return self
+
+    def range(self, start, end, foreign_table=None):
+        self._range = (start, end)
+        return self
+
+    # === הרצה ===
+    def _matching(self, rows):
+        return [row for row in rows if all(f(row) for f in self._filters)]
+
+    def _project(self, table: str, row: dict, columns: str) -> dict:
+        """בחירת עמודות כולל משאבים מוטמעים, למשל: id, schools(name, price_per_day)"""
+        result = {}
+        for item in _split_top(columns):
+            embedded = re.match(r"^(?:(\w+):)?(\w+)(?:!\w+)?\((.*)\)$", item, re.DOTALL)
+            if embedded:
+                alias, resource, inner = embedded.groups()
+                fk = FOREIGN_KEYS.get((table, resource), f"{resource.rstrip('s')}_id")
+                target = self._client._by_id(resource).get(row.get(fk))
+                result[alias or resource] = self._project(resource, target, inner) if target else None
+            elif item == "*":
+                result.update(copy.deepcopy(row))
+            else:
+                result[item] = copy.deepcopy(row.get(item))
+        return result
+
+    def _sorted(self, rows):
+        for column, desc, nulls_first in reversed(self._orders):
+            present = sorted((r for r in rows if r.get(column) is not None), key=lambda r: r[column], reverse=desc)
+            nulls = [r for r in rows if r.get(column) is None]
+            rows = nulls + present if nulls_first else present + nulls
+        return rows
+
+    def _payload_rows(self):
+        return self._payload if isinstance(self._payload, list) else [self._payload]
+
+    def _write_rows(self):
+        defaults = TABLE_DEFAULTS.get(self._table, {})
+        rows = [{**defaults, **copy.deepcopy(row)} for row in self._payload_rows()]
+        for row in rows:
+            for column in NOT_NULL.get(self._table, ()):
+                if row.get(column) is None:
+                    raise APIError({"message": f'null value in column "{column}" of relation "{self._table}" '
+                                               f'violates not-null constraint', "code": "23502", "details": None, "hint": None})
+        return rows
+
+    def execute(self) -> FakeResponse:
+        if self._client.latency_ms:
+            time.sleep(self._client.latency_ms / 1000)
+        with self._client._lock:
+            store = self._client.tables.setdefault(self._table, [])
+
+            if self._op == "select":
+                rows = self._sorted(self._matching(store))
+                count = len(rows) if self._count else None
+                if self._range:
+                    rows = rows[self._range[0]:self._range[1] + 1]
+                if self._limit is not None:
+                    rows = rows[:self._limit]
+                if self._client.max_rows is not None:
+                    rows = rows[:self._client.max_rows]
+                data = [] if self._head else [self._project(self._table, row, self._columns) for row in rows]
+                return FakeResponse(data, count)
+
+            self._client._touch(self._table)
+
+            if self._op == "insert":
+                new_rows = self._write_rows()
+                existing = {row.get("id") for row in store}
+                for row in new_rows:
+                    row.setdefault("id", str(uuid.uuid4()))
+                    row.setdefault("created_at", _now())
+                    row["updated_at"] = _now()
+                    if row["id"] in existing:
+                        raise APIError({"message": f'duplicate key value violates unique constraint "{self._table}_pkey"',
+                                        "code": "23505", "details": f"Key (id)=({row['id']}) already exists.", "hint": None})
+                    existing.add(row["id"])
+                store.extend(new_rows)
+                return FakeResponse(copy.deepcopy(new_rows))
+
+            if self._op == "upsert":
+                keys = [k.strip() for k in self._options.get("on_conflict", "id").split(",")]
+                written = []
+                # עדכון של שורה קיימת כותב רק את העמודות שנשלחו - לא את ברירות המחדל
+                for row, sent in zip(self._write_rows(), self._payload_rows()):
+                    match = next((r for r in store if all(r.get(k) == row.get(k) for k in keys)), None)
+                    if match is None:
+                        row.setdefault("id", str(uuid.uuid4()))
+                        row.setdefault("created_at", _now())
+                        row["updated_at"] = _now()
+                        store.append(row)
+                        written.append(row)
+                    elif not self._options.get("ignore_duplicates"):
+                        match.update({k: copy.deepcopy(v) for k, v in sent.items() if k != "id" or k in keys})
+                        match["updated_at"] = _now()
+                        written.append(match)
+                return FakeResponse(copy.deepcopy(written))
+
+            if self._op == "update":
+                changed = self._matching(store)
+                for row in changed:
+                    row.update(copy.deepcopy(self._payload))
+                    row["updated_at"] = _now()
+                return FakeResponse(copy.deepcopy(changed))
+
+            if self._op == "delete":
+                removed = self._matching(store)
+                removed_ids = {id(row) for row in removed}
+                store[:] = [row for row in store if id(row) not in removed_ids]
+                return FakeResponse(copy.deepcopy(removed))
+
+        raise APIError({"message": "no operation on query", "code": "PGRST000"})
+
+
+# === auth ===
+class _User:
+    def __init__(self, user_id: str, email: str):
+        self.id = user_id
+        self.email = email
+
+
+class _AuthResponse:
+    def __init__(self, user):
+        self.user = user
+        self.session = None
+
+
+class FakeAuth:
+    """מימוש של sign_up / sign_in_with_password / sign_out מול רשימת חשבונות בזיכרון"""
+
+    def __init__(self, client):
+        self._client = client
+
+    def sign_up(self, credentials: dict) -> _AuthResponse:
+        email = credentials["email"]
+        if email in self._client.accounts:
+            raise Exception("User already registered (duplicate)")
+        user_id = str(uuid.uuid4())
+        self._client.accounts[email] = {"id": user_id, "password": credentials["password"]}
+        return _AuthResponse(_User(user_id, email))
+
+    def sign_in_with_password(self, credentials: dict) -> _AuthResponse:
+        account = self._client.accounts.get(credentials["email"])
+        if not account or account["password"] != credentials["password"]:
+            raise Exception("Invalid login credentials")
+        return _AuthResponse(_User(account["id"], credentials["email"]))
+
+    def sign_out(self):
+        pass
+
+
+class FakeClient:
+    """Client מזויף: tables = טבלה -> רשימת שורות, accounts = אימייל -> {id, password}"""
+
+    def __init__(self, latency_ms: float = 0, tables: dict | None = None, accounts: dict | None = None,
+                 max_rows: int | None = None):
+        self.latency_ms = latency_ms
+        self.max_rows = max_rows
+        self.tables: dict[str, list[dict]] = tables or {}
+        self.accounts: dict[str, dict] = accounts or {}
+        self._lock = threading.RLock()
+        self._versions: dict[str, int] = {}
+        self._indexes: dict[str, tuple] = {}
+        self.auth = FakeAuth(self)
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def from_(self, name: str) -> FakeQuery:
+        return self.table(name)
+
+    def _by_id(self, table: str) -> dict:
+        """אינדקס id -> שורה ל-joins, נבנה מחדש רק אחרי כתיבה לטבלה"""
+        version = self._versions.get(table, 0)
+        cached = self._indexes.get(table)
+        if cached is None or cached[0] != version:
+            cached = (version, {row.get("id"): row for row in self.tables.get(table, [])})
+            self._indexes[table] = cached
+        return cached[1]
+
+    def _touch(self, table: str):
+        self._versions[table] = self._versions.get(table, 0) + 1
+
+    # === זריעת נתונים ===
+    def seed(self, table: str, rows: list[dict]):
+        """הוספת שורות ישירות לטבלה (בלי בדיקות), עם id ו-updated_at אם חסרים"""
+        with self._lock:
+            store = self.tables.setdefault(table, [])
+            for row in rows:
+                row = {**TABLE_DEFAULTS.get(table, {}), **row}
+                row.setdefault("id", str(uuid.uuid4()))
+                row.setdefault("updated_at", _now())
+                store.append(row)
+            self._touch(table)
+
+    def add_account(self, email: str, password: str, user: dict) -> dict:
+        """חשבון התחברות + שורה בטבלת users"""
+        user = {"email": email, "status": "active", **user}
+        user.setdefault("id", str(uuid.uuid4()))
+        self.accounts[email] = {"id": user["id"], "password": password}
+        self.seed("users", [user])
+        return user
+
+    def load_json(self, path: str):
+        """טעינת נתונים מקובץ JSON בצורה {טבלה: [שורות]}"""
+        with open(path, encoding="utf-8") as f:
+            for table, rows in json.load(f).items():
+                self.seed(table, rows)
+
+
+def create_fake_client(latency_ms: float = 0, seed_path: str | None = None) -> FakeClient:
+    """Client מזויף עם חשבון מנהל ברירת מחדל, ונתונים מקובץ אם ניתן"""
+    client = FakeClient(latency_ms)
+    for email, password in DEFAULT_ACCOUNTS.items():
+        client.add_account(email, password, {"full_name": "מנהל מקומי", "role": "manager"})
+    if seed_path:
+        client.load_json(seed_path)
+    return client
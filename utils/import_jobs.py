@@ -0,0 +1,198 @@
+import os
+import json
+import uuid
+import shutil
+import sqlite3
+import logging
+import tempfile
+import threading
+from datetime import datetime
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
+import streamlit as st
+from utils.importer import IMPORT_TABLES, IMPORT_CHUNK_SIZE, import_chunks, estimate_rows
+from utils.data import invalidate
+
+# === ייבוא ברקע ===
+# הייבוא רץ ב-thread של השרת ולא בריצת הסקריפט, כך שסגירת הדפדפן או rerun לא עוצרים אותו.
+# הקובץ נשמר לתיקיית העבודות, וההתקדמות (checkpoint לכל מנה שנכתבה), המונים והשגיאות
+# נשמרים ב-SQLite. עבודה שנכשלה/בוטלה ממשיכה מהמנה שאחרי ה-checkpoint - מנה שנכתבה
+# חלקית נשלחת שוב, והמפתח הטבעי (utils.importer) מדלג על מה שכבר נכנס
+JOBS_DIR = os.environ.get("DREAM_BUILD_JOBS", os.path.join(tempfile.gettempdir(), "dream_build_jobs"))
+
+# כמה עבודות רצות במקביל - השאר ממתינות בתור
+MAX_RUNNING_JOBS = 2
+
+# כל כמה שניות רשימת העבודות בממשק מתרעננת
+JOB_POLL_SECONDS = 2
+
+ACTIVE_STATUSES = ("queued", "running")
+RESUMABLE_STATUSES = ("failed", "cancelled")
+STATUS_LABELS = {
+    "queued": "⏳ בתור",
+    "running": "🔄 רץ",
+    "completed": "✅ הושלם",
+    "failed": "❌ נכשל",
+    "cancelled": "⏹️ בוטל",
+}
+
+logger = logging.getLogger("dream_build.import_jobs")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    import_type TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    context TEXT NOT NULL,
+    chunk_size INTEGER NOT NULL,
+    on_existing TEXT NOT NULL,
+    created_by TEXT,
+    status TEXT NOT NULL,
+    checkpoint INTEGER NOT NULL DEFAULT 0,
+    rows_done INTEGER NOT NULL DEFAULT 0,
+    rows_total INTEGER NOT NULL DEFAULT 0,
+    inserted INTEGER NOT NULL DEFAULT 0,
+    updated INTEGER NOT NULL DEFAULT 0,
+    skipped INTEGER NOT NULL DEFAULT 0,
+    error_count INTEGER NOT NULL DEFAULT 0,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_errors (
+    job_id TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS job_errors_job ON job_errors (job_id);
+"""
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class ImportJobs:
+    """מאגר עבודות הייבוא ומריץ הרקע שלהן"""
+
+    def __init__(self, directory: str = JOBS_DIR, max_workers: int = MAX_RUNNING_JOBS):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._conn = sqlite3.connect(os.path.join(directory, "jobs.sqlite3"), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.RLock()
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="import-job")
+        with self._lock:
+            self._conn.executescript(_SCHEMA)
+            # עבודות שנשארו פעילות מתהליך קודם לא רצות יותר - אפשר להמשיך אותן מה-checkpoint
+            self._conn.execute("UPDATE jobs SET status = 'failed', error = ?, updated_at = ? WHERE status IN ('queued', 'running')",
+                               ("השרת הופעל מחדש באמצע הייבוא", _now()))
+            self._conn.commit()
+
+    # === מאגר ===
+    def _update(self, job_id: str, **values):
+        values["updated_at"] = _now()
+        assignments = ", ".join(f"{column} = ?" for column in values)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*values.values(), job_id))
+            self._conn.commit()
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def recent(self, limit: int = 20) -> list[dict]:
+        """העבודות האחרונות, מהחדשה לישנה"""
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM jobs ORDER BY created_at DESC, rowid DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def errors(self, job_id: str) -> list[tuple]:
+        """שגיאות העבודה (מספר שורה, הודעה) לפי סדר השורות"""
+        with self._lock:
+            rows = self._conn.execute("SELECT line, message FROM job_errors WHERE job_id = ? ORDER BY line",
+                                      (job_id,)).fetchall()
+        return [tuple(row) for row in rows]
+
+    # === פעולות ===
+    def submit(self, import_type: str, file, context: dict, chunk_size: int = IMPORT_CHUNK_SIZE,
+               on_existing: str = "skip", created_by: str | None = None) -> str:
+        """שמירת הקובץ לתיקיית העבודות והכנסת עבודה לתור. מחזיר את מזהה העבודה"""
+        job_id = uuid.uuid4().hex[:12]
+        path = os.path.join(self.directory, job_id + os.path.splitext(file.name)[1].lower())
+        file.seek(0)
+        with open(path, "wb") as out:
+            shutil.copyfileobj(file, out)
+        file.seek(0)
+        now = _now()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, import_type, file_name, file_path, context, chunk_size, on_existing, created_by, "
+                "status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'queued', ?, ?)",
+                (job_id, import_type, file.name, path, json.dumps(context, ensure_ascii=False), chunk_size,
+                 on_existing, created_by, now, now))
+            self._conn.commit()
+        self._executor.submit(self._run, job_id)
+        return job_id
+
+    def cancel(self, job_id: str):
+        """בקשת ביטול - העבודה נעצרת אחרי המנה הנוכחית"""
+        self._update(job_id, cancel_requested=1)
+
+    def resume(self, job_id: str) -> bool:
+        """המשך עבודה שנכשלה/בוטלה מהמנה שאחרי ה-checkpoint"""
+        job = self.get(job_id)
+        if not job or job["status"] not in RESUMABLE_STATUSES or not os.path.exists(job["file_path"]):
+            return False
+        self._update(job_id, status="queued", cancel_requested=0, error=None)
+        self._executor.submit(self._run, job_id)
+        return True
+
+    # === הרצה ===
+    def _run(self, job_id: str):
+        job = self.get(job_id)
+        if job["cancel_requested"]:
+            self._update(job_id, status="cancelled")
+            return
+        self._update(job_id, status="running")
+        wrote = False
+        try:
+            with open(job["file_path"], "rb") as file:
+                self._update(job_id, rows_total=estimate_rows(file))
+                with closing(import_chunks(job["import_type"], file, json.loads(job["context"]), job["chunk_size"],
+                                           job["on_existing"], start_chunk=job["checkpoint"])) as chunks:
+                    for chunk in chunks:
+                        wrote = wrote or bool(chunk["inserted"] or chunk["updated"])
+                        self._checkpoint(job_id, chunk)
+                        if self.get(job_id)["cancel_requested"]:
+                            self._update(job_id, status="cancelled")
+                            return
+            self._update(job_id, status="completed")
+            os.remove(job["file_path"])
+        except Exception as e:
+            logger.exception("ייבוא %s נכשל", job_id)
+            self._update(job_id, status="failed", error=str(e)[:200])
+        finally:
+            if wrote:
+                invalidate(IMPORT_TABLES[job["import_type"]])
+
+    def _checkpoint(self, job_id: str, chunk: dict):
+        """שמירת תוצאת מנה שנכתבה: מונים, שגיאות ו-checkpoint - בטרנזקציה אחת"""
+        with self._lock:
+            self._conn.executemany("INSERT INTO job_errors (job_id, line, message) VALUES (?, ?, ?)",
+                                   [(job_id, line, message) for line, message in chunk["errors"]])
+            self._conn.execute(
+                "UPDATE jobs SET checkpoint = ?, rows_done = rows_done + ?, inserted = inserted + ?, "
+                "updated = updated + ?, skipped = skipped + ?, error_count = error_count + ?, updated_at = ? WHERE id = ?",
+                (chunk["index"] + 1, chunk["rows"], chunk["inserted"], chunk["updated"], chunk["skipped"],
+                 len(chunk["errors"]), _now(), job_id))
+            self._conn.commit()
+
+
+@st.cache_resource
+def get_import_jobs() -> ImportJobs:
+    """מאגר עבודות אחד לכל תהליך השרת, משותף לכל הסשנים"""
+    return ImportJobs()
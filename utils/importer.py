@@ -0,0 +1,656 @@
+import re
+import codecs
+from datetime import datetime, timedelta
+import pandas as pd
+from utils.supabase_client import supabase
+from utils.data import PagedReader, invalidate, get_schools, get_employees
+from utils.name_index import build_index, SUGGEST_SCORE
+
+# === ייבוא נתונים בכמויות ===
+# שלב 1: בניית שורות מאומתות מה-DataFrame (שגיאה לכל שורה בנפרד)
+# שלב 2: הוספה במנות של IMPORT_CHUNK_SIZE שורות לבקשה, במקום בקשה לכל שורה.
+# מנה שנכשלת מתפצלת לחצאים עד שמגיעים לשורות הבעייתיות - השאר נכנסות.
+
+IMPORT_CHUNK_SIZE = 500
+
+# סוג ייבוא -> טבלה
+IMPORT_TABLES = {
+    "בתי ספר": "schools",
+    "עובדים/מדריכים": "users",
+    "פעילויות היסטוריות": "activities",
+    "רשומות כספיות": "financial_records",
+}
+
+# מיפוי סטטוס עברית לאנגלית
+STATUS_MAP = {
+    'מלשוה': 'completed',
+    'הושלם': 'completed',
+    'הושלמה': 'completed',
+    'completed': 'completed',
+    'מתוכנן': 'planned',
+    'מתוכננת': 'planned',
+    'planned': 'planned',
+    'מאושר': 'confirmed',
+    'מאושרת': 'confirmed',
+    'confirmed': 'confirmed',
+    'בוטל': 'cancelled',
+    'בוטלה': 'cancelled',
+    'cancelled': 'cancelled'
+}
+
+
+def _clean(value):
+    """ערך מתא: None לתא ריק, מחרוזות בלי רווחים מסביב"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return value
+
+
+def _number(value, field: str, required: bool = False, default=0.0) -> float:
+    value = _clean(value)
+    if value is None:
+        if required:
+            raise ValueError(f"{field} חסר")
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} לא מספרי: '{value}'")
+
+
+def _required(value, field: str):
+    value = _clean(value)
+    if value is None:
+        raise ValueError(f"{field} חסר")
+    return value
+
+
+def _date_part(text: str) -> str:
+    """החלק של התאריך בערך עם שעה ("1/2/2024 08:00", "2024-02-01T08:00:00")"""
+    return _DATE_TIME_SEPARATOR.split(text.strip(), maxsplit=1)[0]
+
+
+def _date(value, field: str = "date") -> str:
+    """תאריך מתא בודד לפי DATE_FORMATS / ערך תאריך / מספר סידורי של Excel"""
+    value = _required(value, field)
+    if hasattr(value, "strftime"):
+        return value.strftime("%Y-%m-%d")
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(_date_part(str(value)), fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    try:
+        serial = float(value)
+    except ValueError:
+        serial = None
+    if serial is not None and EXCEL_SERIAL_RANGE[0] <= serial <= EXCEL_SERIAL_RANGE[1]:
+        return (datetime(1899, 12, 30) + timedelta(days=serial)).strftime("%Y-%m-%d")
+    raise ValueError(f"{field} לא תקין: '{value}'")
+
+
+def _email(value) -> str:
+    email = _required(value, "email")
+    if "@" not in email or " " in email:
+        raise ValueError(f"email לא תקין: '{email}'")
+    return email
+
+
+# === בניית שורה לכל סוג ייבוא ===
+def _school_row(row, context: dict) -> dict:
+    phone = _clean(row.get('phone'))
+    return {
+        "name": _required(row.get('name'), "name"),
+        "contact_person": _clean(row.get('contact_person')),
+        "phone": str(phone) if phone is not None else None,
+        "email": _clean(row.get('email')),
+        "price_per_day": _number(row.get('price_per_day'), "price_per_day", required=True),
+        "address": _clean(row.get('address')),
+        "status": "active"
+    }
+
+
+def _employee_row(row, context: dict) -> dict:
+    email = _email(row.get('email'))
+    phone = _clean(row.get('phone'))
+    return {
+        "id": email,
+        "email": email,
+        "full_name": _required(row.get('full_name'), "full_name"),
+        "phone": str(phone) if phone is not None else None,
+        "role": "employee",
+        "status": "active",
+        "hourly_rate": _number(row.get('hourly_rate'), "hourly_rate"),
+        "daily_rate": _number(row.get('daily_rate'), "daily_rate")
+    }
+
+
+def _financial_row(row, context: dict) -> dict:
+    record_type = _clean(row.get('type')) or 'expense'
+    if record_type not in ('income', 'expense'):
+        raise ValueError(f"type לא תקין: '{record_type}'")
+    return {
+        "date": _date(row.get('date')),
+        "type": record_type,
+        "amount": _number(row.get('amount'), "amount", required=True),
+        "category": _clean(row.get('category')) or 'אחר',
+        "description": _clean(row.get('description')),
+        "created_by": context.get("created_by")
+    }
+
+
+# === נרמול וקטורי - פעילויות ===
+# עמודות שלמות מומרות בבת אחת (pandas) במקום פירוק ידני לכל שורה
+EXCEL_EPOCH = "1899-12-30"
+EXCEL_SERIAL_RANGE = (20000, 80000)  # 1954-2119 - מספר בטווח הזה הוא תאריך סידורי של Excel
+DATE_FORMATS = ("%d/%m/%Y", "%d.%m.%Y", "%Y-%m-%d")
+TIME_FORMATS = ("%H:%M", "%H:%M:%S")
+_DATE_TIME_SEPARATOR = re.compile(r"\s+|T")  # בין התאריך לשעה
+
+
+def _text(series: pd.Series) -> pd.Series:
+    """עמודה כמחרוזות בלי רווחים מסביב; תא ריק -> NA"""
+    text = series.astype("string").str.strip()
+    return text.mask(text == "")
+
+
+def _column(df: pd.DataFrame, name: str) -> pd.Series:
+    return df[name] if name in df else pd.Series(pd.NA, index=df.index, dtype="string")
+
+
+def _parse_formats(text: pd.Series, formats: tuple) -> pd.Series:
+    """כל פורמט מפוענח על כל העמודה (C); ערך שלא התאים לאף פורמט -> NaT"""
+    parsed = pd.Series(pd.NaT, index=text.index, dtype="datetime64[ns]")
+    for fmt in formats:
+        parsed = parsed.fillna(pd.to_datetime(text, format=fmt, errors="coerce"))
+    return parsed
+
+
+def normalize_dates(series: pd.Series) -> pd.Series:
+    """תאריכים ל-YYYY-MM-DD: DD/MM/YYYY, DD.MM.YYYY, ISO, ערכי תאריך ומספר סידורי של Excel.
+    ערך שלא זוהה -> NA"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.dt.strftime("%Y-%m-%d").astype("string")
+    text = _text(series)
+    dates = _parse_formats(text.str.split(_DATE_TIME_SEPARATOR, n=1, regex=True).str[0], DATE_FORMATS)
+
+    serial = pd.to_numeric(text, errors="coerce").astype("float64")
+    serial = serial.where(serial.between(*EXCEL_SERIAL_RANGE) & dates.isna())
+    dates = dates.fillna(pd.to_datetime(serial, unit="D", origin=EXCEL_EPOCH))
+    return dates.dt.strftime("%Y-%m-%d").astype("string")
+
+
+def normalize_times(series: pd.Series, default: str) -> pd.Series:
+    """שעות ל-HH:MM (8:00 -> 08:00, גם שבר יום של Excel). תא ריק -> default, ערך לא תקין -> NA"""
+    text = _text(series)
+    times = _parse_formats(text, TIME_FORMATS)
+    minutes = (times.dt.hour * 60 + times.dt.minute).astype("float64")
+
+    fraction = pd.to_numeric(text, errors="coerce").astype("float64")
+    minutes = minutes.fillna((fraction.where((fraction >= 0) & (fraction < 1)) * 1440).round())
+    hours = (minutes // 60).astype("Int64").astype("string").str.zfill(2)
+    result = hours + ":" + (minutes % 60).astype("Int64").astype("string").str.zfill(2)
+    return result.mask(text.isna(), default)
+
+
+def normalize_statuses(series: pd.Series) -> pd.Series:
+    """סטטוס לפי STATUS_MAP (עברית/אנגלית). תא ריק -> completed, ערך לא מוכר -> NA"""
+    text = _text(series)
+    return text.map(STATUS_MAP).astype("string").mask(text.isna(), "completed")
+
+
+def _resolve_names(names: pd.Series, mapping: dict, kind: str, label: str) -> tuple[pd.Series, pd.Series]:
+    """שם -> id דרך אינדקס השמות: רק שם מדויק או כינוי שנשמר. התאמה מקורבת לא נכתבת
+    בלי אישור - היא מוצגת כהצעה בבדיקה היבשה (name_suggestions) ונשמרת ככינוי.
+    כל שם ייחודי נבדק פעם אחת. מחזיר (ids, הודעת שגיאה לשמות שלא נפתרו)"""
+    matches = build_index(kind, mapping).resolve_many(names.unique())
+    ids, messages = {}, {}
+    for name, match in matches.items():
+        if match and match.score == 1.0:
+            ids[name] = match.id
+            continue
+        messages[name] = f"{label} '{name}' לא נמצא"
+        if match and match.score >= SUGGEST_SCORE:
+            messages[name] += f" - האם התכוונת ל-'{match.name}' ({match.score:.0%})?"
+    return names.map(pd.Series(ids, dtype=object)), names.map(pd.Series(messages, dtype=object))
+
+
+def normalize_activities(df: pd.DataFrame, school_map: dict, emp_map: dict) -> tuple[pd.DataFrame, pd.Series]:
+    """נרמול קובץ פעילויות בבת אחת. מחזיר (clean, errors):
+    clean - שורות מוכנות להוספה, errors - הודעת השגיאה הראשונה לכל שורה (NA לשורה תקינה)"""
+    school_name = _text(_column(df, "school_name")).fillna("")
+    emp_name = _text(_column(df, "employee_name")).fillna("")
+    raw = {name: _text(_column(df, name)) for name in ("date", "time_start", "time_end", "status")}
+    school_ids, school_errors = _resolve_names(school_name, school_map, "school", "בית ספר")
+    emp_ids, emp_errors = _resolve_names(emp_name, emp_map, "employee", "מדריך")
+    clean = pd.DataFrame({
+        "school_id": school_ids,
+        "employee_id": emp_ids,
+        "date": normalize_dates(_column(df, "date")),
+        "time_start": normalize_times(_column(df, "time_start"), "08:00"),
+        "time_end": normalize_times(_column(df, "time_end"), "14:00"),
+        "status": normalize_statuses(_column(df, "status")),
+        "confirmed_by_employee": True,
+    }, index=df.index)
+
+    # בדיקות לפי סדר - לכל שורה נשמרת הראשונה שנכשלה. הודעות נבנות רק לשורות שנכשלו
+    checks = [
+        (clean["school_id"].isna(), "{}", school_errors),
+        (clean["employee_id"].isna(), "{}", emp_errors),
+        (raw["date"].isna(), "תאריך חסר", None),
+        (clean["date"].isna(), "פורמט תאריך לא תקין: '{}'", raw["date"]),
+        (clean["time_start"].isna(), "שעת התחלה לא תקינה: '{}'", raw["time_start"]),
+        (clean["time_end"].isna(), "שעת סיום לא תקינה: '{}'", raw["time_end"]),
+        (clean["status"].isna(), "סטטוס לא מוכר: '{}'", raw["status"]),
+    ]
+    errors = pd.Series(None, index=df.index, dtype=object)
+    for mask, message, values in checks:
+        hit = mask.to_numpy(dtype=bool, na_value=True) & errors.isna().to_numpy()
+        if hit.any():
+            errors[hit] = [message.format(value) for value in values[hit]] if values is not None else message
+    return clean, errors
+
+
+ROW_BUILDERS = {
+    "בתי ספר": _school_row,
+    "עובדים/מדריכים": _employee_row,
+    "רשומות כספיות": _financial_row,
+}
+
+
+def _records(frame: pd.DataFrame) -> list[dict]:
+    """שורות כ-dict - מהיר מ-to_dict("records") על עמודות string"""
+    columns = list(frame.columns)
+    return [dict(zip(columns, values)) for values in zip(*(frame[column].tolist() for column in columns))]
+
+
+def line_number(index) -> int:
+    """מספר השורה בקובץ: שורה 1 היא הכותרות"""
+    return int(index) + 2
+
+
+def prepare_rows(import_type: str, df: pd.DataFrame, context: dict | None = None) -> tuple[list, list]:
+    """בניית שורות להוספה. מחזיר (rows, errors):
+    rows - רשימת (מספר שורה, dict), errors - רשימת (מספר שורה, הודעה)"""
+    context = context or {}
+    if import_type == "פעילויות היסטוריות":
+        clean, failures = normalize_activities(df, context.get("school_map", {}), context.get("emp_map", {}))
+        valid = failures.isna()
+        rows = list(zip(map(line_number, clean.index[valid]), _records(clean[valid])))
+        return rows, [(line_number(idx), message[:100]) for idx, message in failures.dropna().items()]
+
+    build = ROW_BUILDERS[import_type]
+    rows, errors = [], []
+    for idx, row in zip(df.index, df.to_dict("records")):
+        try:
+            rows.append((line_number(idx), build(row, context)))
+        except Exception as e:
+            errors.append((line_number(idx), str(e)[:100]))
+    return rows, errors
+
+
+# === הוספה במנות ===
+def _error_message(error: Exception) -> str:
+    return (getattr(error, "message", None) or str(error))[:100]
+
+
+def _insert_chunk(table: str, chunk: list, upsert: bool = False) -> tuple[int, list]:
+    """הוספת מנה בבקשה אחת; אם נכשלה - חצייה עד לשורות הבעייתיות"""
+    try:
+        query = supabase.table(table)
+        rows = [row for _, row in chunk]
+        (query.upsert(rows) if upsert else query.insert(rows)).execute()
+        return len(chunk), []
+    except Exception as e:
+        if len(chunk) == 1:
+            return 0, [(chunk[0][0], _error_message(e))]
+        mid = len(chunk) // 2
+        first_ok, first_errors = _insert_chunk(table, chunk[:mid], upsert)
+        second_ok, second_errors = _insert_chunk(table, chunk[mid:], upsert)
+        return first_ok + second_ok, first_errors + second_errors
+
+
+def insert_chunked(table: str, rows: list, chunk_size: int = IMPORT_CHUNK_SIZE, on_progress=None,
+                   invalidate_cache: bool = True, upsert: bool = False) -> dict:
+    """הוספת (מספר שורה, dict) במנות. on_progress(done, total) נקרא אחרי כל מנה.
+    upsert=True - שורות עם id קיים מתעדכנות (on conflict לפי המפתח הראשי).
+    מחזיר {"inserted": n, "errors": [(מספר שורה, הודעה)]}"""
+    inserted, errors = 0, []
+    for start in range(0, len(rows), chunk_size):
+        ok, failed = _insert_chunk(table, rows[start:start + chunk_size], upsert)
+        inserted += ok
+        errors += failed
+        if on_progress:
+            on_progress(min(start + chunk_size, len(rows)), len(rows))
+    if inserted and invalidate_cache:
+        invalidate(table)
+    return {"inserted": inserted, "errors": errors}
+
+
+# === מפתח טבעי - ייבוא חוזר לא יוצר כפילויות ===
+# שורה שהמפתח שלה כבר קיים בטבלה מדולגת (או מעודכנת, on_existing="update"),
+# ושורה שחוזרת על מפתח של שורה קודמת בקובץ מדווחת כשגיאה
+NATURAL_KEYS = {
+    "בתי ספר": ("name",),
+    "עובדים/מדריכים": ("email",),
+    "פעילויות היסטוריות": ("school_id", "employee_id", "date", "time_start"),
+    "רשומות כספיות": ("date", "amount", "category", "description"),
+}
+
+# טבלאות גדולות - המפתחות הקיימים נקראים רק לטווח התאריכים של המנה.
+# בטבלאות הקטנות נקראים כל המפתחות פעם אחת לייבוא
+KEY_RANGE_COLUMN = {
+    "פעילויות היסטוריות": "date",
+    "רשומות כספיות": "date",
+}
+
+# שדות שעדכון של רשומה קיימת לא דורס - הערך הקיים נקרא עם המפתחות ונשלח בשורה,
+# כי upsert בודק NOT NULL על השורה המלאה לפני שמזהה שה-id קיים
+KEEP_ON_UPDATE = {
+    "בתי ספר": ("status",),
+    "עובדים/מדריכים": ("id", "role", "status"),
+    "רשומות כספיות": ("created_by",),
+}
+
+
+def _key_part(column: str, value):
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ""
+    if column == "amount":
+        return float(value)
+    if column == "time_start":
+        return str(value)[:5]
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    return str(value)
+
+
+def natural_key(import_type: str, row: dict) -> tuple:
+    """המפתח הטבעי של שורה, מנורמל (רווחים, אותיות גדולות, HH:MM, סכום כמספר)"""
+    return tuple(_key_part(column, row.get(column)) for column in NATURAL_KEYS[import_type])
+
+
+def _key_map(import_type: str, reader) -> dict:
+    keep = ("id",) + KEEP_ON_UPDATE.get(import_type, ())
+    return {natural_key(import_type, row): {column: row.get(column) for column in keep}
+            for page in reader for row in page}
+
+
+def existing_keys(import_type: str, rows: list, cache: dict) -> dict:
+    """מפתח טבעי -> {id ושדות KEEP_ON_UPDATE} לרשומות שכבר קיימות, בשאילתה (מדורגת) אחת"""
+    table = IMPORT_TABLES[import_type]
+    keep = tuple(column for column in KEEP_ON_UPDATE.get(import_type, ()) if column != "id")
+    columns = ", ".join(("id",) + NATURAL_KEYS[import_type] + keep)
+    range_column = KEY_RANGE_COLUMN.get(import_type)
+    if range_column is None:
+        if import_type not in cache:
+            cache[import_type] = _key_map(import_type, PagedReader(table, columns))
+        return cache[import_type]
+    values = [row[range_column] for _, row in rows if row.get(range_column)]
+    if not values:
+        return {}
+    filters = (("gte", range_column, min(values)), ("lte", range_column, max(values)))
+    return _key_map(import_type, PagedReader(table, columns, filters))
+
+
+def plan_rows(import_type: str, rows: list, existing: dict, seen: dict, on_existing: str = "skip") -> dict:
+    """חלוקת השורות לפי המפתח הטבעי: new (להוספה), update (שורה מלאה עם ה-id והשדות השמורים
+    של הרשומה הקיימת), skipped ו-errors (כפילות בקובץ).
+    existing - מתוך existing_keys; seen - מפתח -> מספר השורה הראשונה, נשמר בין מנות"""
+    plan = {"new": [], "update": [], "skipped": 0, "errors": []}
+    for line, row in rows:
+        key = natural_key(import_type, row)
+        if key in seen:
+            plan["errors"].append((line, f"כפילות של שורה {seen[key]} בקובץ"))
+            continue
+        seen[key] = line
+        if key not in existing:
+            plan["new"].append((line, row))
+        elif on_existing == "update":
+            plan["update"].append((line, {**row, **existing[key]}))
+        else:
+            plan["skipped"] += 1
+    return plan
+
+
+# === קריאת קובץ בזרימה ===
+# הקידוד מזוהה פעם אחת מתחילת הקובץ, CSV נקרא במנות ו-xlsx במצב read-only,
+# כך שבזיכרון נמצאת רק מנה אחת בכל רגע - בלי קשר לגודל הקובץ
+READ_CHUNK_ROWS = 5000
+SNIFF_BYTES = 64 * 1024
+ENCODINGS = ("utf-8-sig", "cp1255", "latin-1")  # utf-8-sig קורא גם utf-8 בלי BOM
+
+
+def sniff_encoding(file) -> str:
+    """הקידוד הראשון שמפענח את תחילת הקובץ (תו שנחתך בסוף הקטע לא נחשב שגיאה)"""
+    prefix = file.read(SNIFF_BYTES)
+    file.seek(0)
+    for encoding in ENCODINGS:
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(prefix, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return ENCODINGS[-1]
+
+
+def _is_csv(file) -> bool:
+    return file.name.lower().endswith('.csv')
+
+
+def _is_xlsx(file) -> bool:
+    return file.name.lower().endswith('.xlsx')
+
+
+def _is_parquet(file) -> bool:
+    return file.name.lower().endswith('.parquet')
+
+
+def _is_arrow(file) -> bool:
+    return file.name.lower().endswith(('.arrow', '.feather'))
+
+
+def _xlsx_chunks(file, chunk_rows: int):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else f"column_{i}" for i, cell in enumerate(next(rows, ()))]
+        batch, index = [], []
+        for position, values in enumerate(rows):
+            if all(value is None for value in values):
+                continue
+            batch.append(values[:len(header)])
+            index.append(position)
+            if len(batch) >= chunk_rows:
+                yield pd.DataFrame(batch, columns=header, index=index)
+                batch, index = [], []
+        if batch:
+            yield pd.DataFrame(batch, columns=header, index=index)
+    finally:
+        workbook.close()
+
+
+def _arrow_batches(file, chunk_rows: int):
+    """מנות עמודתיות: ב-Parquet נקראות רק קבוצות השורות שנדרשות למנה הנוכחית,
+    בקובץ Arrow (IPC) - batch אחרי batch בלי לטעון את כל הטבלה"""
+    if _is_parquet(file):
+        import pyarrow.parquet as pq
+        yield from pq.ParquetFile(file).iter_batches(batch_size=chunk_rows)
+        return
+    import pyarrow as pa
+    reader = pa.ipc.open_file(file)
+    for i in range(reader.num_record_batches):
+        batch = reader.get_batch(i)
+        for start in range(0, batch.num_rows, chunk_rows):
+            yield batch.slice(start, chunk_rows)
+
+
+def _columnar_chunks(file, chunk_rows: int):
+    offset = 0
+    for batch in _arrow_batches(file, chunk_rows):
+        frame = batch.to_pandas()
+        frame.index = pd.RangeIndex(offset, offset + len(frame))
+        offset += len(frame)
+        yield frame
+
+
+def read_chunks(file, chunk_rows: int = READ_CHUNK_ROWS):
+    """DataFrame לכל מנה; האינדקס רץ על פני כל הקובץ (מספור שורות לשגיאות)"""
+    file.seek(0)
+    if _is_csv(file):
+        with pd.read_csv(file, encoding=sniff_encoding(file), chunksize=chunk_rows) as reader:
+            yield from reader
+    elif _is_xlsx(file):
+        yield from _xlsx_chunks(file, chunk_rows)
+    elif _is_parquet(file) or _is_arrow(file):
+        yield from _columnar_chunks(file, chunk_rows)
+    else:
+        # xls ישן - אין קריאה בזרימה, נקרא בבת אחת ומחולק למנות
+        df = pd.read_excel(file)
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+
+
+def preview(file, rows: int = 10) -> pd.DataFrame:
+    """השורות הראשונות בלבד - בלי לקרוא את כל הקובץ"""
+    first = next(read_chunks(file, rows), pd.DataFrame())
+    file.seek(0)
+    return first
+
+
+def estimate_rows(file) -> int:
+    """מספר שורות משוער לפס ההתקדמות: ספירת שורות ב-CSV, ממדי הגיליון ב-xlsx,
+    ומטא-דאטה (בלי לקרוא נתונים) ב-Parquet/Arrow"""
+    file.seek(0)
+    try:
+        if _is_csv(file):
+            lines = 0
+            for block in iter(lambda: file.read(1024 * 1024), b""):
+                lines += block.count(b"\n")
+            return max(lines - 1, 0)
+        if _is_xlsx(file):
+            from openpyxl import load_workbook
+            workbook = load_workbook(file, read_only=True)
+            try:
+                return max((workbook.active.max_row or 1) - 1, 0)
+            finally:
+                workbook.close()
+        if _is_parquet(file):
+            import pyarrow.parquet as pq
+            return pq.ParquetFile(file).metadata.num_rows
+        if _is_arrow(file):
+            import pyarrow as pa
+            reader = pa.ipc.open_file(file)
+            return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+        return 0
+    finally:
+        file.seek(0)
+
+
+def _planned_chunks(import_type: str, file, context: dict | None, on_existing: str, on_progress,
+                    start_chunk: int = 0):
+    """מנות הקובץ אחרי נרמול ותכנון לפי מפתח טבעי - משותף לבדיקה היבשה ולייבוא.
+    start_chunk - מנות קודמות נקראות ומדולגות (המשך מ-checkpoint)"""
+    total = estimate_rows(file)
+    seen, key_cache, done = {}, {}, 0
+    for index, frame in enumerate(read_chunks(file)):
+        if index < start_chunk:
+            done += len(frame)
+            continue
+        rows, failed = prepare_rows(import_type, frame, context)
+        plan = plan_rows(import_type, rows, existing_keys(import_type, rows, key_cache), seen, on_existing)
+        plan["errors"] = failed + plan["errors"]
+        plan["index"] = index
+        done += len(frame)
+        yield len(frame), plan
+        if on_progress:
+            on_progress(done, max(total, done))
+
+
+def import_context(import_type: str, created_by: str | None = None) -> dict:
+    """נתוני עזר לבניית השורות: מפות שם -> id לפעילויות (מה-cache), יוצר הרשומה לכספים"""
+    context = {"created_by": created_by}
+    if import_type == "פעילויות היסטוריות":
+        context["school_map"] = {s['name'].strip(): s['id'] for s in get_schools(view="schools.names")}
+        context["emp_map"] = {e['full_name'].strip(): e['id'] for e in get_employees(view="employees.options")}
+    return context
+
+
+def validate_file(import_type: str, file, context: dict | None = None, on_existing: str = "skip",
+                  on_progress=None) -> dict:
+    """בדיקה יבשה של כל הקובץ - נרמול, שמות, מספרים ומפתחות קיימים, בלי שום כתיבה.
+    מחזיר {"rows", "new", "existing", "errors"}"""
+    summary = {"rows": 0, "new": 0, "existing": 0, "errors": []}
+    for size, plan in _planned_chunks(import_type, file, context, on_existing, on_progress):
+        summary["rows"] += size
+        summary["new"] += len(plan["new"])
+        summary["existing"] += len(plan["update"]) + plan["skipped"]
+        summary["errors"] += plan["errors"]
+    summary["errors"].sort()
+    return summary
+
+
+def name_suggestions(file, context: dict) -> list[dict]:
+    """שמות בתי ספר/מדריכים בקובץ פעילויות שלא נמצאו בדיוק, עם המועמד הקרוב ביותר -
+    לאישור ושמירה ככינוי. {"kind", "name", "match_id", "match_name", "score"}"""
+    names = {"school": set(), "employee": set()}
+    for frame in read_chunks(file):
+        names["school"].update(_text(_column(frame, "school_name")).dropna().unique())
+        names["employee"].update(_text(_column(frame, "employee_name")).dropna().unique())
+    file.seek(0)
+    suggestions = []
+    for kind, mapping in (("school", context["school_map"]), ("employee", context["emp_map"])):
+        for name, match in sorted(build_index(kind, mapping).resolve_many(names[kind]).items()):
+            if match and match.score == 1.0:
+                continue
+            suggestions.append({
+                "kind": kind,
+                "name": name,
+                "match_id": match.id if match and match.score >= SUGGEST_SCORE else None,
+                "match_name": match.name if match else None,
+                "score": match.score if match else 0.0,
+            })
+    return suggestions
+
+
+def error_report(errors: list) -> bytes:
+    """דו"ח שגיאות (שורה, שגיאה) כ-CSV להורדה"""
+    return pd.DataFrame(errors, columns=["שורה", "שגיאה"]).to_csv(index=False).encode("utf-8-sig")
+
+
+def import_chunks(import_type: str, file, context: dict | None = None, chunk_size: int = IMPORT_CHUNK_SIZE,
+                  on_existing: str = "skip", start_chunk: int = 0, on_progress=None):
+    """ייבוא מנה אחרי מנה; אחרי כל מנה שנכתבה מוחזר סיכום שלה - נקודת checkpoint/ביטול.
+    לא מנקה cache - באחריות הקורא (invalidate) בסוף"""
+    table = IMPORT_TABLES[import_type]
+    for size, plan in _planned_chunks(import_type, file, context, on_existing, on_progress, start_chunk):
+        inserted = insert_chunked(table, plan["new"], chunk_size, invalidate_cache=False)
+        updated = insert_chunked(table, plan["update"], chunk_size, invalidate_cache=False, upsert=True)
+        yield {
+            "index": plan["index"],
+            "rows": size,
+            "inserted": inserted["inserted"],
+            "updated": updated["inserted"],
+            "skipped": plan["skipped"],
+            "errors": plan["errors"] + inserted["errors"] + updated["errors"],
+        }
+
+
+def import_file(import_type: str, file, context: dict | None = None, chunk_size: int = IMPORT_CHUNK_SIZE,
+                on_progress=None, on_existing: str = "skip") -> dict:
+    """ייבוא קובץ בזרימה: כל מנת קריאה עוברת נרמול, השוואה למפתחות הקיימים והוספה לפני שהבאה נקראת.
+    on_existing: "skip" - רשומה קיימת לא נשלחת, "update" - מתעדכנת ב-upsert.
+    on_progress(done, total) אחרי כל מנה. מחזיר {"inserted", "updated", "skipped", "errors", "rows"}"""
+    result = {"inserted": 0, "updated": 0, "skipped": 0, "errors": [], "rows": 0}
+    for chunk in import_chunks(import_type, file, context, chunk_size, on_existing, on_progress=on_progress):
+        for field in ("inserted", "updated", "skipped", "errors", "rows"):
+            result[field] += chunk[field]
+    if result["inserted"] or result["updated"]:
+        invalidate(IMPORT_TABLES[import_type])
+    result["errors"].sort()
+    return result
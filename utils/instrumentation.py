@@ -0,0 +1,230 @@
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+from collections import deque
+from datetime import datetime
+import streamlit as st
+import pandas as pd
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# === מדידת שאילתות Supabase ===
+# כל .execute() נרשם: טבלה, פעולה, פילטרים, מספר שורות, גודל payload וזמן.
+# הרישום נשמר לסשן (session_state) ולסיכום לפי עמוד ברמת התהליך,
+# ושאילתות איטיות נכתבות ללוג (JSON lines)
+SLOW_QUERY_MS = float(os.environ.get("DREAM_BUILD_SLOW_QUERY_MS", 500))
+
+# גודל ה-payload דורש סריאליזציה של כל התוצאה - נמדד רק כשמבקשים (או במצב פיתוח),
+# ותמיד לשאילתות איטיות (שנכתבות ללוג)
+MEASURE_PAYLOAD = os.environ.get("DREAM_BUILD_MEASURE_PAYLOAD", os.environ.get("DREAM_BUILD_DEV", "")) == "1"
+SLOW_QUERY_LOG = os.environ.get("DREAM_BUILD_SLOW_LOG", os.path.join(tempfile.gettempdir(), "dream_build_slow_queries.jsonl"))
+
+# כמה רשומות לשמור בזיכרון
+SESSION_LOG_SIZE = 1000
+SLOW_LOG_SIZE = 200
+PAGE_LATENCY_SAMPLES = 500
+
+# פעולות שפותחות שאילתה על טבלה - השאר נחשבים פילטרים/מאפיינים
+_OPERATIONS = {"select", "insert", "update", "upsert", "delete"}
+
+logger = logging.getLogger("dream_build.queries")
+
+_LOCK = threading.Lock()
+_PAGE_STATS: dict[str, dict] = {}
+_SLOW_QUERIES: deque = deque(maxlen=SLOW_LOG_SIZE)
+
+
+def current_page() -> str:
+    """שם העמוד שרץ כרגע (או '-' מחוץ לריצת Streamlit)"""
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return "-"
+    try:
+        return ctx.pages_manager.get_pages()[ctx.page_script_hash]["page_name"]
+    except (AttributeError, KeyError, TypeError):
+        return ctx.page_script_hash
+
+
+def _payload_bytes(data) -> int:
+    """גודל משוער של ה-payload - אורך ה-JSON של התוצאה"""
+    if not data:
+        return 0
+    return len(json.dumps(data, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+def _format_call(name: str, args: tuple, kwargs: dict) -> str:
+    parts = [repr(arg) if not isinstance(arg, str) else arg for arg in args]
+    parts += [f"{key}={value!r}" for key, value in kwargs.items() if value is not None]
+    return f"{name}({', '.join(parts)})"
+
+
+def _record(entry: dict):
+    """שמירת רשומה בלוג הסשן, בסיכום העמוד ובלוג האיטיות"""
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is not None:
+        try:
+            st.session_state.setdefault("_query_log", deque(maxlen=SESSION_LOG_SIZE)).append(entry)
+        except Exception:
+            pass  # מדידה לא מפילה עמוד
+
+    with _LOCK:
+        stats = _PAGE_STATS.setdefault(entry["page"], {
+            "calls": 0, "errors": 0, "rows": 0, "bytes": 0, "ms": 0.0,
+            "latencies": deque(maxlen=PAGE_LATENCY_SAMPLES),
+        })
+        stats["calls"] += 1
+        stats["errors"] += entry["error"] is not None
+        stats["rows"] += entry["rows"]
+        stats["bytes"] += entry["bytes"]
+        stats["ms"] += entry["ms"]
+        stats["latencies"].append(entry["ms"])
+
+        if entry["ms"] >= SLOW_QUERY_MS:
+            _SLOW_QUERIES.append(entry)
+            logger.warning("שאילתה איטית (%.0fms) %s %s %s", entry["ms"], entry["op"], entry["table"], entry["filters"])
+            try:
+                with open(SLOW_QUERY_LOG, "a", encoding="utf-8") as log:
+                    log.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            except OSError:
+                pass
+
+
+class _InstrumentedQuery:
+    """עטיפה לבונה השאילתה של postgrest - אוספת את הקריאות בשרשרת ומודדת את execute()"""
+
+    def __init__(self, builder, table: str, op: str | None = None, calls: tuple = ()):
+        self._builder = builder
+        self._table = table
+        self._op = op
+        self._calls = calls
+
+    def __getattr__(self, name):
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return attr
+
+        def chained(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if not hasattr(result, "execute"):
+                return result
+            if self._op is None and name in _OPERATIONS:
+                # בכתיבה לא רושמים את ה-payload, רק את שם הפעולה
+                call = name if name != "select" else _format_call(name, args, kwargs)
+                return _InstrumentedQuery(result, self._table, name, self._calls + (call,))
+            return _InstrumentedQuery(result, self._table, self._op, self._calls + (_format_call(name, args, kwargs),))
+
+        return chained
+
+    def execute(self):
+        entry = {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "page": current_page(),
+            "table": self._table,
+            "op": self._op or "-",
+            "filters": " ".join(self._calls),
+            "rows": 0,
+            "bytes": 0,
+            "ms": 0.0,
+            "error": None,
+        }
+        data = None
+        start = time.perf_counter()
+        try:
+            result = self._builder.execute()
+        except Exception as e:
+            entry["error"] = f"{type(e).__name__}: {e}"
+            raise
+        else:
+            data = getattr(result, "data", None)
+            entry["rows"] = len(data) if isinstance(data, list) else int(data is not None)
+            return result
+        finally:
+            entry["ms"] = round((time.perf_counter() - start) * 1000, 1)
+            if MEASURE_PAYLOAD or entry["ms"] >= SLOW_QUERY_MS:
+                entry["bytes"] = _payload_bytes(data)
+            _record(entry)
+
+
+class InstrumentedClient:
+    """עטיפה ל-supabase Client: table() מחזיר שאילתה נמדדת, כל השאר (auth, storage...) עובר כמו שהוא"""
+
+    def __init__(self, client):
+        self._client = client
+
+    def table(self, name: str):
+        return _InstrumentedQuery(self._client.table(name), name)
+
+    def from_(self, name: str):
+        return self.table(name)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+# === סיכומים ===
+def session_log() -> list[dict]:
+    """כל השאילתות שנמדדו בסשן הנוכחי, מהישנה לחדשה"""
+    return list(st.session_state.get("_query_log", ()))
+
+
+def session_summary() -> pd.DataFrame:
+    """סיכום הסשן לפי עמוד וטבלה"""
+    log = session_log()
+    if not log:
+        return pd.DataFrame(columns=["page", "table", "calls", "rows", "kb", "total_ms", "avg_ms", "errors"])
+    df = pd.DataFrame(log)
+    summary = df.groupby(["page", "table"]).agg(
+        calls=("ms", "size"),
+        rows=("rows", "sum"),
+        kb=("bytes", lambda b: round(b.sum() / 1024, 1)),
+        total_ms=("ms", "sum"),
+        avg_ms=("ms", "mean"),
+        errors=("error", "count"),
+    ).reset_index()
+    if not MEASURE_PAYLOAD:
+        summary = summary.drop(columns="kb")  # נמדד רק לשאילתות איטיות - סכום חלקי מטעה
+    return summary.sort_values("total_ms", ascending=False).round({"total_ms": 0, "avg_ms": 1})
+
+
+def page_summary() -> pd.DataFrame:
+    """סיכום לפי עמוד לכל הסשנים בתהליך, כולל p95 של זמן שאילתה"""
+    with _LOCK:
+        rows = [{
+            "page": page,
+            "calls": stats["calls"],
+            "errors": stats["errors"],
+            "rows": stats["rows"],
+            "kb": round(stats["bytes"] / 1024, 1),
+            "avg_ms": round(stats["ms"] / stats["calls"], 1),
+            "p95_ms": round(pd.Series(list(stats["latencies"])).quantile(0.95), 1),
+        } for page, stats in _PAGE_STATS.items()]
+    if not rows:
+        return pd.DataFrame(columns=["page", "calls", "errors", "rows", "kb", "avg_ms", "p95_ms"])
+    frame = pd.DataFrame(rows).sort_values("calls", ascending=False)
+    return frame if MEASURE_PAYLOAD else frame.drop(columns="kb")
+
+
+def query_totals() -> dict:
+    """מונים מצטברים לכל התהליך - להפרשים לפני/אחרי (benchmarks)"""
+    with _LOCK:
+        return {
+            "calls": sum(stats["calls"] for stats in _PAGE_STATS.values()),
+            "rows": sum(stats["rows"] for stats in _PAGE_STATS.values()),
+            "bytes": sum(stats["bytes"] for stats in _PAGE_STATS.values()),
+        }
+
+
+def slow_queries() -> list[dict]:
+    """השאילתות האיטיות האחרונות (מעל SLOW_QUERY_MS), מהחדשה לישנה"""
+    with _LOCK:
+        return list(reversed(_SLOW_QUERIES))
+
+
+def reset_stats():
+    """איפוס הסיכומים של התהליך ושל הסשן הנוכחי"""
+    with _LOCK:
+        _PAGE_STATS.clear()
+        _SLOW_QUERIES.clear()
+    st.session_state.pop("_query_log", None)
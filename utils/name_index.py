@@ -0,0 +1,151 @@
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+from typing import NamedTuple
+from datetime import datetime
+from collections import Counter
+import streamlit as st
+
+# === התאמת שמות (בתי ספר / מדריכים) בייבוא ===
+# שמות מנורמלים (ניקוד, גרשיים, רווחים, אותיות סופיות) ומאונדקסים לפי n-gram של תווים,
+# כך שכל שם בקובץ מקבל את המועמד הקרוב ביותר וציון ביטחון בלי לסרוק את כל הרשימה.
+# התאמות שאושרו נשמרות בטבלת כינויים (SQLite) ונפתרות מיד בייבוא הבא
+NGRAM = 2  # זוגות תווים - מילים עבריות קצרות, שגיאת אות אחת עדיין נותנת ציון גבוה
+
+# ציון (Dice על n-grams) שמעליו המועמד מוצג כהצעה. רק שם מדויק או כינוי שנשמר (ציון 1)
+# מתקבלים אוטומטית - "בית ספר אלונים ב" קרוב מאוד ל"בית ספר אלונים" ועדיין בית ספר אחר
+SUGGEST_SCORE = 0.5
+
+# מילה שמופיעה ביותר מחלק כזה מהשמות ("בית ספר") לא נכנסת להשוואה
+COMMON_TOKEN_SHARE = 0.3
+
+ALIASES_PATH = os.environ.get("DREAM_BUILD_ALIASES", os.path.join(tempfile.gettempdir(), "dream_build_aliases.sqlite3"))
+
+_NIQQUD = re.compile("[\u0591-\u05BD\u05BF\u05C1\u05C2\u05C4\u05C5\u05C7]")  # טעמים וניקוד, בלי מקף (05BE)
+_QUOTES = re.compile("[\"'`׳״‘’“”]")
+_SEPARATORS = re.compile(r"[\s\-־_.,/\\()]+")
+_FINAL_LETTERS = str.maketrans("ךםןףץ", "כמנפצ")
+
+# קיצורים נפוצים (אחרי הסרת גרשיים)
+ABBREVIATIONS = {
+    "ביס": "בית ספר",
+    "ביהס": "בית ספר",
+    "ממ": "ממלכתי",
+    "ממד": "ממלכתי דתי",
+}
+
+
+def normalize_name(text) -> str:
+    """שם לצורך השוואה: בלי ניקוד, גרש/גרשיים ומירכאות, סימני פיסוק ורווחים כפולים,
+    אותיות סופיות כרגילות וקיצורים מורחבים"""
+    if text is None:
+        return ""
+    text = _NIQQUD.sub("", str(text))
+    text = _QUOTES.sub("", text)
+    text = text.translate(_FINAL_LETTERS).casefold()
+    tokens = _SEPARATORS.sub(" ", text).split()
+    return " ".join(ABBREVIATIONS.get(token, token) for token in tokens)
+
+
+class Match(NamedTuple):
+    id: object
+    name: str
+    score: float
+
+
+class NameIndex:
+    """אינדקס n-gram על שמות -> id. lookup מחזיר את ההתאמה הטובה ביותר עם ציון 0-1"""
+
+    def __init__(self, names: dict, aliases: dict | None = None, n: int = NGRAM):
+        self.n = n
+        self._names = {}
+        self._exact = {}
+        for name, entity_id in names.items():
+            key = normalize_name(name)
+            self._exact.setdefault(key, entity_id)
+            self._names[entity_id] = name
+        self._aliases = aliases or {}
+
+        # מילים משותפות לרוב השמות לא מבדילות ביניהם
+        counts = Counter(token for key in self._exact for token in set(key.split()))
+        limit = max(2, COMMON_TOKEN_SHARE * len(self._exact))
+        self._common = {token for token, count in counts.items() if count > limit}
+
+        self._grams: dict[str, list] = {}
+        self._sizes = {}
+        for key in self._exact:
+            grams = self._grams_of(key)
+            self._sizes[key] = len(grams)
+            for gram in grams:
+                self._grams.setdefault(gram, []).append(key)
+
+    def _grams_of(self, key: str) -> set:
+        tokens = [token for token in key.split() if token not in self._common] or key.split()
+        padded = f" {' '.join(tokens)} "
+        return {padded[i:i + self.n] for i in range(max(len(padded) - self.n + 1, 1))}
+
+    def lookup(self, name) -> Match | None:
+        """שם מדויק / כינוי שנשמר -> ציון 1; אחרת המועמד הקרוב ביותר (או None)"""
+        key = normalize_name(name)
+        if not key:
+            return None
+        if key in self._exact:
+            entity_id = self._exact[key]
+            return Match(entity_id, self._names[entity_id], 1.0)
+        if key in self._aliases and self._aliases[key] in self._names:
+            entity_id = self._aliases[key]
+            return Match(entity_id, self._names[entity_id], 1.0)
+
+        grams = self._grams_of(key)
+        shared = Counter(candidate for gram in grams for candidate in self._grams.get(gram, ()))
+        if not shared:
+            return None
+        best, score = max(((candidate, 2 * count / (len(grams) + self._sizes[candidate]))
+                           for candidate, count in shared.items()), key=lambda item: item[1])
+        entity_id = self._exact[best]
+        return Match(entity_id, self._names[entity_id], round(score, 3))
+
+    def resolve_many(self, names) -> dict:
+        """התאמה לכל שם ייחודי - שמות חוזרים בקובץ מחושבים פעם אחת"""
+        return {name: self.lookup(name) for name in set(names)}
+
+
+# === טבלת כינויים ===
+class AliasStore:
+    """כינויים שאושרו: (סוג, שם מנורמל) -> id"""
+
+    def __init__(self, path: str = ALIASES_PATH):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS aliases (kind TEXT NOT NULL, alias TEXT NOT NULL, "
+                               "target_id TEXT NOT NULL, created_at TEXT NOT NULL, PRIMARY KEY (kind, alias))")
+            self._conn.commit()
+
+    def aliases(self, kind: str) -> dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT alias, target_id FROM aliases WHERE kind = ?", (kind,)).fetchall()
+        return dict(rows)
+
+    def add(self, kind: str, name: str, target_id):
+        """שמירת כינוי - הפעם הבאה השם נפתר מיד"""
+        alias = normalize_name(name)
+        if not alias:
+            return
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO aliases (kind, alias, target_id, created_at) VALUES (?, ?, ?, ?)",
+                               (kind, alias, str(target_id), datetime.now().isoformat(timespec="seconds")))
+            self._conn.commit()
+
+
+@st.cache_resource
+def get_alias_store() -> AliasStore:
+    """טבלת כינויים אחת לכל תהליך השרת"""
+    return AliasStore()
+
+
+def build_index(kind: str, names: dict) -> NameIndex:
+    """אינדקס לשמות (שם -> id) כולל הכינויים שנשמרו לסוג הזה"""
+    return NameIndex(names, get_alias_store().aliases(kind))
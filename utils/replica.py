@@ -0,0 +1,212 @@
+import os
+import json
+import time
+import sqlite3
+import tempfile
+import threading
+import streamlit as st
+import pandas as pd
+from utils.views import columns_for, column_set
+
+# === העתק מקומי (SQLite) של הטבלאות לניתוחים ===
+# במקום למשוך את כל טבלת הפעילויות ב-HTTP לכל מסך ניתוח, ההעתק מתעדכן
+# באופן מצטבר לפי סמן (updated_at, id), והמסכים מריצים עליו SQL מקומי.
+# דרישה בצד השרת: updated_at מתעדכן בכל שינוי שורה (טריגר moddatetime).
+# מכל טבלה מועתקות רק העמודות שהניתוחים צריכים - ה-view "replica.<טבלה>" (utils.views),
+# כך שפרטים אישיים (אימייל, טלפון) לא נשמרים בקובץ המקומי
+
+CURSOR_COLUMN = "updated_at"
+
+# כל כמה שניות לבדוק שינויים בשרת, וכל כמה לזהות מחיקות שנעשו מחוץ לאפליקציה
+SYNC_INTERVAL = 30
+RECONCILE_INTERVAL = 600
+
+# גודל דף בסנכרון - תואם ל-max-rows של PostgREST
+SYNC_PAGE_SIZE = 1000
+
+REPLICA_PATH = os.environ.get("DREAM_BUILD_REPLICA", os.path.join(tempfile.gettempdir(), "dream_build_replica.sqlite3"))
+
+
+def _quote(name: str) -> str:
+    """שם טבלה/עמודה בטוח ל-SQL"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _to_sql(value):
+    """ערך JSON מהשרת כערך ש-SQLite יודע לשמור"""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def _filter_value(value) -> str:
+    """ערך בתוך פילטר or של PostgREST - במירכאות בגלל נקודות ונקודתיים בחותמות זמן"""
+    return '"' + str(value).replace('"', '\\"') + '"'
+
+
+class Replica:
+    """העתק מקומי של טבלאות Supabase. client מוזרק - ה-Supabase האמיתי או שרת מקומי לבדיקות"""
+
+    def __init__(self, client, path: str = REPLICA_PATH,
+                 sync_interval: float = SYNC_INTERVAL, reconcile_interval: float = RECONCILE_INTERVAL):
+        self.client = client
+        self.sync_interval = sync_interval
+        self.reconcile_interval = reconcile_interval
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            os.chmod(path, 0o600)  # רק משתמש השרת קורא את הקובץ
+        self._lock = threading.RLock()
+        self._last_sync: dict[str, float] = {}
+        self._last_reconcile: dict[str, float] = {}
+        self._loaded: dict[str, object] = {}
+
+    # === סכמה ===
+    def _columns(self, table: str) -> set:
+        return {row[1] for row in self._conn.execute(f"PRAGMA table_info({_quote(table)})")}
+
+    def _ensure_columns(self, table: str, keys: set):
+        """יצירת הטבלה והוספת עמודות חדשות לפי המפתחות שהגיעו מהשרת"""
+        existing = self._columns(table)
+        if not existing:
+            self._conn.execute(f"CREATE TABLE {_quote(table)} (id PRIMARY KEY)")
+            existing = {"id"}
+        for key in sorted(keys - existing):
+            self._conn.execute(f"ALTER TABLE {_quote(table)} ADD COLUMN {_quote(key)}")
+
+    def _store(self, table: str, rows: list[dict]):
+        if not rows:
+            return
+        keys = sorted(set().union(*(row.keys() for row in rows)))
+        self._ensure_columns(table, set(keys))
+        placeholders = ", ".join("?" for _ in keys)
+        self._conn.executemany(
+            f"INSERT OR REPLACE INTO {_quote(table)} ({', '.join(_quote(k) for k in keys)}) VALUES ({placeholders})",
+            [tuple(_to_sql(row.get(k)) for k in keys) for row in rows]
+        )
+
+    def _cursor(self, table: str) -> tuple | None:
+        """הסמן נגזר מהנתונים המקומיים: ה-updated_at וה-id האחרונים שנשמרו"""
+        if CURSOR_COLUMN not in self._columns(table):
+            return None
+        return self._conn.execute(
+            f"SELECT {CURSOR_COLUMN}, id FROM {_quote(table)} WHERE {CURSOR_COLUMN} IS NOT NULL "
+            f"ORDER BY {CURSOR_COLUMN} DESC, id DESC LIMIT 1"
+        ).fetchone()
+
+    # === סנכרון ===
+    def _pages(self, table: str, columns: str):
+        """דפים לפי id (keyset): כל דף מתחיל אחרי ה-id האחרון שנקרא, כך שמחיקה תוך כדי
+        לא מזיזה את הדפים ולא מדלגת על שורות. עוצרים רק על דף ריק - דף קצר יכול
+        לנבוע מ-max-rows של השרת שנמוך מ-SYNC_PAGE_SIZE"""
+        last_id = None
+        while True:
+            query = self.client.table(table).select(columns).order("id").limit(SYNC_PAGE_SIZE)
+            if last_id is not None:
+                query = query.gt("id", last_id)
+            rows = query.execute().data or []
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1]["id"]
+
+    def _full_copy(self, table: str):
+        """העתקה ראשונית בדפים לפי id"""
+        for rows in self._pages(table, columns_for(f"replica.{table}", table)):
+            self._store(table, rows)
+
+    def _pull_changes(self, table: str, cursor: tuple):
+        """שורות שהשתנו אחרי הסמן - keyset על (updated_at, id), כך שגם אלפי שורות
+        עם אותה חותמת זמן (ייבוא גדול) לא נתקעות"""
+        columns = columns_for(f"replica.{table}", table)
+        while True:
+            ts, last_id = cursor
+            rows = (self.client.table(table).select(columns)
+                    .or_(f"{CURSOR_COLUMN}.gt.{_filter_value(ts)},"
+                         f"and({CURSOR_COLUMN}.eq.{_filter_value(ts)},id.gt.{_filter_value(last_id)})")
+                    .order(CURSOR_COLUMN).order("id").limit(SYNC_PAGE_SIZE).execute().data or [])
+            if not rows:
+                break
+            self._store(table, rows)
+            cursor = (rows[-1][CURSOR_COLUMN], rows[-1]["id"])
+
+    def _reconcile(self, table: str):
+        """מחיקת שורות מקומיות שכבר לא קיימות בשרת (נמחקו מחוץ לאפליקציה) - משווים רק מזהים"""
+        remote_ids = set()
+        for rows in self._pages(table, "id"):
+            remote_ids.update(row["id"] for row in rows)
+        local_ids = {row[0] for row in self._conn.execute(f"SELECT id FROM {_quote(table)}")}
+        self.forget(table, local_ids - remote_ids)
+
+    def sync(self, table: str, force: bool = False):
+        """עדכון טבלה מהשרת אם עבר sync_interval מהסנכרון האחרון (או force)"""
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_sync.get(table, float("-inf")) < self.sync_interval:
+                return
+            if self._columns(table) - column_set(f"replica.{table}"):
+                # העתק ישן עם עמודות שכבר לא מועתקות - נבנה מחדש
+                self._conn.execute(f"DROP TABLE {_quote(table)}")
+            if not self._columns(table):
+                self._full_copy(table)
+                self._last_reconcile[table] = now
+            else:
+                cursor = self._cursor(table)
+                if cursor is None:
+                    # אין עמודת סמן - אין דרך לזהות שינויים, מעתיקים מחדש
+                    self._conn.execute(f"DELETE FROM {_quote(table)}")
+                    self._full_copy(table)
+                else:
+                    self._pull_changes(table, cursor)
+                if now - self._last_reconcile.get(table, float("-inf")) >= self.reconcile_interval:
+                    self._reconcile(table)
+                    self._last_reconcile[table] = now
+            self._conn.commit()
+            self._last_sync[table] = now
+
+    # === עדכון מהאפליקציה ===
+    def mark_stale(self, *tables: str):
+        """האפליקציה כתבה לטבלאות - הקריאה הבאה תסנכרן מיד"""
+        for table in tables:
+            self._last_sync.pop(table, None)
+
+    def forget(self, table: str, ids):
+        """הסרת שורות שנמחקו מההעתק המקומי"""
+        ids = list(ids)
+        if not ids:
+            return
+        with self._lock:
+            if self._columns(table):
+                self._conn.executemany(f"DELETE FROM {_quote(table)} WHERE id = ?", [(row_id,) for row_id in ids])
+                self._conn.commit()
+
+    def load_table(self, table: str, version, load):
+        """טבלה מקומית שלא מסונכרנת מהשרת (למשל הארכיון): load() -> DataFrame נטען מחדש
+        רק כשה-version השתנה מהטעינה הקודמת"""
+        with self._lock:
+            if self._loaded.get(table) == version:
+                return
+            load().to_sql(table, self._conn, if_exists="replace", index=False)
+            self._conn.commit()
+            self._loaded[table] = version
+
+    # === שאילתות ===
+    def query_frame(self, sql: str, params: tuple = (), tables: dict | None = None) -> pd.DataFrame:
+        """SQL על ההעתק המקומי. tables: טבלה -> העמודות שה-SQL קורא;
+        הטבלאות מסונכרנות קודם, והעמודות נוצרות גם אם הטבלה ריקה בשרת"""
+        with self._lock:
+            for table, columns in (tables or {}).items():
+                self.sync(table)
+                self._ensure_columns(table, set(columns))
+            return pd.read_sql_query(sql, self._conn, params=params)
+
+    def query(self, sql: str, params: tuple = (), tables: dict | None = None) -> list[dict]:
+        return self.query_frame(sql, params, tables).to_dict("records")
+
+
+@st.cache_resource
+def get_replica() -> Replica:
+    """העתק אחד לכל תהליך השרת, משותף לכל הסשנים"""
+    from utils.supabase_client import supabase
+    return Replica(supabase)
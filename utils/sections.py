@@ -0,0 +1,80 @@
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from utils.data import begin_fragment
+
+# === סעיפים בעמוד (במקום st.tabs) ===
+# st.tabs מריץ בכל ריצה את כל הטאבים - כולל השאילתות של טאבים שלא רואים.
+# כאן רק הסעיף הנבחר רץ. הבחירה נשמרת ב-session_state (נשארת גם אחרי מעבר עמוד),
+# וכל סעיף רץ כ-st.fragment: לחיצה על widget בתוכו מריצה מחדש רק את הסעיף.
+# st.rerun() בתוך סעיף עדיין מריץ את כל העמוד (אחרי כתיבה שמשנה גם נתונים מחוץ לסעיף)
+
+
+def section_key(page: str) -> str:
+    """המפתח ב-session_state שבו נשמר הסעיף הנבחר של העמוד"""
+    return f"section_{page}"
+
+
+def section_selector(page: str, labels: list[str]) -> str:
+    """בורר סעיפים אופקי בראש העמוד; מחזיר את הסעיף שנבחר"""
+    state_key = section_key(page)
+    widget_key = f"_section_widget_{page}"
+    if st.session_state.get(state_key) not in labels:
+        st.session_state[state_key] = labels[0]
+    # ה-widget נמחק מה-session_state כשעוזבים את העמוד - הבחירה עצמה נשמרת במפתח נפרד
+    st.session_state[widget_key] = st.session_state[state_key]
+
+    def remember():
+        st.session_state[state_key] = st.session_state[widget_key]
+
+    st.radio("סעיף", labels, key=widget_key, horizontal=True, label_visibility="collapsed", on_change=remember)
+    return st.session_state[state_key]
+
+
+def render_section(selected: str, sections: dict):
+    """הרצת הסעיף הנבחר בלבד (תווית -> פונקציה בלי פרמטרים), כ-fragment"""
+    body = sections[selected]
+
+    @st.fragment
+    def section():
+        begin_fragment()
+        body()
+
+    section()
+
+
+# === רשימות עם כתיבה בתוך fragment ===
+# רשימה עם כפתור כתיבה לכל שורה (אישור, סימון כטופל, עריכה/מחיקה) מחזיקה את השורות
+# שלה ב-session_state. אחרי כתיבה השורה מתוקנת במקום ורק ה-fragment רץ מחדש -
+# בלי שאילתות ובלי שאר העמוד. ריצה מלאה של העמוד טוענת את השורות מחדש מהשרת
+def _partial_run() -> bool:
+    ctx = get_script_run_ctx()
+    return ctx is not None and bool(ctx.fragment_ids_this_run)
+
+
+def held_rows(key: str, load, params: tuple = ()) -> list[dict]:
+    """השורות של הרשימה: load() בריצה מלאה או כשהפרמטרים השתנו, ובריצה של ה-fragment בלבד -
+    השורות המוחזקות (כולל תיקונים אחרי כתיבה)"""
+    held = st.session_state.get(f"_rows_{key}")
+    if held is None or held["params"] != params or not _partial_run():
+        held = {"params": params, "rows": list(load())}
+        st.session_state[f"_rows_{key}"] = held
+    return held["rows"]
+
+
+def after_write(key: str, row_id, changes: dict | None = None, full: bool = False):
+    """אחרי כתיבה לשורה ברשימה: עדכון השורה המוחזקת (changes=None - הסרתה) ו-rerun של ה-fragment.
+    full - הכתיבה משנה נתונים שמוצגים גם מחוץ ל-fragment; ריצה מלאה גם כשהשורה כבר לא מוחזקת"""
+    held = st.session_state.get(f"_rows_{key}")
+    index = next((i for i, row in enumerate(held["rows"]) if row.get("id") == row_id), None) if held else None
+    if full or index is None:
+        st.rerun()
+    if changes is None:
+        del held["rows"][index]
+    else:
+        held["rows"][index] = {**held["rows"][index], **changes}
+    rerun_fragment()
+
+
+def rerun_fragment():
+    """rerun של ה-fragment הנוכחי; בריצה מלאה של העמוד (אין fragment לחזור אליו) - ריצה מלאה"""
+    st.rerun(scope="fragment" if _partial_run() else "app")
@@ -1,12 +1,30 @@
+import os
 from supabase import create_client, Client
 import streamlit as st
+from utils.instrumentation import InstrumentedClient
+
+
+def _setting(name: str, default=None):
+    """הגדרה מ-DREAM_BUILD_<NAME> בסביבה או מ-st.secrets[name]"""
+    value = os.environ.get(f"DREAM_BUILD_{name.upper()}")
+    if value is not None:
+        return value
+    try:
+        return st.secrets.get(name, default)
+    except FileNotFoundError:
+        return default
+
 
 @st.cache_resource
 def get_supabase_client() -> Client:
-    """יצירת חיבור ל-Supabase"""
+    """יצירת חיבור ל-Supabase, או ל-backend מזויף בזיכרון כש-backend = "fake" """
+    if _setting("backend", "supabase") == "fake":
+        from utils.fake_supabase import create_fake_client
+        return create_fake_client(float(_setting("fake_latency_ms", 0)), _setting("fake_seed"))
+
     SUPABASE_URL = st.secrets["supabase"]["url"]
     SUPABASE_KEY = st.secrets["supabase"]["key"]
     return create_client(SUPABASE_URL, SUPABASE_KEY)
 
-# יצירת instance גלובלי
-supabase: Client = get_supabase_client()
+# יצירת instance גלובלי - עטוף במדידה (utils.instrumentation)
+supabase: Client = InstrumentedClient(get_supabase_client())
@@ -0,0 +1,145 @@
+import os
+import logging
+
+# === רישום הטלות (projections) ===
+# כל מסך מבקש "view" בשם, וה-view קובע בדיוק אילו עמודות יורדות מהשרת.
+# עמודה שנוספת לתצוגה צריכה להתווסף כאן - ולא כ-select("*") בעמוד.
+VIEWS = {
+    # --- בתי ספר ---
+    "schools.list": ("schools", "id, name, contact_person, phone, email, price_per_day, address, notes, status"),
+    "schools.options": ("schools", "id, name, price_per_day"),
+    "schools.names": ("schools", "id, name"),
+
+    # --- מדריכים ---
+    "employees.list": ("users", "id, full_name, email, phone, hourly_rate, daily_rate, status"),
+    "employees.options": ("users", "id, full_name"),
+
+    # --- פעילויות ---
+    "activities.board": ("activities", "id, date, time_start, time_end, status, school_id, employee_id, schools(name), users(full_name)"),
+    "activities.by_school": ("activities", "id, date, time_start, time_end, status, users(full_name)"),
+    "activities.pending": ("activities", "id, date, time_start, time_end, schools(name)"),
+    "activities.my_month": ("activities", "id, date, time_start, time_end, status, school_id, confirmed_by_employee, schools(name)"),
+    "activities.upcoming": ("activities", "date, status, schools(name), users(full_name)"),
+    "activities.employee_status": ("activities", "employee_id, status"),
+    "activities.income_detail": ("activities", "date, status, schools(name, price_per_day)"),
+    "activities.export": ("activities", "id, date, time_start, time_end, status, confirmed_by_employee, notes, "
+                                        "school_id, employee_id, schools(name, price_per_day), users(full_name)"),
+
+    # --- ציוד ---
+    "equipment.list": ("equipment", "id, name, category, quantity_available, min_threshold"),
+    "equipment.stock": ("equipment", "name, category, quantity_available, min_threshold"),
+    "equipment.low_stock": ("equipment", "name, quantity_available, min_threshold"),
+    "equipment.options": ("equipment", "id, name"),
+    "equipment_reports.list": ("equipment_reports", "id, status, description, created_at, users(full_name), equipment(name)"),
+
+    # --- תקציבים וכספים ---
+    "school_budgets.list": ("school_budgets", "id, school_id, budget_amount, alert_threshold"),
+    "financial_records.list": ("financial_records", "date, category, description, amount"),
+    "financial_records.export": ("financial_records", "id, date, type, category, description, amount"),
+
+    # --- העתק מקומי לניתוחים (utils.replica) - updated_at הוא סמן הסנכרון ---
+    "replica.activities": ("activities", "id, school_id, employee_id, date, status, updated_at"),
+    "replica.schools": ("schools", "id, name, price_per_day, status, updated_at"),
+    "replica.users": ("users", "id, full_name, role, hourly_rate, daily_rate, updated_at"),
+    "replica.financial_records": ("financial_records", "id, date, type, category, amount, updated_at"),
+}
+
+
+def columns_for(view: str, table: str) -> str:
+    """מחרוזת ה-select של view; view של טבלה אחרת הוא באג בעמוד"""
+    view_table, columns = VIEWS[view]
+    if view_table != table:
+        raise ValueError(f"view '{view}' שייך לטבלה {view_table}, לא ל-{table}")
+    return columns
+
+
+def column_set(view: str) -> frozenset:
+    """העמודות של view כקבוצה - פריט מוטמע כמו schools(name) נשמר כמחרוזת אחת"""
+    columns, depth, token = [], 0, ""
+    for char in VIEWS[view][1]:
+        depth += char == "("
+        depth -= char == ")"
+        if char == "," and depth == 0:
+            columns.append(token.strip())
+            token = ""
+        else:
+            token += char
+    columns.append(token.strip())
+    return frozenset(columns)
+
+
+def _keys(view: str) -> set:
+    """שמות המפתחות שה-view מחזיר בכל שורה (schools(name) -> schools)"""
+    return {column.split("(")[0] for column in column_set(view)}
+
+
+# === מצב פיתוח: אזהרה על עמודות שיורדות ולא נקראות ===
+DEV_MODE = os.environ.get("DREAM_BUILD_DEV", "") == "1"
+
+logger = logging.getLogger(__name__)
+
+# view -> עמודות שהורדו / עמודות שנקראו לפחות פעם אחת
+_FETCHED: dict[str, set] = {}
+_READ: dict[str, set] = {}
+_WARNED: set = set()
+
+
+class _TrackedRow(dict):
+    """dict שרושם אילו מפתחות נקראו. מעבר על כל המפתחות (למשל pd.DataFrame(rows))
+    נחשב כקריאה של כולם"""
+    __slots__ = ("_read",)
+
+    def __init__(self, row: dict, read: set):
+        super().__init__(row)
+        self._read = read
+
+    def __getitem__(self, key):
+        self._read.add(key)
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        self._read.add(key)
+        return super().get(key, default)
+
+    def __contains__(self, key):
+        self._read.add(key)
+        return super().__contains__(key)
+
+    def keys(self):
+        self._read.update(super().keys())
+        return super().keys()
+
+    def values(self):
+        self._read.update(super().keys())
+        return super().values()
+
+    def items(self):
+        self._read.update(super().keys())
+        return super().items()
+
+    def __iter__(self):
+        self._read.update(super().keys())
+        return super().__iter__()
+
+
+def track(view: str, rows: list[dict]) -> list[dict]:
+    """עטיפת תוצאה של view למעקב קריאות (מצב פיתוח).
+    בכל הבאה של view בודקים מה לא נקרא מאז ההבאה הקודמת, ומזהירים פעם אחת לכל עמודה"""
+    fetched = _FETCHED.setdefault(view, set())
+    read = _READ.setdefault(view, set())
+    for column in sorted(fetched - read):
+        if (view, column) not in _WARNED:
+            _WARNED.add((view, column))
+            logger.warning("view '%s': העמודה '%s' יורדת מהשרת אבל אף מסך לא קורא אותה", view, column)
+
+    # שורות שהוגשו מ-view רחב יותר (memo) מכילות מפתחות נוספים - סופרים רק את של ה-view
+    keys = _keys(view)
+    for row in rows:
+        fetched.update(key for key in dict.keys(row) if key in keys)
+    return [_TrackedRow(row, read) for row in rows]
+
+
+def unused_columns() -> dict[str, list[str]]:
+    """view -> עמודות שהורדו ועדיין לא נקראו"""
+    return {view: sorted(fetched - _READ.get(view, set()))
+            for view, fetched in _FETCHED.items() if fetched - _READ.get(view, set())}